@@ -16,8 +16,10 @@ This module adds customer success prediction functionality:
         * Historical sales analysis
         * Success rate prediction
         * Customer activity visualization
+        * Chart thumbnails with full resolution export on demand
+        * Partner analytics refreshed in the background when orders change
 """,
-    "version": "17.0.1.0.0",
+    "version": "17.0.1.1.0",
     "author": "Serhii Miroshnychenko",
     "website": "https://github.com/SerhiiMiroshnychenko",
     "license": "OPL-1",
@@ -27,6 +29,7 @@ This module adds customer success prediction functionality:
     ],
     "data": [
         "security/ir.model.access.csv",
+        "data/ir_cron.xml",
         "views/res_partner_views.xml",
         "views/data_collection_views.xml",
         "views/menu_views.xml",
@@ -0,0 +1,14 @@
+# -*- coding: utf-8 -*-
+from odoo import api, SUPERUSER_ID
+
+
+def migrate(cr, version):
+    """Queue the partners with orders for the first refresh of their analytics.
+
+    The stored analytics are no longer recomputed on order changes, only by the
+    ``_cron_refresh_stale_analytics`` worker.
+    """
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    cr.execute("SELECT DISTINCT partner_id FROM sale_order WHERE partner_id IS NOT NULL")
+    partner_ids = [row[0] for row in cr.fetchall()]
+    env['res.partner'].browse(partner_ids)._mark_analytics_stale()
@@ -1,2 +1,4 @@
+from . import chart_render
 from . import partner
+from . import sale_order
 from . import data_collection
@@ -4,15 +4,20 @@ matplotlib.use('Agg')
 from io import BytesIO
 from datetime import datetime
 import matplotlib.pyplot as plt
-from collections import defaultdict
+from collections import defaultdict, namedtuple
 import numpy as np
 
 from odoo import models, fields
+from odoo.tools import SQL
+
+# Facts of the period's orders as parallel arrays, latest order first
+OrderSnapshot = namedtuple('OrderSnapshot', ['partner_ids', 'states', 'amounts', 'dates'])
 
 
 class CustomerDataCollection(models.Model):
     _name = 'customer.data.collection'
     _description = 'Customer Data Collection'
+    _inherit = ['customer.success.chart.mixin']
 
     name = fields.Char(required=True)
     date_from = fields.Date(required=True)
@@ -39,36 +44,77 @@ class CustomerDataCollection(models.Model):
     # Графіки
     combined_chart = fields.Binary(string='Monthly Orders Analysis', compute='_compute_charts')
 
+    def _get_order_snapshot(self):
+        """Load the facts of the period's orders once with a single query.
+
+        Statistics and charts of a collection are all computed from this snapshot.
+        Orders are sorted like ``sale.order`` (latest first) and record rules apply.
+        """
+        self.ensure_one()
+        query = self.env['sale.order']._search([
+            ('date_order', '>=', self.date_from),
+            ('date_order', '<=', self.date_to)
+        ], order='date_order desc, id desc')
+        self.env.cr.execute(query.select(
+            SQL.identifier('sale_order', 'partner_id'),
+            SQL.identifier('sale_order', 'state'),
+            SQL.identifier('sale_order', 'amount_total'),
+            SQL.identifier('sale_order', 'date_order'),
+        ))
+        rows = self.env.cr.fetchall()
+        partner_ids, states, amounts, dates = zip(*rows) if rows else ((), (), (), ())
+        return OrderSnapshot(
+            partner_ids=np.array(partner_ids, dtype=np.int64),
+            states=np.array(states, dtype=object),
+            amounts=np.array(amounts, dtype=float),
+            dates=np.array(dates, dtype='datetime64[s]'),
+        )
+
+    def _get_partner_state_counts(self, snapshot):
+        """Return [(partner id, state, number of orders)] of the snapshot.
+
+        Rows come in the order partners and states first appear in the snapshot,
+        so dictionaries built from them keep the key order of a loop over the orders.
+        """
+        state_values, state_codes = np.unique(snapshot.states.astype(str), return_inverse=True)
+        keys = snapshot.partner_ids * len(state_values) + state_codes
+        unique_keys, first_index, counts = np.unique(keys, return_index=True, return_counts=True)
+        order = np.argsort(first_index, kind='stable')
+        return [
+            (int(key // len(state_values)), str(state_values[key % len(state_values)]), int(count))
+            for key, count in zip(unique_keys[order], counts[order])
+        ]
+
     def _compute_statistics(self):
         for record in self:
-            # Отримуємо всі замовлення за період
-            domain = [
-                ('date_order', '>=', record.date_from),
-                ('date_order', '<=', record.date_to)
-            ]
-            orders = self.env['sale.order'].search(domain)
-            partners = orders.mapped('partner_id')
+            record._update_statistics(record._get_order_snapshot())
+
+    def _update_statistics(self, snapshot):
+        for record in self:
+            # Кількість замовлень кожного клієнта за статусами за період
+            states_count = defaultdict(int)
+            partners_count = defaultdict(lambda: {'total': 0, 'successful': 0})
+            for partner_id, state, count in record._get_partner_state_counts(snapshot):
+                states_count[state] += count
+                partners_count[partner_id]['total'] += count
+                if state == 'sale':
+                    partners_count[partner_id]['successful'] += count
 
             # Загальна статистика
-            record.total_partners = len(partners)
-            record.total_orders = len(orders)
+            total_orders = sum(states_count.values())
+            record.total_partners = len(partners_count)
+            record.total_orders = total_orders
 
             # Статистика по статусам
-            states_count = defaultdict(int)
-            for order in orders:
-                states_count[order.state] += 1
             record.orders_by_state = str(dict(states_count))
 
             # Загальний % успішних замовлень
-            successful_orders = orders.filtered(lambda o: o.state == 'sale')
-            record.total_success_rate = (len(successful_orders) / len(orders)) if orders else 0
+            record.total_success_rate = (states_count.get('sale', 0) / total_orders) if total_orders else 0
 
             # Розподіл клієнтів за success_rate
             success_rate_ranges = defaultdict(int)
-            for partner in partners:
-                partner_orders = orders.filtered(lambda o: o.partner_id == partner)
-                partner_successful = partner_orders.filtered(lambda o: o.state == 'sale')
-                success_rate = (len(partner_successful) / len(partner_orders) * 100) if partner_orders else 0
+            for partner_count in partners_count.values():
+                success_rate = partner_count['successful'] / partner_count['total'] * 100
 
                 # Розподіляємо по діапазонах
                 if success_rate == 100:
@@ -88,8 +134,7 @@ class CustomerDataCollection(models.Model):
 
             record.partners_by_success_rate = str(dict(success_rate_ranges))
 
-    @staticmethod
-    def _create_chart(months, orders_data, successful_data, rate_data):
+    def _create_chart(self, months, orders_data, successful_data, rate_data):
         """Helper function for creating combined chart with three metrics"""
         try:
             # Create figure with primary axis
@@ -143,7 +188,7 @@ class CustomerDataCollection(models.Model):
 
             # Save to buffer
             buffer = BytesIO()
-            fig.savefig(buffer, format='png', bbox_inches='tight', dpi=300)
+            self._savefig(buffer, fig, bbox_inches='tight')
             plt.close()
 
             return base64.b64encode(buffer.getvalue())
@@ -156,36 +201,25 @@ class CustomerDataCollection(models.Model):
 
     def _compute_charts(self):
         for record in self:
-            domain = [
-                ('date_order', '>=', record.date_from),
-                ('date_order', '<=', record.date_to)
-            ]
-            orders = self.env['sale.order'].search(domain)
-
-            # Підготовка даних по місяцях
-            monthly_data = defaultdict(lambda: {'orders': 0, 'successful': 0})
-
-            for order in orders:
-                month_key = order.date_order.strftime('%m/%Y')
-                monthly_data[month_key]['orders'] += 1
-                if order.state == 'sale':
-                    monthly_data[month_key]['successful'] += 1
-
-            # Сортуємо місяці
-            months = sorted(monthly_data.keys(), key=lambda x: datetime.strptime(x, '%m/%Y'))
-
-            # Prepare data arrays
-            orders_data = [monthly_data[m]['orders'] for m in months]
-            successful_data = [monthly_data[m]['successful'] for m in months]
-            success_rate_data = [(monthly_data[m]['successful'] / monthly_data[m]['orders'] * 100)
-                                 if monthly_data[m]['orders'] else 0 for m in months]
+            record._update_charts(record._get_order_snapshot())
+
+    def _update_charts(self, snapshot):
+        # Підготовка даних по місяцях
+        unique_months, month_index = np.unique(snapshot.dates.astype('datetime64[M]'), return_inverse=True)
+        orders_data = np.bincount(month_index, minlength=len(unique_months))
+        successful_data = np.bincount(month_index, weights=snapshot.states == 'sale',
+                                      minlength=len(unique_months)).astype(int)
+        success_rate_data = successful_data / orders_data * 100 if len(unique_months) else np.array([])
 
+        # Місяці вже відсортовані
+        months = [f'{month[5:7]}/{month[:4]}' for month in np.datetime_as_string(unique_months, unit='M')]
+
+        for record in self:
             # Create combined chart
             record.combined_chart = record._create_chart(
-                months, orders_data, successful_data, success_rate_data)
+                months, orders_data.tolist(), successful_data.tolist(), success_rate_data.tolist())
 
-    @staticmethod
-    def _create_distribution_chart(data, title, xlabel, ylabel, colors):
+    def _create_distribution_chart(self, data, title, xlabel, ylabel, colors):
         """Helper function for creating distribution charts"""
         try:
             # Create figure
@@ -223,7 +257,7 @@ class CustomerDataCollection(models.Model):
 
             # Save to buffer
             buffer = BytesIO()
-            fig.savefig(buffer, format='png', bbox_inches='tight', dpi=300)
+            self._savefig(buffer, fig, bbox_inches='tight')
             plt.close()
 
             return base64.b64encode(buffer.getvalue())
@@ -234,82 +268,86 @@ class CustomerDataCollection(models.Model):
         finally:
             plt.close('all')
 
+    def _get_distribution_chart_args(self, snapshot=None):
+        """Return {chart field: _create_distribution_chart arguments}"""
+        self.ensure_one()
+        if snapshot is None:
+            snapshot = self._get_order_snapshot()
+        # Success rate of the period's partners, stored on the partner
+        partners = self.env['res.partner'].browse(np.unique(snapshot.partner_ids).tolist())
+
+        # Prepare orders by state data with specific order and colors
+        state_order = ['draft', 'sent', 'sale', 'cancel']
+        state_colors = {
+            'draft': '#808080',  # Gray
+            'sent': '#FFD700',   # Yellow
+            'sale': '#28a745',   # Green
+            'cancel': '#dc3545'  # Red
+        }
+
+        # Count orders by state
+        state_values, state_counts = np.unique(snapshot.states.astype(str), return_counts=True)
+        states_count = dict(zip(state_values.tolist(), state_counts.tolist()))
+
+        # Create ordered dictionary with all states (even if count is 0)
+        states_data = {state: states_count.get(state, 0) for state in state_order}
+        state_colors_list = [state_colors[state] for state in state_order]
+
+        # Prepare partners by success rate data with ordered ranges and green shades
+        success_ranges = [
+            ('0-20%', (0, 20)),
+            ('21-40%', (21, 40)),
+            ('41-60%', (41, 60)),
+            ('61-80%', (61, 80)),
+            ('81-100%', (81, 100))
+        ]
+
+        # Generate green shades from light to dark
+        green_shades = [
+            '#c8e6c9',  # Very light green
+            '#a5d6a7',  # Light green
+            '#81c784',  # Medium green
+            '#66bb6a',  # Dark green
+            '#43a047'   # Very dark green
+        ]
+
+        partners_data = defaultdict(int)
+        for success_rate in np.array(partners.mapped('successful_order'), dtype=float) * 100:
+            for range_name, (min_val, max_val) in success_ranges:
+                if min_val <= success_rate <= max_val:
+                    partners_data[range_name] += 1
+                    break
+
+        # Create ordered dictionary
+        ordered_partners_data = {range_name: partners_data.get(range_name, 0)
+                                 for range_name, _ in success_ranges}
+
+        return {
+            'orders_by_state_chart': (
+                states_data,
+                'Orders Distribution by Status',
+                'Status',
+                'Number of Orders',
+                state_colors_list
+            ),
+            'partners_by_rate_chart': (
+                ordered_partners_data,
+                'Partners Distribution by Success Rate',
+                'Success Rate Range',
+                'Number of Partners',
+                green_shades
+            ),
+        }
+
     def _compute_distribution_charts(self):
+        for record in self:
+            record._update_distribution_charts(record._get_order_snapshot())
+
+    def _update_distribution_charts(self, snapshot):
         for record in self:
             try:
-                # Get orders within date range
-                domain = [
-                    ('date_order', '>=', record.date_from),
-                    ('date_order', '<=', record.date_to)
-                ]
-                orders = self.env['sale.order'].search(domain)
-                partners = orders.mapped('partner_id')
-
-                # Prepare orders by state data with specific order and colors
-                state_order = ['draft', 'sent', 'sale', 'cancel']
-                state_colors = {
-                    'draft': '#808080',  # Gray
-                    'sent': '#FFD700',   # Yellow
-                    'sale': '#28a745',   # Green
-                    'cancel': '#dc3545'  # Red
-                }
-
-                # Count orders by state
-                states_count = defaultdict(int)
-                for order in orders:
-                    states_count[order.state] += 1
-
-                # Create ordered dictionary with all states (even if count is 0)
-                states_data = {state: states_count.get(state, 0) for state in state_order}
-                state_colors_list = [state_colors[state] for state in state_order]
-
-                # Create orders by state chart
-                record.orders_by_state_chart = record._create_distribution_chart(
-                    states_data,
-                    'Orders Distribution by Status',
-                    'Status',
-                    'Number of Orders',
-                    state_colors_list
-                )
-
-                # Prepare partners by success rate data with ordered ranges and green shades
-                success_ranges = [
-                    ('0-20%', (0, 20)),
-                    ('21-40%', (21, 40)),
-                    ('41-60%', (41, 60)),
-                    ('61-80%', (61, 80)),
-                    ('81-100%', (81, 100))
-                ]
-
-                # Generate green shades from light to dark
-                green_shades = [
-                    '#c8e6c9',  # Very light green
-                    '#a5d6a7',  # Light green
-                    '#81c784',  # Medium green
-                    '#66bb6a',  # Dark green
-                    '#43a047'   # Very dark green
-                ]
-
-                partners_data = defaultdict(int)
-                for partner in partners:
-                    success_rate = partner.successful_order * 100
-                    for range_name, (min_val, max_val) in success_ranges:
-                        if min_val <= success_rate <= max_val:
-                            partners_data[range_name] += 1
-                            break
-
-                # Create ordered dictionary
-                ordered_partners_data = {range_name: partners_data.get(range_name, 0)
-                                         for range_name, _ in success_ranges}
-
-                # Create partners by success rate chart
-                record.partners_by_rate_chart = record._create_distribution_chart(
-                    ordered_partners_data,
-                    'Partners Distribution by Success Rate',
-                    'Success Rate Range',
-                    'Number of Partners',
-                    green_shades
-                )
+                for field_name, chart_args in record._get_distribution_chart_args(snapshot).items():
+                    record[field_name] = record._create_distribution_chart(*chart_args)
 
             except Exception as e:
                 print(f"Error computing distribution charts: {str(e)}")
@@ -318,14 +356,22 @@ class CustomerDataCollection(models.Model):
             finally:
                 plt.close('all')
 
+    def _get_full_resolution_charts(self):
+        charts = super()._get_full_resolution_charts()
+        record = self.with_context(chart_profile='full')
+        for field_name, chart_args in self._get_distribution_chart_args().items():
+            charts[field_name] = record._create_distribution_chart(*chart_args)
+        return charts
+
     def action_collect_data(self):
         self.ensure_one()
         self.state = 'collecting'
 
-        # Оновлюємо статистику
-        self._compute_statistics()
-        self._compute_charts()
-        self._compute_distribution_charts()
+        # Оновлюємо статистику з одного знімка замовлень періоду
+        snapshot = self._get_order_snapshot()
+        self._update_statistics(snapshot)
+        self._update_charts(snapshot)
+        self._update_distribution_charts(snapshot)
 
         self.state = 'done'
 
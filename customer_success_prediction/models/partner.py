@@ -1,5 +1,6 @@
 import base64
 import logging
+import threading
 import matplotlib
 import numpy as np
 matplotlib.use('Agg')  # Install backend before importing pyplot
@@ -12,19 +13,86 @@ from odoo import models, fields, api, Command
 
 _logger = logging.getLogger(__name__)
 
+REFRESH_BATCH_SIZE = 100
+
 
 class Partner(models.Model):
-    _inherit='res.partner'
+    _inherit = ['res.partner', 'customer.success.chart.mixin']
 
-    # Analytics fields
+    # Analytics fields, refreshed by the ``_cron_refresh_stale_analytics`` worker
     successful_order = fields.Float(compute='_compute_orders_statistics', store=True)
     orders_chart = fields.Binary(compute='_compute_charts', store=True)
     all_order_ids = fields.Many2many('sale.order', compute='_compute_all_orders')
-
+    analytics_stale = fields.Boolean(
+        index=True,
+        copy=False,
+        readonly=True,
+        help='The orders of the partner changed since its analytics were computed'
+    )
 
     def update_analytics(self):
         self._compute_orders_statistics()
         self._compute_charts()
+        self._set_analytics_stale(False)
+
+    def _mark_analytics_stale(self):
+        """Queue the partners and their parent companies for the analytics refresh.
+
+        Their orders are part of the analytics of every ancestor (see
+        ``action_view_sale_order``). Marking an already queued partner is a no-op,
+        so repeated changes to one partner cause a single render.
+        """
+        partner_ids = {
+            int(partner_id)
+            for parent_path in self.exists().mapped('parent_path') if parent_path
+            for partner_id in parent_path.split('/')[:-1]
+        }
+        if partner_ids:
+            self.browse(partner_ids)._set_analytics_stale(True)
+
+    def _set_analytics_stale(self, stale):
+        # Plain SQL: no write_date, tracking or recomputation inside the user's transaction
+        if not self.ids:
+            return
+        self.env.cr.execute(
+            "UPDATE res_partner SET analytics_stale = %s WHERE id IN %s AND analytics_stale IS DISTINCT FROM %s",
+            (stale, tuple(self.ids), stale),
+        )
+        self.invalidate_recordset(['analytics_stale'])
+
+    @api.model
+    def _cron_refresh_stale_analytics(self, batch_size=None):
+        """Compute the analytics of the queued partners in batches.
+
+        The batch size comes from the ``customer_success_prediction.refresh_batch_size``
+        system parameter. Each batch is committed, so a failure only retries its partners.
+        """
+        batch_size = batch_size or int(self.env['ir.config_parameter'].sudo().get_param(
+            'customer_success_prediction.refresh_batch_size', REFRESH_BATCH_SIZE))
+        auto_commit = not getattr(threading.current_thread(), 'testing', False)
+        failed_ids = []
+
+        while True:
+            partners = self.with_context(active_test=False).search(
+                [('analytics_stale', '=', True), ('id', 'not in', failed_ids)], limit=batch_size)
+            if not partners:
+                break
+
+            try:
+                with self.env.cr.savepoint():
+                    # Cleared first: an order changed during the render queues the partner again
+                    partners._set_analytics_stale(False)
+                    partners._compute_orders_statistics()
+                    partners._compute_charts()
+                    partners.flush_recordset(['successful_order', 'orders_chart'])
+            except Exception:
+                _logger.exception("Error refreshing the analytics of partners %s", partners.ids)
+                failed_ids += partners.ids
+                self.env.invalidate_all()
+                continue
+
+            if auto_commit:
+                self.env.cr.commit()  # pylint: disable=invalid-commit
 
     def _compute_all_orders(self):
         for partner in self:
@@ -37,15 +105,13 @@ class Partner(models.Model):
             })
 
 
-    @api.depends('sale_order_ids', 'sale_order_ids.state')
     def _compute_orders_statistics(self):
         for partner in self:
             orders = partner.all_order_ids
             completed_orders = orders.filtered(lambda o: o.state == 'sale')
             partner.successful_order = (len(completed_orders) / len(orders)) if orders else 0
 
-    @staticmethod
-    def _create_combined_chart(months, orders_data, successful_data, rate_data):
+    def _create_combined_chart(self, months, orders_data, successful_data, rate_data):
         """Helper function for creating combined chart with three metrics"""
         try:
             # Create figure with primary axis
@@ -99,7 +165,7 @@ class Partner(models.Model):
 
             # Save to buffer
             buffer = BytesIO()
-            fig.savefig(buffer, format='png', bbox_inches='tight', dpi=300)
+            self._savefig(buffer, fig, bbox_inches='tight')
             plt.close()
 
             return base64.b64encode(buffer.getvalue())
@@ -110,40 +176,54 @@ class Partner(models.Model):
         finally:
             plt.close('all')
 
+    def _get_monthly_chart_data(self):
+        """Return (months, orders, successful orders, success rate) of the partner orders"""
+        self.ensure_one()
+        # Get sorted orders
+        orders = self.all_order_ids.sorted('date_order')
+        if not orders:
+            return None
+
+        # Group orders by month
+        monthly_data = defaultdict(lambda: {'orders': 0, 'successful': 0})
+
+        for order in orders:
+            month_key = order.date_order.strftime('%m/%Y')
+            monthly_data[month_key]['orders'] += 1
+            if order.state == 'sale':
+                monthly_data[month_key]['successful'] += 1
+
+        # Sort months
+        months = sorted(monthly_data.keys(),
+                        key=lambda x: datetime.strptime(x, '%m/%Y'))
+
+        # Prepare data arrays
+        orders_data = [monthly_data[m]['orders'] for m in months]
+        successful_data = [monthly_data[m]['successful'] for m in months]
+        success_rate_data = [(monthly_data[m]['successful'] / monthly_data[m]['orders'] * 100)
+                             if monthly_data[m]['orders'] else 0 for m in months]
+        return months, orders_data, successful_data, success_rate_data
+
     def _compute_charts(self):
         for partner in self:
             try:
-                # Get sorted orders
-                orders = partner.all_order_ids.sorted('date_order')
-                if not orders:
+                chart_data = partner._get_monthly_chart_data()
+                if not chart_data:
                     partner.orders_chart = False
                     continue
 
-                # Group orders by month
-                monthly_data = defaultdict(lambda: {'orders': 0, 'successful': 0})
-
-                for order in orders:
-                    month_key = order.date_order.strftime('%m/%Y')
-                    monthly_data[month_key]['orders'] += 1
-                    if order.state == 'sale':
-                        monthly_data[month_key]['successful'] += 1
-
-                # Sort months
-                months = sorted(monthly_data.keys(),
-                                key=lambda x: datetime.strptime(x, '%m/%Y'))
-
-                # Prepare data arrays
-                orders_data = [monthly_data[m]['orders'] for m in months]
-                successful_data = [monthly_data[m]['successful'] for m in months]
-                success_rate_data = [(monthly_data[m]['successful'] / monthly_data[m]['orders'] * 100)
-                                     if monthly_data[m]['orders'] else 0 for m in months]
-
                 # Create combined chart
-                partner.orders_chart = partner._create_combined_chart(
-                    months, orders_data, successful_data, success_rate_data)
+                partner.orders_chart = partner._create_combined_chart(*chart_data)
 
             except Exception as e:
                 _logger.warning(f"Error computing chart: {str(e)}")
                 partner.orders_chart = False
             finally:
                 plt.close('all')
+
+    def _get_full_resolution_charts(self):
+        self.ensure_one()
+        chart_data = self._get_monthly_chart_data()
+        if not chart_data:
+            return {}
+        return {'orders_chart': self.with_context(chart_profile='full')._create_combined_chart(*chart_data)}
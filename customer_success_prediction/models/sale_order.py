@@ -0,0 +1,28 @@
+from odoo import models, api
+
+# Order fields the partner analytics are computed from
+ANALYTICS_FIELDS = {'partner_id', 'state', 'date_order'}
+
+
+class SaleOrder(models.Model):
+    _inherit = 'sale.order'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        orders = super().create(vals_list)
+        orders.partner_id._mark_analytics_stale()
+        return orders
+
+    def write(self, vals):
+        analytics_changed = bool(ANALYTICS_FIELDS & set(vals))
+        if 'partner_id' in vals:
+            # The previous partners lose the orders
+            self.partner_id._mark_analytics_stale()
+        res = super().write(vals)
+        if analytics_changed:
+            self.partner_id._mark_analytics_stale()
+        return res
+
+    def unlink(self):
+        self.partner_id._mark_analytics_stale()
+        return super().unlink()
@@ -0,0 +1,45 @@
+################################################################################
+#
+#    OpenERP, Open Source Management Solution
+#    Copyright (C) 2024 Serhii Miroshnychenko (https://github.com/SerhiiMiroshnychenko).
+#
+################################################################################
+
+{
+    "name": "Analytics Base",
+    "summary": "Shared database tooling for the analytics modules",
+    "description": """
+Analytics Base
+==============================
+Common infrastructure used by the analytics modules:
+        * Index advisor for the registered analytics queries
+        * Federated collection of analytics datasets from several databases
+        * Routing of heavy analytics queries to a secondary database
+          (system parameters analytics_base.secondary_dsn,
+          analytics_base.secondary_statement_timeout, analytics_base.secondary_maxconn)
+        * Cache of collected datasets, invalidated when the source tables change
+          (system parameters analytics_base.cache_ttl, analytics_base.cache_max_size)
+        * Chart render profiles: thumbnails by default, full resolution on demand
+          (system parameters analytics_base.chart_format, analytics_base.chart_thumbnail_dpi,
+          analytics_base.chart_full_dpi, analytics_base.chart_max_size)
+        * Vectorized success rate distribution with configurable buckets
+""",
+    "version": "15.0.1.0.0",
+    "author": "Serhii Miroshnychenko",
+    "website": "https://github.com/SerhiiMiroshnychenko",
+    "license": "OPL-1",
+    "category": "Sales/CRM",
+    "depends": [
+        "base", "mail",
+    ],
+    "data": [
+        "security/ir.model.access.csv",
+        "views/index_advisor_views.xml",
+        "views/federated_collector_views.xml",
+        "views/query_cache_views.xml",
+        "views/menu_views.xml",
+    ],
+    "installable": True,
+    "auto_install": False,
+    "application": False,
+}
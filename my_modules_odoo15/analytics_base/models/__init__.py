@@ -0,0 +1,6 @@
+from . import analytics_query
+from . import chart_render
+from . import distribution
+from . import index_advisor
+from . import federated_collector
+from . import query_cache
@@ -0,0 +1,83 @@
+import logging
+import threading
+from contextlib import contextmanager
+
+import psycopg2
+from psycopg2.extensions import parse_dsn
+
+from odoo import models, _
+from odoo.sql_db import ConnectionPool, Connection
+
+_logger = logging.getLogger(__name__)
+
+# Connections to the secondary database are kept apart from the primary pool,
+# so long analytics extractions never starve the OLTP workers of connections.
+_secondary_pool = None
+_secondary_pool_lock = threading.Lock()
+
+
+def _get_secondary_pool(maxconn):
+    global _secondary_pool
+    with _secondary_pool_lock:
+        if _secondary_pool is None:
+            _secondary_pool = ConnectionPool(maxconn)
+        return _secondary_pool
+
+
+class AnalyticsQueryMixin(models.AbstractModel):
+    _name = 'analytics.query.mixin'
+    _description = 'Analytics Query Routing'
+
+    @contextmanager
+    def _analytics_cursor(self):
+        """Yield the cursor used for read-only analytics extraction.
+
+        When the ``analytics_base.secondary_dsn`` system parameter is set (e.g.
+        ``host=replica port=5432``), queries run in a read-only transaction on that
+        server, limited by ``analytics_base.secondary_statement_timeout`` (ms).
+        If the secondary server cannot be reached, the current cursor is used.
+        """
+        get_param = self.env['ir.config_parameter'].sudo().get_param
+        dsn = get_param('analytics_base.secondary_dsn')
+        if not dsn:
+            yield self.env.cr
+            return
+
+        try:
+            connection_info = parse_dsn(dsn)
+            connection_info.setdefault('dbname', self.env.cr.dbname)
+            pool = _get_secondary_pool(int(get_param('analytics_base.secondary_maxconn', 4)))
+            cr = Connection(pool, connection_info['dbname'], connection_info).cursor()
+        except psycopg2.Error as e:
+            _logger.warning("Secondary analytics database unavailable, using the primary: %s", e)
+            yield self.env.cr
+            return
+
+        try:
+            cr.execute("SET TRANSACTION READ ONLY")
+            cr.execute("SET LOCAL statement_timeout = %s",
+                       (int(get_param('analytics_base.secondary_statement_timeout', 0)),))
+            yield cr
+        finally:
+            cr.close()
+
+    def _get_cache_tables(self):
+        """Return the source tables of the cached datasets and their change marker columns.
+
+        See ``analytics.query.cache._get_change_marker``. Without tables, results are not cached.
+        """
+        return {}
+
+    def action_invalidate_cache(self):
+        """Drop the cached query results of this model"""
+        self.env['analytics.query.cache']._invalidate(self._name)
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Cache cleared'),
+                'message': _('The next collection reads the data from the database again.'),
+                'sticky': False,
+                'type': 'info',
+            }
+        }
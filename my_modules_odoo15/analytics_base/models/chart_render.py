@@ -0,0 +1,137 @@
+import base64
+import logging
+import zipfile
+from io import BytesIO
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+from odoo import models, api, _
+from odoo.exceptions import UserError
+
+_logger = logging.getLogger(__name__)
+
+CHART_FORMATS = ('png', 'svg', 'webp')
+MIN_DPI = 40
+
+
+class AnalyticsChartMixin(models.AbstractModel):
+    _name = 'analytics.chart.mixin'
+    _description = 'Analytics Chart Rendering'
+
+    @api.model
+    def _get_chart_profile(self):
+        """Return the render settings of the active profile.
+
+        Charts are rendered as thumbnails unless the context holds
+        ``chart_profile='full'``. Both profiles are configured with system parameters:
+            * analytics_base.chart_format: png (default), svg or webp
+            * analytics_base.chart_thumbnail_dpi (72) and analytics_base.chart_full_dpi (300)
+            * analytics_base.chart_max_size: size budget of a thumbnail in KB (150)
+        """
+        get_param = self.env['ir.config_parameter'].sudo().get_param
+        chart_format = get_param('analytics_base.chart_format', 'png')
+        if chart_format not in CHART_FORMATS:
+            chart_format = 'png'
+
+        if self.env.context.get('chart_profile') == 'full':
+            return {
+                'format': chart_format,
+                'dpi': int(get_param('analytics_base.chart_full_dpi', 300)),
+                'max_size': 0,
+            }
+        return {
+            'format': chart_format,
+            'dpi': int(get_param('analytics_base.chart_thumbnail_dpi', 72)),
+            'max_size': int(get_param('analytics_base.chart_max_size', 150)) * 1024,
+        }
+
+    def _savefig(self, buffer, figure=None, **options):
+        """Write ``figure`` (the current pyplot figure by default) into ``buffer``.
+
+        Format and resolution come from the active profile; other savefig options
+        (bbox_inches, pad_inches, ...) are passed through. A thumbnail larger than
+        its size budget is rendered again at a lower resolution.
+        Returns the format written, png when an oversized SVG thumbnail was rasterized.
+        """
+        figure = figure or plt.gcf()
+        profile = self._get_chart_profile()
+        chart_format, dpi = profile['format'], profile['dpi']
+        data = self._render_figure(figure, chart_format, dpi, options)
+
+        budget = profile['max_size']
+        if budget and len(data) > budget:
+            if chart_format == 'svg':
+                # The size of vector output does not depend on the resolution
+                chart_format = 'png'
+                data = self._render_figure(figure, chart_format, dpi, options)
+            while len(data) > budget and dpi > MIN_DPI:
+                # Raster size grows with the square of the resolution
+                dpi = max(MIN_DPI, int(dpi * (budget / len(data)) ** 0.5 * 0.9))
+                data = self._render_figure(figure, chart_format, dpi, options)
+
+        buffer.write(data)
+        return chart_format
+
+    def _render_chart(self, figure=None, **options):
+        """Return ``figure`` rendered with the active profile, base64 encoded"""
+        buffer = BytesIO()
+        self._savefig(buffer, figure, **options)
+        return base64.b64encode(buffer.getvalue())
+
+    @staticmethod
+    def _render_figure(figure, chart_format, dpi, options):
+        output = BytesIO()
+        figure.savefig(output, format=chart_format, dpi=dpi, **options)
+        return output.getvalue()
+
+    def _get_full_resolution_charts(self):
+        """Return {field name: base64 chart} rendered with the full profile.
+
+        The computed binary fields, the stored ones only once drawn, are computed
+        again on a new record copying this one, so the stored thumbnails are kept.
+        Models drawing stored charts outside of compute methods extend this method.
+        """
+        self.ensure_one()
+        chart_fields = [name for name, field in self._fields.items()
+                        if field.type == 'binary' and field.compute
+                        and (not field.store or self.with_context(bin_size=True)[name])]
+        record = self.with_context(chart_profile='full').new(origin=self)
+        for method in {self._fields[name].compute for name in chart_fields}:
+            getattr(record, method)()
+        return {name: record.env.cache.get(record, self._fields[name], False) for name in chart_fields}
+
+    def action_download_full_charts(self):
+        """Render the charts at full resolution and download them as a ZIP archive"""
+        self.ensure_one()
+        charts = {name: data for name, data in self._get_full_resolution_charts().items() if data}
+        if not charts:
+            raise UserError(_("There are no charts to download."))
+
+        extension = self.with_context(chart_profile='full')._get_chart_profile()['format']
+        archive = BytesIO()
+        with zipfile.ZipFile(archive, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+            for name, data in charts.items():
+                zip_file.writestr('%s.%s' % (name, extension), base64.b64decode(data))
+
+        filename = '%s_charts.zip' % (self.display_name or self._name).replace('/', '_')
+        Attachment = self.env['ir.attachment']
+        # Only the latest export is kept
+        Attachment.search([
+            ('res_model', '=', self._name),
+            ('res_id', '=', self.id),
+            ('name', '=', filename),
+        ]).unlink()
+        attachment = Attachment.create({
+            'name': filename,
+            'datas': base64.b64encode(archive.getvalue()),
+            'res_model': self._name,
+            'res_id': self.id,
+            'mimetype': 'application/zip',
+        })
+        return {
+            'type': 'ir.actions.act_url',
+            'url': '/web/content/%s?download=true' % attachment.id,
+            'target': 'self',
+        }
@@ -0,0 +1,56 @@
+import numpy as np
+
+from odoo import models, api
+
+# Success rate buckets of the statistics: [0, 20), [20, 40), ..., [80, 100), 100
+SUCCESS_RATE_EDGES = [0, 20, 40, 60, 80, 100, float('inf')]
+SUCCESS_RATE_LABELS = ['0-19%', '20-39%', '40-59%', '60-79%', '80-99%', '100%']
+
+# Success rate buckets of the charts: [0, 20], (20, 40], ..., (80, 100]
+SUCCESS_RATE_CHART_EDGES = [0, 20, 40, 60, 80, 100]
+SUCCESS_RATE_CHART_LABELS = ['0-20%', '21-40%', '41-60%', '61-80%', '81-100%']
+
+
+class AnalyticsDistributionMixin(models.AbstractModel):
+    _name = 'analytics.distribution.mixin'
+    _description = 'Analytics Distribution Bucketing'
+
+    @api.model
+    def _get_success_rate_buckets(self, chart=False):
+        """Return (edges, labels, right) of the success rate distribution.
+
+        ``right`` tells whether the buckets include their upper edge.
+        Override to change the buckets of every statistic and chart at once.
+        """
+        if chart:
+            return SUCCESS_RATE_CHART_EDGES, SUCCESS_RATE_CHART_LABELS, True
+        return SUCCESS_RATE_EDGES, SUCCESS_RATE_LABELS, False
+
+    @api.model
+    def _bucket_indexes(self, values, edges, right=False):
+        """Return the bucket index of every value in a single vectorized pass.
+
+        Values outside the edges fall into the first or last bucket and missing
+        values into the first one.
+        """
+        values = np.asarray(values, dtype=float)
+        values = np.where(np.isnan(values), edges[0], values)
+        inner_edges = np.asarray(edges[1:-1], dtype=float)
+        return np.searchsorted(inner_edges, values, side='left' if right else 'right')
+
+    @api.model
+    def _bucket_labels(self, values, edges, labels, right=False):
+        """Return the bucket label of every value as an array"""
+        return np.asarray(labels, dtype=object)[self._bucket_indexes(values, edges, right=right)]
+
+    @api.model
+    def _bucket_counts(self, values, edges, labels, right=False):
+        """Count ``values`` per bucket. Returns {label: count} in bucket order"""
+        counts = np.bincount(self._bucket_indexes(values, edges, right=right), minlength=len(labels))
+        return dict(zip(labels, counts.tolist()))
+
+    @api.model
+    def _get_success_rate_distribution(self, success_rates, chart=False):
+        """Return {bucket label: number of partners} of success rates in percent"""
+        edges, labels, right = self._get_success_rate_buckets(chart=chart)
+        return self._bucket_counts(success_rates, edges, labels, right=right)
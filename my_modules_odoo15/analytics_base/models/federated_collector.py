@@ -0,0 +1,183 @@
+import csv
+import time
+import base64
+import logging
+import tempfile
+from io import StringIO
+from concurrent.futures import ThreadPoolExecutor
+
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError, ValidationError
+from odoo.service import db as db_service
+from odoo.sql_db import db_connect
+
+_logger = logging.getLogger(__name__)
+
+FETCH_SIZE = 10000
+
+
+class AnalyticsFederatedCollector(models.Model):
+    _name = 'analytics.federated.collector'
+    _description = 'Federated Analytics Collector'
+    _order = 'id desc'
+
+    name = fields.Char(required=True)
+    collector_model = fields.Selection(
+        [],
+        string='Dataset',
+        required=True,
+        help='Analytics model whose extraction query is run in every database'
+    )
+    database_ids = fields.One2many('analytics.federated.database', 'collector_id', string='Databases')
+    max_workers = fields.Integer(string='Parallel Connections', default=4,
+                                 help='Number of databases extracted at the same time')
+
+    # Data file fields
+    data_file = fields.Binary(string='Data File (CSV)', attachment=True, readonly=True)
+    data_filename = fields.Char(string='Data Filename')
+    total_rows = fields.Integer(string='Total Rows', readonly=True)
+    duration = fields.Float(string='Duration (s)', readonly=True)
+
+    @api.constrains('database_ids')
+    def _check_prefix_numbers(self):
+        for record in self:
+            prefixes = record.database_ids.mapped('prefix_number')
+            if len(prefixes) != len(set(prefixes)):
+                raise ValidationError(_("Each database must use its own prefix number."))
+
+    def action_collect_data(self):
+        """Run the extraction in every database in parallel and merge the results into one CSV"""
+        self.ensure_one()
+        if not self.database_ids:
+            raise UserError(_("Please add at least one database."))
+
+        missing = [line.database for line in self.database_ids if not db_service.exp_db_exist(line.database)]
+        if missing:
+            raise UserError(_("Unknown database(s): %s") % ', '.join(missing))
+
+        source = self.env[self.collector_model]
+        jobs = [(line, source._get_federated_query(line.prefix_number)) for line in self.database_ids]
+        max_workers = max(1, min(self.max_workers, len(jobs)))
+
+        start = time.time()
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(self._extract_database, line.database, query, params, header)
+                for line, (query, params, header) in jobs
+            ]
+            # Results are merged in the order of the database lines, not completion order
+            results = [(job[0], future.result()) for job, future in zip(jobs, futures)]
+
+        output = StringIO()
+        writer = csv.writer(output)
+        header_written = False
+        total_rows = 0
+        for line, result in results:
+            line.write({
+                'state': 'failed' if result['error'] else 'done',
+                'row_count': result['row_count'],
+                'duration': result['duration'],
+                'message': result['error'] or False,
+            })
+            if result['error']:
+                result['file'].close()
+                continue
+            with result['file'] as spool:
+                spool.seek(0)
+                reader = csv.reader(spool)
+                header = next(reader, None)
+                if header and not header_written:
+                    writer.writerow(header)
+                    header_written = True
+                writer.writerows(reader)
+            total_rows += result['row_count']
+
+        if not header_written:
+            raise UserError(_("No data could be collected from the selected databases."))
+
+        self.write({
+            'data_file': base64.b64encode(output.getvalue().encode('utf-8')),
+            'data_filename': f"federated_{self.collector_model.replace('.', '_')}_{fields.Date.today()}.csv",
+            'total_rows': total_rows,
+            'duration': time.time() - start,
+        })
+
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Success'),
+                'message': _('%s rows collected from %s database(s)')
+                           % (total_rows, len(self.database_ids.filtered(lambda l: l.state == 'done'))),
+                'sticky': False,
+                'type': 'success',
+            }
+        }
+
+    @staticmethod
+    def _extract_database(dbname, query, params, header=None):
+        """Stream the query result of one database into a temporary CSV file.
+
+        Runs in a worker thread: it only uses its own pooled connection and a
+        server-side cursor, so memory stays bounded by FETCH_SIZE rows.
+        """
+        start = time.time()
+        spool = tempfile.TemporaryFile(mode='w+', encoding='utf-8', newline='')
+        result = {'file': spool, 'row_count': 0, 'duration': 0.0, 'error': False}
+        try:
+            with db_connect(dbname).cursor() as cr:
+                with cr._cnx.cursor(name='analytics_federated_collect') as stream:
+                    stream.itersize = FETCH_SIZE
+                    stream.execute(query, params)
+                    rows = stream.fetchmany(FETCH_SIZE)
+                    writer = csv.writer(spool)
+                    writer.writerow(header or [column[0] for column in stream.description])
+                    while rows:
+                        writer.writerows(rows)
+                        result['row_count'] += len(rows)
+                        rows = stream.fetchmany(FETCH_SIZE)
+                cr.rollback()
+        except Exception as e:
+            _logger.warning("Federated extraction failed for database %s: %s", dbname, e)
+            result['error'] = str(e)
+        result['duration'] = time.time() - start
+        return result
+
+    def action_open_analysis(self):
+        """Create an analysis record of the collected dataset and open it"""
+        self.ensure_one()
+        if not self.data_file:
+            raise UserError(_("Please collect data first."))
+
+        record = self.env[self.collector_model].create({
+            'name': self.name,
+            'prefix_number': 0,
+            'data_file': self.data_file,
+            'data_filename': self.data_filename,
+        })
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': self.collector_model,
+            'res_id': record.id,
+            'view_mode': 'form',
+            'target': 'current',
+        }
+
+
+class AnalyticsFederatedDatabase(models.Model):
+    _name = 'analytics.federated.database'
+    _description = 'Federated Analytics Database'
+    _order = 'prefix_number, id'
+
+    collector_id = fields.Many2one('analytics.federated.collector', required=True, ondelete='cascade')
+    database = fields.Char(required=True)
+    prefix_number = fields.Integer(required=True)
+    state = fields.Selection([
+        ('draft', 'Not Collected'),
+        ('done', 'Collected'),
+        ('failed', 'Failed'),
+    ], default='draft', readonly=True)
+    row_count = fields.Integer(string='Rows', readonly=True)
+    duration = fields.Float(string='Duration (s)', readonly=True)
+    message = fields.Text(readonly=True)
+
@@ -0,0 +1,324 @@
+import re
+import time
+import logging
+
+import psycopg2
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT, ISOLATION_LEVEL_REPEATABLE_READ
+
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+
+_logger = logging.getLogger(__name__)
+
+
+class AnalyticsIndexAdvisor(models.Model):
+    _name = 'analytics.index.advisor'
+    _description = 'Analytics Index Advisor'
+    _order = 'id desc'
+
+    name = fields.Char(required=True, default=lambda self: _('Index Advisor'))
+    date_analyzed = fields.Datetime(string='Analyzed On', readonly=True)
+    measure_execution = fields.Boolean(
+        string='Measure Execution Time',
+        help='Run EXPLAIN ANALYZE instead of a plain EXPLAIN. '
+             'The analytics queries are really executed, limited by the statement timeout.'
+    )
+    statement_timeout = fields.Integer(string='Statement Timeout (ms)', default=60000)
+    create_concurrently = fields.Boolean(
+        string='Create Concurrently',
+        default=True,
+        help='Build indexes with CREATE INDEX CONCURRENTLY after the current transaction is committed, '
+             'so the analytics tables stay writable while the indexes are built.'
+    )
+    line_ids = fields.One2many('analytics.index.advisor.line', 'advisor_id', string='Recommendations')
+    missing_count = fields.Integer(string='Missing Indexes', compute='_compute_missing_count')
+
+    @api.depends('line_ids.state')
+    def _compute_missing_count(self):
+        for record in self:
+            record.missing_count = len(record.line_ids.filtered(lambda l: l.state in ('missing', 'failed')))
+
+    @api.model
+    def _get_analytics_queries(self):
+        """Return the analytics queries to inspect.
+
+        Analytics modules extend this method and append dicts with the keys:
+            * name: label shown in the recommendations
+            * query: SQL statement (only SELECT statements are supported)
+            * params: parameters of the query
+            * indexes: list of dicts with 'table', 'columns' and optional 'where'
+        """
+        return []
+
+    def action_analyze(self):
+        """Explain every registered query and report missing indexes"""
+        self.ensure_one()
+        lines = []
+        for query in self._get_analytics_queries():
+            indexes = [index for index in query['indexes'] if self._table_exists(index['table'])]
+            if not indexes:
+                continue
+
+            plan, cost, duration = self._explain(query['query'], query.get('params'))
+            seq_scanned = self._get_seq_scanned_tables(plan) if plan else set()
+
+            for index in indexes:
+                where = index.get('where') or ''
+                existing = self._find_covering_index(index['table'], index['columns'], where)
+                lines.append((0, 0, {
+                    'query_name': query['name'],
+                    'table_name': index['table'],
+                    'columns': ', '.join(index['columns']),
+                    'where_clause': where,
+                    'index_name': self._get_index_name(index['table'], index['columns'], where),
+                    'existing_index': existing or False,
+                    'seq_scan': index['table'] in seq_scanned,
+                    'state': 'present' if existing else 'missing',
+                    'cost_before': cost,
+                    'time_before': duration,
+                }))
+
+        self.line_ids.unlink()
+        self.write({
+            'line_ids': lines,
+            'date_analyzed': fields.Datetime.now(),
+        })
+        return True
+
+    def action_create_indexes(self):
+        """Create the missing recommended indexes"""
+        self.ensure_one()
+        lines = self.line_ids.filtered(lambda l: l.state in ('missing', 'failed'))
+        if not lines:
+            raise UserError(_("There are no missing indexes to create."))
+
+        if not self.create_concurrently:
+            for line in lines:
+                start = time.time()
+                try:
+                    with self.env.cr.savepoint():
+                        self.env.cr.execute(line._get_create_statement(concurrently=False))
+                    line.write({'state': 'created', 'build_time': (time.time() - start) * 1000, 'message': False})
+                except psycopg2.Error as e:
+                    line.write({'state': 'failed', 'message': str(e)})
+            lines._measure_after()
+            return True
+
+        # CREATE INDEX CONCURRENTLY cannot run inside a transaction block and waits for every
+        # transaction holding an older snapshot, including ours: build after the commit.
+        lines.write({'state': 'pending', 'message': False})
+        self.env.cr.postcommit.add(self._get_concurrent_builder(lines))
+
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Index creation scheduled'),
+                'message': _('%s index(es) will be built concurrently. Refresh the advisor to see the results.')
+                           % len(lines),
+                'sticky': False,
+                'type': 'info',
+            }
+        }
+
+    def _get_concurrent_builder(self, lines):
+        """Return a callback building the indexes of ``lines`` on an autocommit connection"""
+        registry = self.pool
+        uid = self.env.uid
+        statements = [(line.id, line.index_name, line._get_create_statement(concurrently=True)) for line in lines]
+
+        def build_indexes():
+            results = {}
+            with registry.cursor() as cr:
+                cr._cnx.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+                try:
+                    for line_id, index_name, statement in statements:
+                        start = time.time()
+                        try:
+                            # A failed concurrent build leaves an invalid index behind
+                            cr.execute("""
+                                SELECT 1 FROM pg_index i
+                                JOIN pg_class c ON c.oid = i.indexrelid
+                                WHERE c.relname = %s AND NOT i.indisvalid
+                            """, (index_name,))
+                            if cr.fetchone():
+                                cr.execute('DROP INDEX CONCURRENTLY IF EXISTS "%s"' % index_name)
+                            cr.execute(statement)
+                            results[line_id] = {'state': 'created', 'build_time': (time.time() - start) * 1000}
+                        except psycopg2.Error as e:
+                            _logger.warning("Failed to create index %s: %s", index_name, e)
+                            results[line_id] = {'state': 'failed', 'message': str(e)}
+                finally:
+                    cr._cnx.set_isolation_level(ISOLATION_LEVEL_REPEATABLE_READ)
+
+            with registry.cursor() as cr:
+                env = api.Environment(cr, uid, {})
+                for line_id, vals in results.items():
+                    env['analytics.index.advisor.line'].browse(line_id).write(vals)
+                env['analytics.index.advisor.line'].browse(
+                    [line_id for line_id, vals in results.items() if vals['state'] == 'created']
+                )._measure_after()
+
+        return build_indexes
+
+    @api.model
+    def _auto_provision_indexes(self):
+        """Analyze the registered queries and create missing indexes when enabled.
+
+        Called from the post-init hooks of the analytics modules; controlled by the
+        ``analytics_base.auto_provision_indexes`` system parameter.
+        """
+        param = self.env['ir.config_parameter'].sudo().get_param('analytics_base.auto_provision_indexes')
+        if not param or param.lower() in ('0', 'false'):
+            return False
+
+        advisor = self.create({'name': _('Install-time provisioning')})
+        advisor.action_analyze()
+        if advisor.missing_count:
+            advisor.action_create_indexes()
+        return advisor
+
+    def _explain(self, query, params=None):
+        """Return the plan, total cost and execution time (ms) of ``query``"""
+        self.ensure_one()
+        options = 'ANALYZE, FORMAT JSON' if self.measure_execution else 'FORMAT JSON'
+        try:
+            with self.env.cr.savepoint():
+                if self.measure_execution:
+                    self.env.cr.execute("SET LOCAL statement_timeout = %s", (self.statement_timeout,))
+                self.env.cr.execute("EXPLAIN (%s) %s" % (options, query), params or None)
+                explain = self.env.cr.fetchone()[0][0]
+                if self.measure_execution:
+                    self.env.cr.execute("SET LOCAL statement_timeout TO DEFAULT")
+        except psycopg2.Error as e:
+            _logger.warning("Could not explain analytics query: %s", e)
+            return None, 0.0, 0.0
+
+        plan = explain['Plan']
+        return plan, plan.get('Total Cost', 0.0), explain.get('Execution Time', 0.0)
+
+    @api.model
+    def _get_seq_scanned_tables(self, plan):
+        """Return the names of the tables read with a sequential scan in ``plan``"""
+        tables = set()
+        if plan.get('Node Type') == 'Seq Scan' and plan.get('Relation Name'):
+            tables.add(plan['Relation Name'])
+        for subplan in plan.get('Plans', []):
+            tables |= self._get_seq_scanned_tables(subplan)
+        return tables
+
+    @api.model
+    def _table_exists(self, table):
+        self.env.cr.execute("SELECT 1 FROM pg_class WHERE relname = %s AND relkind = 'r'", (table,))
+        return bool(self.env.cr.fetchone())
+
+    @api.model
+    def _get_equality_columns(self, where):
+        """Return the columns compared with a constant by the ``col = value`` terms of ``where``"""
+        return [
+            match.group(1)
+            for term in re.split(r'\s+AND\s+', where or '', flags=re.IGNORECASE)
+            for match in [re.match(r'^\s*\(?\s*"?(\w+)"?\s*=\s*[^=]', term)] if match
+        ]
+
+    @api.model
+    def _find_covering_index(self, table, columns, where=''):
+        """Return the name of a valid index usable instead of the recommended one, if any.
+
+        A full index covers the recommendation when its leading columns are the
+        recommended ones, possibly preceded by the columns the ``where`` condition of
+        a partial recommendation fixes, e.g. (model, res_id) for (res_id) WHERE model = 'x'.
+        """
+        index_name = self._get_index_name(table, columns, where)
+        equality_columns = [column for column in self._get_equality_columns(where) if column not in columns]
+        self.env.cr.execute("""
+            SELECT c.relname,
+                   ARRAY(
+                       SELECT a.attname
+                       FROM unnest(i.indkey::int2[]) WITH ORDINALITY AS k(attnum, ord)
+                       JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = k.attnum
+                       ORDER BY k.ord
+                   ) as index_columns,
+                   i.indpred IS NOT NULL as is_partial
+            FROM pg_index i
+            JOIN pg_class c ON c.oid = i.indexrelid
+            JOIN pg_class t ON t.oid = i.indrelid
+            WHERE t.relname = %s AND i.indisvalid
+        """, (table,))
+        for name, index_columns, is_partial in self.env.cr.fetchall():
+            if name == index_name:
+                return name
+            if is_partial:
+                continue
+            if list(index_columns[:len(columns)]) == list(columns):
+                return name
+            # Columns fixed by the condition may come first in any order
+            leading = len(equality_columns)
+            if (equality_columns and set(index_columns[:leading]) == set(equality_columns)
+                    and list(index_columns[leading:leading + len(columns)]) == list(columns)):
+                return name
+        return False
+
+    @api.model
+    def _get_index_name(self, table, columns, where=''):
+        suffix = 'partial_idx' if where else 'idx'
+        return ('%s_%s_%s' % (table, '_'.join(columns), suffix))[:63]
+
+
+class AnalyticsIndexAdvisorLine(models.Model):
+    _name = 'analytics.index.advisor.line'
+    _description = 'Analytics Index Recommendation'
+    _order = 'state, table_name, id'
+
+    advisor_id = fields.Many2one('analytics.index.advisor', required=True, ondelete='cascade')
+    query_name = fields.Char(string='Query', readonly=True)
+    table_name = fields.Char(string='Table', readonly=True)
+    columns = fields.Char(readonly=True)
+    where_clause = fields.Char(string='Condition', readonly=True)
+    index_name = fields.Char(readonly=True)
+    existing_index = fields.Char(string='Covered By', readonly=True)
+    seq_scan = fields.Boolean(string='Sequential Scan', readonly=True,
+                              help='The current plan reads this table with a sequential scan')
+    state = fields.Selection([
+        ('present', 'Present'),
+        ('missing', 'Missing'),
+        ('pending', 'Pending'),
+        ('created', 'Created'),
+        ('failed', 'Failed'),
+    ], readonly=True, default='missing')
+    cost_before = fields.Float(string='Cost Before', readonly=True)
+    cost_after = fields.Float(string='Cost After', readonly=True)
+    time_before = fields.Float(string='Time Before (ms)', readonly=True)
+    time_after = fields.Float(string='Time After (ms)', readonly=True)
+    build_time = fields.Float(string='Build Time (ms)', readonly=True)
+    message = fields.Text(readonly=True)
+
+    def _get_create_statement(self, concurrently=True):
+        self.ensure_one()
+        columns = ', '.join('"%s"' % column.strip() for column in self.columns.split(','))
+        statement = 'CREATE INDEX %sIF NOT EXISTS "%s" ON "%s" (%s)' % (
+            'CONCURRENTLY ' if concurrently else '', self.index_name, self.table_name, columns)
+        if self.where_clause:
+            statement += ' WHERE %s' % self.where_clause
+        return statement
+
+    def _measure_after(self):
+        """Explain the queries again and store the new cost and timing"""
+        queries = {query['name']: query for query in self.env['analytics.index.advisor']._get_analytics_queries()}
+        for advisor, lines in self._group_by_advisor().items():
+            for query_name in set(lines.mapped('query_name')):
+                query = queries.get(query_name)
+                if not query:
+                    continue
+                plan, cost, duration = advisor._explain(query['query'], query.get('params'))
+                lines.filtered(lambda l: l.query_name == query_name).write({
+                    'cost_after': cost,
+                    'time_after': duration,
+                })
+
+    def _group_by_advisor(self):
+        result = {}
+        for line in self:
+            result.setdefault(line.advisor_id, self.browse())
+            result[line.advisor_id] |= line
+        return result
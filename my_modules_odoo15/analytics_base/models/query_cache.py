@@ -0,0 +1,145 @@
+import json
+import hashlib
+import logging
+from datetime import timedelta
+
+import psycopg2
+
+from odoo import models, fields, api, _
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 24 * 60 * 60  # seconds
+DEFAULT_MAX_SIZE = 256  # megabytes
+
+
+class AnalyticsQueryCache(models.Model):
+    _name = 'analytics.query.cache'
+    _description = 'Analytics Query Cache'
+    _order = 'last_used desc'
+
+    name = fields.Char(string='Dataset', readonly=True)
+    fingerprint = fields.Char(required=True, index=True, readonly=True)
+    change_marker = fields.Char(readonly=True)
+    data = fields.Binary(attachment=True, readonly=True)
+    metadata = fields.Text(readonly=True)
+    size = fields.Integer(string='Size (bytes)', readonly=True)
+    hit_count = fields.Integer(string='Hits', readonly=True)
+    last_used = fields.Datetime(readonly=True, default=fields.Datetime.now)
+
+    _sql_constraints = [
+        ('fingerprint_uniq', 'unique(fingerprint)', 'A query result can only be cached once.'),
+    ]
+
+    @api.model
+    def _get_ttl(self):
+        return int(self.env['ir.config_parameter'].sudo().get_param('analytics_base.cache_ttl', DEFAULT_TTL))
+
+    @api.model
+    def _get_max_size(self):
+        max_size = self.env['ir.config_parameter'].sudo().get_param('analytics_base.cache_max_size', DEFAULT_MAX_SIZE)
+        return int(max_size) * 1024 * 1024
+
+    @api.model
+    def _get_fingerprint(self, name, query, params=None):
+        """Identify a dataset by its producer, SQL text and parameters"""
+        payload = json.dumps([name, ' '.join(query.split()), list(params or [])], default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    @api.model
+    def _get_change_marker(self, cr, tables):
+        """Summarize the state of the source tables.
+
+        ``tables`` maps a table name to aggregate expressions which change when rows are
+        added, modified or deleted, e.g. ``{'sale_order': ['MAX(id)', 'MAX(write_date)', 'COUNT(*)']}``.
+        Keep them cheap: MAX(id) is answered by the primary key index, but only
+        COUNT(*) notices deleted rows. ``cr`` is the
+        cursor the dataset is read from, so a replica is compared with itself.
+        """
+        parts = []
+        for table, expressions in sorted(tables.items()):
+            cr.execute('SELECT %s FROM "%s"' % (', '.join(expressions), table))
+            parts.append('%s:%s' % (table, ','.join(str(value) for value in cr.fetchone())))
+        return ';'.join(parts)
+
+    @api.model
+    def _lookup(self, fingerprint, change_marker):
+        """Return (data, metadata) of a valid cached dataset, or None"""
+        ttl = self._get_ttl()
+        if not ttl:
+            return None
+
+        entry = self.sudo().search([('fingerprint', '=', fingerprint)], limit=1)
+        if not entry:
+            return None
+        if entry.change_marker != change_marker or entry._is_expired(ttl):
+            entry.unlink()
+            return None
+
+        entry.write({
+            'hit_count': entry.hit_count + 1,
+            'last_used': fields.Datetime.now(),
+        })
+        return entry.data, json.loads(entry.metadata or '{}')
+
+    @api.model
+    def _store(self, name, fingerprint, change_marker, data, metadata=None):
+        """Cache a base64 encoded dataset and evict entries beyond the size budget"""
+        if not self._get_ttl():
+            return False
+        size = len(data)
+        if size > self._get_max_size():
+            _logger.info("Dataset %s (%s bytes) exceeds the analytics cache size, not cached", name, size)
+            return False
+
+        self.sudo().search([('fingerprint', '=', fingerprint)]).unlink()
+        try:
+            with self.env.cr.savepoint():
+                self.sudo().create({
+                    'name': name,
+                    'fingerprint': fingerprint,
+                    'change_marker': change_marker,
+                    'data': data,
+                    'metadata': json.dumps(metadata or {}, default=str),
+                    'size': size,
+                })
+        except psycopg2.IntegrityError:
+            # Another worker cached the same dataset concurrently
+            return False
+
+        self._evict()
+        return True
+
+    @api.model
+    def _invalidate(self, name=None):
+        """Drop the cached datasets of ``name``, or the whole cache"""
+        domain = [('name', '=', name)] if name else []
+        self.sudo().search(domain).unlink()
+
+    @api.model
+    def _evict(self):
+        """Remove expired entries, then the least recently used ones beyond the size budget"""
+        self._gc_expired()
+
+        max_size = self._get_max_size()
+        total = 0
+        to_remove = self.sudo().browse()
+        for entry in self.sudo().search([], order='last_used desc'):
+            total += entry.size
+            if total > max_size:
+                to_remove |= entry
+        to_remove.unlink()
+
+    @api.autovacuum
+    def _gc_expired(self):
+        ttl = self._get_ttl()
+        limit = fields.Datetime.now() - timedelta(seconds=ttl)
+        self.sudo().search([('create_date', '<', limit)]).unlink()
+
+    def _is_expired(self, ttl):
+        self.ensure_one()
+        return self.create_date < fields.Datetime.now() - timedelta(seconds=ttl)
+
+    def action_invalidate(self):
+        self.unlink()
+        return {'type': 'ir.actions.client', 'tag': 'reload'}
@@ -16,6 +16,8 @@ This module adds customer success prediction functionality:
         * Historical sales analysis
         * Success rate prediction
         * Customer activity visualization
+        * Batch analysis of many partners at once
+        * Nightly refresh of time-relative partner metrics
 """,
     "version": "15.0.1.0.0",
     "author": "Serhii Miroshnychenko",
@@ -23,14 +25,16 @@ This module adds customer success prediction functionality:
     "license": "OPL-1",
     "category": "Sales/CRM",
     "depends": [
-        "sale_crm", "web",
+        "sale_crm", "web", "analytics_base",
     ],
     "data": [
         "security/ir.model.access.csv",
+        "data/ir_cron.xml",
         "views/res_partner_views.xml",
         "views/data_collection_views.xml",
         "views/menu_views.xml",
         "views/partner_analysis_views.xml",
+        "views/partner_analysis_batch_views.xml",
     ],
     "assets": {},
     "external_dependencies": {
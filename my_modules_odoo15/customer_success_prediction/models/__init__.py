@@ -1,3 +1,4 @@
 from . import partner
 from . import data_collection
 from . import partner_analysis
+from . import partner_analysis_batch
@@ -16,6 +16,7 @@ from odoo.exceptions import UserError
 
 class CustomerDataCollection(models.Model):
     _name = 'customer.data.collection'
+    _inherit = ['analytics.chart.mixin']
     _description = 'Customer Data Collection'
 
     name = fields.Char(required=True)
@@ -381,6 +382,22 @@ class CustomerDataCollection(models.Model):
         except Exception as e:
             raise UserError(_('Error creating charts: %s') % str(e))
 
+    def _get_full_resolution_charts(self):
+        """Add the charts drawn by action_visualize to the computed ones"""
+        charts = super()._get_full_resolution_charts()
+        drawn = self.with_context(bin_size=True)
+        record = self.with_context(chart_profile='full')
+        if drawn.amount_success_chart:
+            amount_success_data = record._prepare_amount_success_data()
+            if amount_success_data:
+                charts['amount_success_chart'] = record._create_amount_success_chart(amount_success_data)
+        if drawn.partner_age_success_chart:
+            partner_age_success_data = record._prepare_partner_age_success_data()
+            if partner_age_success_data:
+                charts['partner_age_success_chart'] = record._create_partner_age_success_chart(
+                    partner_age_success_data)
+        return charts
+
     def action_visualize(self):
         """Create all visualization charts"""
         self.ensure_one()
@@ -570,8 +587,7 @@ class CustomerDataCollection(models.Model):
 
             # Зберігаємо графік
             buffer = BytesIO()
-            plt.savefig(buffer, format='png', bbox_inches='tight',
-                        dpi=100, pad_inches=0.2)
+            self._savefig(buffer, bbox_inches='tight', pad_inches=0.2)
             plt.close()
 
             return base64.b64encode(buffer.getvalue())
@@ -768,8 +784,7 @@ class CustomerDataCollection(models.Model):
 
             # Зберігаємо графік
             buffer = BytesIO()
-            plt.savefig(buffer, format='png', bbox_inches='tight',
-                        dpi=100, pad_inches=0.2)
+            self._savefig(buffer, bbox_inches='tight', pad_inches=0.2)
             plt.close()
 
             return base64.b64encode(buffer.getvalue())
@@ -1045,7 +1060,7 @@ class CustomerDataCollection(models.Model):
 
             # Save chart
             buffer = BytesIO()
-            plt.savefig(buffer, format='png', bbox_inches='tight', dpi=100)
+            self._savefig(buffer, bbox_inches='tight')
             plt.close()
 
             return base64.b64encode(buffer.getvalue())
@@ -1101,7 +1116,7 @@ class CustomerDataCollection(models.Model):
 
             # Save the chart
             buffer = BytesIO()
-            plt.savefig(buffer, format='png', bbox_inches='tight')
+            self._savefig(buffer, bbox_inches='tight')
             plt.close()
 
             return base64.b64encode(buffer.getvalue())
@@ -1127,7 +1142,7 @@ class CustomerDataCollection(models.Model):
         plt.grid(True)
 
         buffer = BytesIO()
-        plt.savefig(buffer, format='png', bbox_inches='tight')
+        self._savefig(buffer, bbox_inches='tight')
         plt.close()
 
         return base64.b64encode(buffer.getvalue())
@@ -1277,7 +1292,7 @@ class CustomerDataCollection(models.Model):
 
                 # Save chart
                 buffer = BytesIO()
-                plt.savefig(buffer, format='png', bbox_inches='tight', dpi=300)
+                self._savefig(buffer, bbox_inches='tight')
                 plt.close()
                 record.cumulative_monthly_analysis_chart = base64.b64encode(buffer.getvalue())
 
@@ -1288,8 +1303,7 @@ class CustomerDataCollection(models.Model):
             finally:
                 plt.close('all')
 
-    @staticmethod
-    def _create_chart(months, orders_data, successful_data, rate_data):
+    def _create_chart(self, months, orders_data, successful_data, rate_data):
         """Helper function for creating combined chart with three metrics"""
         try:
             # Create figure with primary axis
@@ -1334,7 +1348,7 @@ class CustomerDataCollection(models.Model):
 
             # Save chart
             buffer = BytesIO()
-            fig.savefig(buffer, format='png', bbox_inches='tight', dpi=300)
+            self._savefig(buffer, fig, bbox_inches='tight')
             plt.close()
 
             return base64.b64encode(buffer.getvalue())
@@ -1383,7 +1397,7 @@ class CustomerDataCollection(models.Model):
 
             # Save to buffer
             buffer = BytesIO()
-            fig.savefig(buffer, format='png', bbox_inches='tight', dpi=300)
+            self._savefig(buffer, fig, bbox_inches='tight')
             plt.close()
 
             return base64.b64encode(buffer.getvalue())
@@ -1443,7 +1457,7 @@ class CustomerDataCollection(models.Model):
 
             # Save chart
             buffer = BytesIO()
-            plt.savefig(buffer, format='png', bbox_inches='tight', dpi=100)
+            self._savefig(buffer, bbox_inches='tight')
             plt.close()
 
             return base64.b64encode(buffer.getvalue())
@@ -1502,7 +1516,7 @@ class CustomerDataCollection(models.Model):
 
             # Save chart
             buffer = BytesIO()
-            plt.savefig(buffer, format='png', bbox_inches='tight', dpi=100)
+            self._savefig(buffer, bbox_inches='tight')
             plt.close()
 
             return base64.b64encode(buffer.getvalue())
@@ -1717,8 +1731,7 @@ class CustomerDataCollection(models.Model):
 
             # Зберігаємо графік
             buffer = BytesIO()
-            plt.savefig(buffer, format='png', bbox_inches='tight',
-                        dpi=100, pad_inches=0.2)
+            self._savefig(buffer, bbox_inches='tight', pad_inches=0.2)
             plt.close()
 
             return base64.b64encode(buffer.getvalue())
@@ -1933,8 +1946,7 @@ class CustomerDataCollection(models.Model):
 
             # Зберігаємо графік
             buffer = BytesIO()
-            plt.savefig(buffer, format='png', bbox_inches='tight',
-                        dpi=100, pad_inches=0.2)
+            self._savefig(buffer, bbox_inches='tight', pad_inches=0.2)
             plt.close()
 
             return base64.b64encode(buffer.getvalue())
@@ -2072,8 +2084,7 @@ class CustomerDataCollection(models.Model):
 
                 # Save the chart
                 buffer = BytesIO()
-                plt.savefig(buffer, format='png', bbox_inches='tight',
-                            dpi=100, pad_inches=0.2)
+                self._savefig(buffer, bbox_inches='tight', pad_inches=0.2)
                 plt.close()
 
                 record.cumulative_success_rate_chart = base64.b64encode(buffer.getvalue())
@@ -2198,8 +2209,7 @@ class CustomerDataCollection(models.Model):
 
                 # Save the chart
                 buffer = BytesIO()
-                plt.savefig(buffer, format='png', bbox_inches='tight',
-                            dpi=100, pad_inches=0.2)
+                self._savefig(buffer, bbox_inches='tight', pad_inches=0.2)
                 plt.close()
 
                 record.order_intensity_success_chart = base64.b64encode(buffer.getvalue())
@@ -2325,8 +2335,7 @@ class CustomerDataCollection(models.Model):
 
                 # Save the chart
                 buffer = BytesIO()
-                plt.savefig(buffer, format='png', bbox_inches='tight',
-                            dpi=100, pad_inches=0.2)
+                self._savefig(buffer, bbox_inches='tight', pad_inches=0.2)
                 plt.close()
 
                 record.success_order_intensity_chart = base64.b64encode(buffer.getvalue())
@@ -2458,8 +2467,7 @@ class CustomerDataCollection(models.Model):
 
                 # Save the chart
                 buffer = BytesIO()
-                plt.savefig(buffer, format='png', bbox_inches='tight',
-                            dpi=100, pad_inches=0.2)
+                self._savefig(buffer, bbox_inches='tight', pad_inches=0.2)
                 plt.close()
 
                 record.amount_intensity_success_chart = base64.b64encode(buffer.getvalue())
@@ -2591,8 +2599,7 @@ class CustomerDataCollection(models.Model):
 
                 # Save the chart
                 buffer = BytesIO()
-                plt.savefig(buffer, format='png', bbox_inches='tight',
-                            dpi=100, pad_inches=0.2)
+                self._savefig(buffer, bbox_inches='tight', pad_inches=0.2)
                 plt.close()
 
                 record.success_amount_intensity_chart = base64.b64encode(buffer.getvalue())
@@ -2683,8 +2690,7 @@ class CustomerDataCollection(models.Model):
 
                 # Save the chart
                 buffer = BytesIO()
-                plt.savefig(buffer, format='png', bbox_inches='tight',
-                            dpi=100, pad_inches=0.2)
+                self._savefig(buffer, bbox_inches='tight', pad_inches=0.2)
                 plt.close()
 
                 record.monthly_success_rate_chart = base64.b64encode(buffer.getvalue())
@@ -2799,8 +2805,7 @@ class CustomerDataCollection(models.Model):
 
                 # Save the chart
                 buffer = BytesIO()
-                plt.savefig(buffer, format='png', bbox_inches='tight',
-                            dpi=100, pad_inches=0.2)
+                self._savefig(buffer, bbox_inches='tight', pad_inches=0.2)
                 plt.close()
 
                 record.monthly_volume_success_chart = base64.b64encode(buffer.getvalue())
@@ -2926,8 +2931,7 @@ class CustomerDataCollection(models.Model):
 
                 # Save the chart
                 buffer = BytesIO()
-                plt.savefig(buffer, format='png', bbox_inches='tight',
-                            dpi=100, pad_inches=0.2)
+                self._savefig(buffer, bbox_inches='tight', pad_inches=0.2)
                 plt.close()
 
                 record.monthly_orders_success_chart = base64.b64encode(buffer.getvalue())
@@ -3022,8 +3026,7 @@ class CustomerDataCollection(models.Model):
 
                 # Save the chart
                 buffer = BytesIO()
-                plt.savefig(buffer, format='png', bbox_inches='tight',
-                            dpi=100, pad_inches=0.2)
+                self._savefig(buffer, bbox_inches='tight', pad_inches=0.2)
                 plt.close()
 
                 record.payment_term_success_chart = base64.b64encode(buffer.getvalue())
@@ -3124,7 +3127,7 @@ class CustomerDataCollection(models.Model):
 
                 # Save chart
                 buffer = BytesIO()
-                plt.savefig(buffer, format='png', bbox_inches='tight', dpi=300)
+                self._savefig(buffer, bbox_inches='tight')
                 plt.close()
                 record.monthly_analysis_scatter_chart = base64.b64encode(buffer.getvalue())
                 print(f"Chart: {record.monthly_analysis_scatter_chart}")
@@ -3246,7 +3249,7 @@ class CustomerDataCollection(models.Model):
 
             # Save to binary field
             buffer = BytesIO()
-            plt.savefig(buffer, format='png', bbox_inches='tight')
+            self._savefig(buffer, bbox_inches='tight')
             plt.close()
             self.monthly_combined_chart = base64.b64encode(buffer.getvalue())
 
@@ -3381,7 +3384,7 @@ class CustomerDataCollection(models.Model):
 
             # Save to binary field
             buffer = BytesIO()
-            plt.savefig(buffer, format='png', bbox_inches='tight')
+            self._savefig(buffer, bbox_inches='tight')
             plt.close()
             self.relative_age_success_chart = base64.b64encode(buffer.getvalue())
 
@@ -3473,7 +3476,7 @@ class CustomerDataCollection(models.Model):
 
             # Зберігаємо графік
             buffer = BytesIO()
-            plt.savefig(buffer, format='png', dpi=300, bbox_inches='tight')
+            self._savefig(buffer, bbox_inches='tight')
             plt.close()
 
             # Конвертуємо в base64
@@ -3547,7 +3550,7 @@ class CustomerDataCollection(models.Model):
 
             # Зберігаємо графік
             buffer = BytesIO()
-            plt.savefig(buffer, format='png', dpi=300, bbox_inches='tight')
+            self._savefig(buffer, bbox_inches='tight')
             plt.close()
 
             # Конвертуємо в base64
@@ -3643,7 +3646,7 @@ class CustomerDataCollection(models.Model):
 
             # Зберігаємо графік
             buffer = BytesIO()
-            plt.savefig(buffer, format='png', dpi=300, bbox_inches='tight')
+            self._savefig(buffer, bbox_inches='tight')
             plt.close()
 
             # Конвертуємо в base64
@@ -3739,7 +3742,7 @@ class CustomerDataCollection(models.Model):
 
             # Зберігаємо графік
             buffer = BytesIO()
-            plt.savefig(buffer, format='png', dpi=300, bbox_inches='tight')
+            self._savefig(buffer, bbox_inches='tight')
             plt.close()
 
             # Конвертуємо в base64
@@ -3830,7 +3833,7 @@ class CustomerDataCollection(models.Model):
 
             # Зберігаємо графік
             buffer = BytesIO()
-            plt.savefig(buffer, format='png', dpi=300, bbox_inches='tight')
+            self._savefig(buffer, bbox_inches='tight')
             plt.close()
 
             # Конвертуємо в base64
@@ -3922,7 +3925,7 @@ class CustomerDataCollection(models.Model):
 
             # Зберігаємо графік
             buffer = BytesIO()
-            plt.savefig(buffer, format='png', dpi=300, bbox_inches='tight')
+            self._savefig(buffer, bbox_inches='tight')
             plt.close()
 
             # Конвертуємо в base64
@@ -4038,7 +4041,7 @@ class CustomerDataCollection(models.Model):
 
                 # Зберігаємо графік
                 buffer = BytesIO()
-                plt.savefig(buffer, format='png', dpi=300, bbox_inches='tight')
+                self._savefig(buffer, bbox_inches='tight')
                 plt.close()
 
                 # Конвертуємо в base64
@@ -4156,7 +4159,7 @@ class CustomerDataCollection(models.Model):
 
                 # Зберігаємо графік
                 buffer = BytesIO()
-                plt.savefig(buffer, format='png', dpi=300, bbox_inches='tight')
+                self._savefig(buffer, bbox_inches='tight')
                 plt.close()
 
                 # Конвертуємо в base64
@@ -4282,7 +4285,7 @@ class CustomerDataCollection(models.Model):
 
                 # Зберігаємо графік
                 buffer = BytesIO()
-                plt.savefig(buffer, format='png', dpi=300, bbox_inches='tight')
+                self._savefig(buffer, bbox_inches='tight')
                 plt.close()
 
                 # Конвертуємо в base64
@@ -4408,7 +4411,7 @@ class CustomerDataCollection(models.Model):
 
                 # Зберігаємо графік
                 buffer = BytesIO()
-                plt.savefig(buffer, format='png', dpi=300, bbox_inches='tight')
+                self._savefig(buffer, bbox_inches='tight')
                 plt.close()
 
                 # Конвертуємо в base64
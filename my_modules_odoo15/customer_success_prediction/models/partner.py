@@ -6,15 +6,17 @@ matplotlib.use('Agg')  # Install backend before importing pyplot
 from io import BytesIO
 from datetime import datetime
 import matplotlib.pyplot as plt
-from collections import defaultdict
 
 from odoo import models, fields, api, Command
+from odoo.tools import split_every
 
 _logger = logging.getLogger(__name__)
 
+CUSTOMER_SINCE_BATCH_SIZE = 10000
+
 
 class Partner(models.Model):
-    _inherit='res.partner'
+    _inherit = ['res.partner', 'analytics.chart.mixin']
 
     # Analytics fields
     successful_order = fields.Float(compute='_compute_orders_statistics')
@@ -80,29 +82,70 @@ class Partner(models.Model):
         self._compute_orders_statistics()
         self._compute_charts()
 
+    def _get_orders_statistics(self):
+        """Return {partner id: order statistics} of the whole recordset.
+
+        Like ``action_view_sale_order``, the orders of a partner include the orders
+        of all its contacts. They are aggregated with a single grouped query and
+        rolled up to every partner of the recordset along ``parent_path``.
+        """
+        statistics = {
+            partner_id: {'order_ids': [], 'count': 0, 'successful_count': 0,
+                         'amount': 0.0, 'successful_amount': 0.0}
+            for partner_id in self.ids
+        }
+        if not statistics:
+            return statistics
+
+        all_partners = self.with_context(active_test=False).search([('id', 'child_of', self.ids)])
+        ancestors = {
+            partner.id: [int(ancestor_id) for ancestor_id in partner.parent_path.split('/')[:-1]
+                         if int(ancestor_id) in statistics]
+            for partner in all_partners
+        }
+
+        groups = self.env['sale.order'].read_group(
+            [('partner_id', 'in', all_partners.ids)],
+            ['partner_id', 'state', 'amount_total:sum', 'order_ids:array_agg(id)'],
+            ['partner_id', 'state'],
+            lazy=False,
+        )
+        for group in groups:
+            successful = group['state'] == 'sale'
+            amount = group['amount_total'] or 0.0
+            for partner_id in ancestors.get(group['partner_id'][0], []):
+                partner_statistics = statistics[partner_id]
+                partner_statistics['order_ids'] += group['order_ids']
+                partner_statistics['count'] += group['__count']
+                partner_statistics['amount'] += amount
+                if successful:
+                    partner_statistics['successful_count'] += group['__count']
+                    partner_statistics['successful_amount'] += amount
+        return statistics
+
     def _compute_all_orders(self):
+        statistics = self._get_orders_statistics()
         for partner in self:
-            domain = partner.action_view_sale_order().get('domain')
-            if domain:
-                orders = self.env['sale.order'].search(domain)
-            else:
-                orders = partner.sale_order_ids
+            order_ids = statistics[partner.id]['order_ids'] if partner.id in statistics else []
             partner.update({
-                'all_order_ids': [Command.set(orders.ids)]
+                'all_order_ids': [Command.set(order_ids)]
             })
 
     @api.depends('sale_order_ids', 'sale_order_ids.state')
     def _compute_orders_statistics(self):
+        statistics = self._get_orders_statistics()
         for partner in self:
-            orders = partner.all_order_ids
-            completed_orders = orders.filtered(lambda o: o.state == 'sale')
-            partner.successful_order = (len(completed_orders) / len(orders)) if orders else 0
-            partner.total_orders_amount = sum(order.amount_total for order in orders)
-            partner.successful_orders_amount = sum(order.amount_total for order in completed_orders)
+            partner_statistics = statistics.get(partner.id)
+            count = partner_statistics['count'] if partner_statistics else 0
+            successful_count = partner_statistics['successful_count'] if partner_statistics else 0
+            failed_count = count - successful_count
+            partner.successful_order = (successful_count / count) if count else 0
+            partner.total_orders_amount = partner_statistics['amount'] if partner_statistics else 0
+            partner.successful_orders_amount = partner_statistics['successful_amount'] if partner_statistics else 0
             partner.failed_orders_amount = partner.total_orders_amount - partner.successful_orders_amount
-            partner.average_order_amount = partner.total_orders_amount / len(orders) if orders else 0
-            partner.average_successful_amount = partner.successful_orders_amount / len(completed_orders) if completed_orders else 0
-            partner.average_failed_amount = partner.failed_orders_amount / (len(orders) - len(completed_orders)) if (len(orders) - len(completed_orders)) else 0
+            partner.average_order_amount = partner.total_orders_amount / count if count else 0
+            partner.average_successful_amount = partner.successful_orders_amount / successful_count if successful_count else 0
+            partner.average_failed_amount = partner.failed_orders_amount / failed_count if failed_count else 0
 
     @api.depends('sale_order_ids', 'sale_order_ids.date_order')
     def _compute_customer_since(self):
@@ -124,100 +167,124 @@ class Partner(models.Model):
             delta = datetime.now() - first_order_date
             partner.customer_since = round(delta.days / 365.25, 2)  # враховуємо високосні роки
 
+    @api.model
+    def _cron_refresh_customer_since(self):
+        """Recompute customer_since of all partners directly in SQL.
+
+        The value depends on the current date, so the stored field goes stale
+        without any change to the orders. First order dates are read with one
+        grouped query and changed values written in batches of
+        ``UPDATE ... FROM (VALUES ...)``, without loading any order.
+        """
+        self.env['sale.order'].flush(['partner_id', 'date_order'])
+        self.flush(['customer_since'])
+        cr = self.env.cr
+
+        cr.execute("""
+            SELECT partner_id, MIN(date_order)
+            FROM sale_order
+            WHERE date_order IS NOT NULL
+            GROUP BY partner_id
+        """)
+        now = datetime.now()
+        values = [
+            (partner_id, round((now - first_order_date).days / 365.25, 2))  # враховуємо високосні роки
+            for partner_id, first_order_date in cr.fetchall()
+        ]
+
+        updated = 0
+        for batch in split_every(CUSTOMER_SINCE_BATCH_SIZE, values):
+            cr.execute("""
+                UPDATE res_partner AS partner
+                SET customer_since = v.customer_since
+                FROM (VALUES %s) AS v(id, customer_since)
+                WHERE partner.id = v.id
+                  AND partner.customer_since IS DISTINCT FROM v.customer_since
+            """ % ', '.join(['(%s, %s::float8)'] * len(batch)),
+                [value for row in batch for value in row])
+            updated += cr.rowcount
+
+        # Partners whose orders were all removed
+        cr.execute("""
+            UPDATE res_partner AS partner
+            SET customer_since = 0
+            WHERE partner.customer_since IS DISTINCT FROM 0
+              AND NOT EXISTS (
+                  SELECT 1 FROM sale_order
+                  WHERE sale_order.partner_id = partner.id AND sale_order.date_order IS NOT NULL
+              )
+        """)
+        updated += cr.rowcount
+
+        self.invalidate_cache(['customer_since'])
+        _logger.info("Refreshed customer_since of %s partners", updated)
+
+    def _get_monthly_statistics(self):
+        """Return the monthly order statistics of the partner, or None without dated orders.
+
+        Orders are bucketed by month with numpy ``datetime64[M]`` and every
+        statistic is aggregated with one ``bincount`` per series.
+        """
+        self.ensure_one()
+        orders = self.all_order_ids.filtered(lambda o: o.date_order)
+        if not orders:
+            return None
+
+        months = np.array(orders.mapped('date_order'), dtype='datetime64[M]')
+        amounts = np.array(orders.mapped('amount_total'), dtype=float)
+        completed = np.array([state == 'sale' for state in orders.mapped('state')], dtype=float)
+
+        # Unique months come sorted chronologically
+        unique_months, month_index = np.unique(months, return_inverse=True)
+        totals = np.bincount(month_index)
+        completed_counts = np.bincount(month_index, weights=completed)
+        total_amounts = np.bincount(month_index, weights=amounts)
+
+        return {
+            'months': [f'{month[5:7]}/{month[:4]}' for month in np.datetime_as_string(unique_months, unit='M')],
+            'orders': totals.tolist(),
+            'completed': completed_counts.astype(int).tolist(),
+            'rate': (completed_counts / totals * 100).tolist(),
+            'avg_amount': (total_amounts / totals).tolist(),
+            'amount': total_amounts.tolist(),
+        }
+
     def _compute_charts(self):
-        _logger.info("Starting _compute_charts")
+        chart_fields = ['orders_chart_bar', 'orders_chart_line', 'success_avg_chart', 'success_total_chart']
         for partner in self:
             try:
-                _logger.info(f"Processing partner {partner.id}")
-                # Get orders data
-                orders = partner.all_order_ids.filtered(lambda o: o.date_order)
-                _logger.info(f"Found {len(orders)} orders with dates")
-
-                if not orders:
-                    partner.orders_chart_bar = False
-                    partner.orders_chart_line = False
-                    partner.success_avg_chart = False
-                    partner.success_total_chart = False
+                monthly = partner._get_monthly_statistics()
+                if not monthly:
+                    partner.update(dict.fromkeys(chart_fields, False))
                     continue
 
-                # Prepare data by month
-                monthly_data = defaultdict(lambda: {'total': 0, 'completed': 0, 'rate': 0, 'amount': 0.0, 'completed_amount': 0.0})
-
-                for order in orders:
-                    month_key = order.date_order.strftime('%m/%Y')
-                    monthly_data[month_key]['total'] += 1
-                    monthly_data[month_key]['amount'] += order.amount_total
-                    if order.state == 'sale':
-                        monthly_data[month_key]['completed'] += 1
-                        monthly_data[month_key]['completed_amount'] += order.amount_total
-
-                _logger.info(f"Processed data by months: {dict(monthly_data)}")
-
-                # Calculate success rate and average amount for each month
-                for month, data in monthly_data.items():
-                    data['rate'] = (data['completed'] / data['total'] * 100) if data['total'] > 0 else 0
-                    data['avg_amount'] = data['amount'] / data['total'] if data['total'] > 0 else 0
-
-                # Sort months chronologically
-                months = sorted(monthly_data.keys(),
-                                key=lambda x: datetime.strptime(x, '%m/%Y'))
-
-                # Prepare data arrays
-                orders_data = [monthly_data[m]['total'] for m in months]
-                completed_data = [monthly_data[m]['completed'] for m in months]
-                rate_data = [monthly_data[m]['rate'] for m in months]
-                avg_amount_data = [monthly_data[m]['avg_amount'] for m in months]
-                total_amount_data = [monthly_data[m]['amount'] for m in months]
-
-                _logger.info(f"Prepared data arrays: months={months}, orders={orders_data}, completed={completed_data}, rate={rate_data}")
-
-                # Create bar chart
-                bar_chart = self._create_bar_chart(months, orders_data, completed_data, rate_data)
-                if bar_chart:
-                    partner.orders_chart_bar = bar_chart
-                    _logger.info("Bar chart created successfully")
-                else:
-                    _logger.error("Failed to create bar chart")
-
-                # Create line chart
-                line_chart = self._create_line_chart(months, orders_data, completed_data, rate_data)
-                if line_chart:
-                    partner.orders_chart_line = line_chart
-                    _logger.info("Line chart created successfully")
-                else:
-                    _logger.error("Failed to create line chart")
-
-                # Create success/average chart
-                success_avg_chart = self._create_success_avg_chart(months, rate_data, avg_amount_data)
-                if success_avg_chart:
-                    partner.success_avg_chart = success_avg_chart
-                    _logger.info("Success/average chart created successfully")
-                else:
-                    _logger.error("Failed to create success/average chart")
-
-                # Create success/total chart
-                success_total_chart = self._create_success_total_chart(months, rate_data, total_amount_data)
-                if success_total_chart:
-                    partner.success_total_chart = success_total_chart
-                    _logger.info("Success/total chart created successfully")
-                else:
-                    _logger.error("Failed to create success/total chart")
+                months = monthly['months']
+                # All charts are drawn on one figure, cleared between them
+                fig = plt.figure(figsize=(12, 7))
+                partner.update({
+                    'orders_chart_bar': self._create_bar_chart(
+                        fig, months, monthly['orders'], monthly['completed'], monthly['rate']),
+                    'orders_chart_line': self._create_line_chart(
+                        fig, months, monthly['orders'], monthly['completed'], monthly['rate']),
+                    'success_avg_chart': self._create_success_avg_chart(
+                        fig, months, monthly['rate'], monthly['avg_amount']),
+                    'success_total_chart': self._create_success_total_chart(
+                        fig, months, monthly['rate'], monthly['amount']),
+                })
 
             except Exception as e:
                 _logger.error(f"Error computing charts for partner {partner.id}: {str(e)}")
-                partner.orders_chart_bar = False
-                partner.orders_chart_line = False
-                partner.success_avg_chart = False
-                partner.success_total_chart = False
+                partner.update(dict.fromkeys(chart_fields, False))
+            finally:
+                plt.close('all')
 
-    @staticmethod
-    def _create_bar_chart(months, orders_data, successful_data, rate_data):
+    def _create_bar_chart(self, fig, months, orders_data, successful_data, rate_data):
         """Create bar chart with three metrics"""
         try:
-            plt.close('all')  # Close any existing plots
+            fig.clear()
 
-            # Create figure with primary axis
-            fig, ax1 = plt.subplots(figsize=(12, 7))
+            # Create primary axis
+            ax1 = fig.add_subplot()
 
             # Create second axis that shares x with ax1
             ax2 = ax1.twinx()
@@ -270,25 +337,21 @@ class Partner(models.Model):
 
             # Save to buffer
             buffer = BytesIO()
-            fig.savefig(buffer, format='png', bbox_inches='tight', dpi=300)
-            plt.close()
+            self._savefig(buffer, fig, bbox_inches='tight')
 
             return base64.b64encode(buffer.getvalue())
 
         except Exception as e:
             _logger.warning(f"Error creating chart: {str(e)}")
             return False
-        finally:
-            plt.close('all')
 
-    @staticmethod
-    def _create_line_chart(months, orders_data, successful_data, rate_data):
+    def _create_line_chart(self, fig, months, orders_data, successful_data, rate_data):
         """Create line chart with three metrics"""
         try:
-            plt.close('all')  # Close any existing plots
+            fig.clear()
 
-            # Create figure and axis objects with larger size
-            fig, ax1 = plt.subplots(figsize=(12, 7))
+            # Create axis objects
+            ax1 = fig.add_subplot()
             ax2 = ax1.twinx()
 
             # Create lines
@@ -319,25 +382,21 @@ class Partner(models.Model):
 
             # Convert plot to base64 image
             buffer = BytesIO()
-            plt.savefig(buffer, format='png', dpi=100, bbox_inches='tight')
-            plt.close('all')
+            self._savefig(buffer, fig, bbox_inches='tight')
 
             return base64.b64encode(buffer.getvalue())
 
         except Exception as e:
             _logger.error(f"Error creating line chart: {str(e)}")
             return False
-        finally:
-            plt.close('all')
 
-    @staticmethod
-    def _create_success_avg_chart(months, rate_data, avg_data):
+    def _create_success_avg_chart(self, fig, months, rate_data, avg_data):
         """Create line chart with success rate and average amount"""
         try:
-            plt.close('all')  # Close any existing plots
+            fig.clear()
 
-            # Create figure and axis objects with larger size
-            fig, ax1 = plt.subplots(figsize=(12, 7))
+            # Create axis objects
+            ax1 = fig.add_subplot()
             ax2 = ax1.twinx()
 
             # Create lines
@@ -367,25 +426,21 @@ class Partner(models.Model):
 
             # Convert plot to base64 image
             buffer = BytesIO()
-            plt.savefig(buffer, format='png', dpi=100, bbox_inches='tight')
-            plt.close('all')
+            self._savefig(buffer, fig, bbox_inches='tight')
 
             return base64.b64encode(buffer.getvalue())
 
         except Exception as e:
             _logger.error(f"Error creating success/average chart: {str(e)}")
             return False
-        finally:
-            plt.close('all')
 
-    @staticmethod
-    def _create_success_total_chart(months, rate_data, total_data):
+    def _create_success_total_chart(self, fig, months, rate_data, total_data):
         """Create line chart with success rate and total amount"""
         try:
-            plt.close('all')  # Close any existing plots
+            fig.clear()
 
-            # Create figure and axis objects with larger size
-            fig, ax1 = plt.subplots(figsize=(12, 7))
+            # Create axis objects
+            ax1 = fig.add_subplot()
             ax2 = ax1.twinx()
 
             # Create lines
@@ -415,13 +470,10 @@ class Partner(models.Model):
 
             # Convert plot to base64 image
             buffer = BytesIO()
-            plt.savefig(buffer, format='png', dpi=100, bbox_inches='tight')
-            plt.close('all')
+            self._savefig(buffer, fig, bbox_inches='tight')
 
             return base64.b64encode(buffer.getvalue())
 
         except Exception as e:
             _logger.error(f"Error creating success/total chart: {str(e)}")
             return False
-        finally:
-            plt.close('all')
@@ -2,7 +2,9 @@ import base64
 import csv
 import logging
 from datetime import datetime
+from itertools import groupby
 import matplotlib.pyplot as plt
+import numpy as np
 from io import StringIO, BytesIO
 
 from odoo import models, fields, api, _
@@ -12,6 +14,7 @@ _logger = logging.getLogger(__name__)
 
 class PartnerDataAnalysis(models.Model):
     _name = 'partner.data.analysis'
+    _inherit = ['analytics.chart.mixin']
     _description = 'Partner Data Analysis'
 
     name = fields.Char(compute='_compute_name', store=True)
@@ -130,6 +133,12 @@ class PartnerDataAnalysis(models.Model):
         if not orders_data:
             return False
 
+        self.write(self._get_csv_values(self.partner_id, orders_data))
+        return True
+
+    @api.model
+    def _get_csv_values(self, partner, orders_data):
+        """Return the data file values of ``partner`` orders"""
         # Prepare CSV data
         csv_data = [['order_id', 'date_order', 'state', 'amount_total']]
         for order in orders_data:
@@ -145,14 +154,125 @@ class PartnerDataAnalysis(models.Model):
         writer = csv.writer(csv_buffer)
         writer.writerows(csv_data)
 
-        # Convert to base64 and save
+        # Convert to base64
         csv_content = csv_buffer.getvalue().encode()
-        self.write({
+        return {
             'data_file': base64.b64encode(csv_content),
-            'data_filename': f'partner_analysis_{self.partner_id.id}_{self.partner_id.name}.csv',
-        })
-
-        return True
+            'data_filename': f'partner_analysis_{partner.id}_{partner.name}.csv',
+        }
+
+    @api.model
+    def _create_batch(self, partners):
+        """Create one analysis with statistics and charts per partner of ``partners``.
+
+        The orders of all partners are read with a single query and statistics and
+        monthly data are aggregated for all partners at once. Partners without
+        orders are skipped.
+        """
+        orders_by_partner = self._collect_batch_orders_data(partners.ids)
+        if not orders_by_partner:
+            return self.browse()
+
+        statistics = self._compute_batch_statistics(orders_by_partner)
+        monthly_data = self._compute_batch_monthly_data(orders_by_partner)
+
+        vals_list = []
+        for partner in partners.filtered(lambda p: p.id in orders_by_partner):
+            orders_data = orders_by_partner[partner.id]
+            vals = {
+                'partner_id': partner.id,
+                'amount_success_chart': self._create_amount_success_chart(
+                    self._prepare_amount_success_data(orders_data)),
+                'success_amount_chart': self._create_success_amount_chart(
+                    self._prepare_success_amount_data(orders_data)),
+            }
+            vals.update(self._get_csv_values(partner, orders_data))
+            vals.update(statistics[partner.id])
+            vals.update(self._render_monthly_charts(*monthly_data[partner.id]))
+            vals_list.append(vals)
+
+        # Stored values given at creation are not computed again
+        return self.create(vals_list)
+
+    @api.model
+    def _collect_batch_orders_data(self, partner_ids):
+        """Return {partner id: orders data} of ``partner_ids``, sorted by order date"""
+        if not partner_ids:
+            return {}
+
+        SaleOrder = self.env['sale.order']
+        SaleOrder.flush(['partner_id', 'date_order', 'state', 'amount_total'])
+        # Same orders as the search of the single partner flow: access rights,
+        # record rules and multi-company filtering apply
+        SaleOrder.check_access_rights('read')
+        query = SaleOrder._where_calc([('partner_id', 'in', list(partner_ids))])
+        SaleOrder._apply_ir_rules(query, 'read')
+        from_clause, where_clause, where_params = query.get_sql()
+        self.env.cr.execute("""
+            SELECT "sale_order".partner_id, "sale_order".id AS order_id, "sale_order".date_order,
+                   "sale_order".state, "sale_order".amount_total
+            FROM %s
+            WHERE %s
+            ORDER BY "sale_order".partner_id, "sale_order".date_order, "sale_order".id
+        """ % (from_clause, where_clause), where_params)
+
+        return {
+            partner_id: list(orders)
+            for partner_id, orders in groupby(self.env.cr.dictfetchall(), key=lambda row: row['partner_id'])
+        }
+
+    @api.model
+    def _compute_batch_statistics(self, orders_by_partner):
+        """Return {partner id: statistics values}, computed for all partners in one pass"""
+        partner_ids = list(orders_by_partner)
+        orders = [orders_by_partner[partner_id] for partner_id in partner_ids]
+
+        total_orders = np.array([len(partner_orders) for partner_orders in orders])
+        starts = np.r_[0, np.cumsum(total_orders)[:-1]]
+        rows = [row for partner_orders in orders for row in partner_orders]
+
+        # Orders are sorted by date, so the first order of a partner starts its group
+        first_dates = np.array([row['date_order'] for row in rows], dtype='datetime64[s]')[starts]
+        days = (np.datetime64(datetime.now(), 's') - first_dates) // np.timedelta64(1, 'D')
+        customer_since = np.round(days / 365.0, 2)
+
+        successful = np.add.reduceat(np.array([row['state'] == 'sale' for row in rows], dtype=int), starts)
+        success_rates = successful / total_orders
+
+        return {
+            partner_id: {
+                'customer_since': float(customer_since[index]),
+                'total_orders': int(total_orders[index]),
+                'successful_orders_rate': float(success_rates[index]),
+            }
+            for index, partner_id in enumerate(partner_ids)
+        }
+
+    @api.model
+    def _compute_batch_monthly_data(self, orders_by_partner):
+        """Return {partner id: (months, total orders, successful orders)} of all partners"""
+        rows = [row for partner_orders in orders_by_partner.values() for row in partner_orders]
+        partner_ids = np.array([row['partner_id'] for row in rows])
+        months = np.array([row['date_order'] for row in rows], dtype='datetime64[M]')
+        successful = np.array([row['state'] in ['sale', 'done'] for row in rows], dtype=int)
+
+        # Rows are sorted by partner and date: a group starts where the partner or the month changes
+        changes = (partner_ids[1:] != partner_ids[:-1]) | (months[1:] != months[:-1])
+        starts = np.r_[0, np.flatnonzero(changes) + 1]
+        totals = np.diff(np.r_[starts, len(rows)])
+        successful = np.add.reduceat(successful, starts)
+        group_partners = partner_ids[starts]
+        group_months = np.datetime_as_string(months[starts], unit='M')
+
+        result = {}
+        bounds = np.r_[np.flatnonzero(group_partners[1:] != group_partners[:-1]) + 1, len(starts)]
+        for start, end in zip(np.r_[0, bounds[:-1]], bounds):
+            result[int(group_partners[start])] = (
+                group_months[start:end].tolist(),
+                totals[start:end].tolist(),
+                successful[start:end].tolist(),
+            )
+        return result
 
     def action_compute_statistics(self):
         self._compute_statistics()
@@ -215,14 +335,16 @@ class PartnerDataAnalysis(models.Model):
             _logger.error(f"Error creating visualization: {str(e)}")
             raise UserError(_('Error creating visualization. Please check the logs.'))
 
-    def _prepare_amount_success_data(self):
-        """Prepare data for amount-success rate chart"""
+    def _read_csv_data(self):
+        """Return the rows of the data file as dicts"""
+        csv_content = base64.b64decode(self.data_file).decode('utf-8')
+        return list(csv.DictReader(StringIO(csv_content)))
+
+    def _prepare_amount_success_data(self, data=None):
+        """Prepare data for amount-success rate chart from ``data`` rows or the data file"""
         try:
-            # Read CSV data
-            csv_content = base64.b64decode(self.data_file).decode('utf-8')
-            csv_file = StringIO(csv_content)
-            reader = csv.DictReader(csv_file)
-            data = list(reader)
+            if data is None:
+                data = self._read_csv_data()
 
             # Get amount range
             amounts = [float(row['amount_total']) for row in data]
@@ -309,8 +431,7 @@ class PartnerDataAnalysis(models.Model):
 
             # Save the plot
             buffer = BytesIO()
-            plt.savefig(buffer, format='png', bbox_inches='tight',
-                        dpi=100, pad_inches=0.2)
+            self._savefig(buffer, bbox_inches='tight', pad_inches=0.2)
             plt.close()
 
             return base64.b64encode(buffer.getvalue())
@@ -320,14 +441,11 @@ class PartnerDataAnalysis(models.Model):
             return False
 
 
-    def _prepare_success_amount_data(self):
-        """Prepare data for success rate-amount chart"""
+    def _prepare_success_amount_data(self, data=None):
+        """Prepare data for success rate-amount chart from ``data`` rows or the data file"""
         try:
-            # Read CSV data
-            csv_content = base64.b64decode(self.data_file).decode('utf-8')
-            csv_file = StringIO(csv_content)
-            reader = csv.DictReader(csv_file)
-            data = list(reader)
+            if data is None:
+                data = self._read_csv_data()
 
             # Group orders by success rate ranges (0-10, 11-20, etc.)
             success_groups = {i: {'orders': [], 'total': 0, 'amount': 0}
@@ -401,7 +519,7 @@ class PartnerDataAnalysis(models.Model):
 
             # Save the plot
             buffer = BytesIO()
-            plt.savefig(buffer, format='png', bbox_inches='tight')
+            self._savefig(buffer, bbox_inches='tight')
             plt.close()
 
             return base64.b64encode(buffer.getvalue())
@@ -448,91 +566,84 @@ class PartnerDataAnalysis(models.Model):
                 # Prepare data for plotting
                 total_orders = [monthly_data[m]['total'] for m in months]
                 successful_orders = [monthly_data[m]['successful'] for m in months]
-                success_rates = [
-                    (monthly_data[m]['successful'] / monthly_data[m]['total'] * 100)
-                    for m in months
-                ]
-
-                # Calculate cumulative success rate and total orders
-                cumulative_total = 0
-                cumulative_successful = 0
-                cumulative_orders = []
-                cumulative_successful_orders = []
-                cumulative_rates = []
-                for m in months:
-                    cumulative_total += monthly_data[m]['total']
-                    cumulative_successful += monthly_data[m]['successful']
-                    cumulative_rates.append(
-                        (cumulative_successful / cumulative_total * 100)
-                    )
-                    cumulative_orders.append(cumulative_total)
-                    cumulative_successful_orders.append(cumulative_successful)
-
-                # Create monthly orders chart
-                plt.figure(figsize=(12, 6))
-                plt.scatter(months, total_orders, color='skyblue', label='Total Orders', s=50)
-                plt.scatter(months, successful_orders, color='gold', label='Successful Orders', s=50)
-                plt.xticks(rotation=45)
-                plt.xlabel('Month')
-                plt.ylabel('Number of Orders')
-                plt.title('Monthly Orders Analysis')
-                plt.legend()
-                plt.grid(True)
-                plt.tight_layout()
-
-                buffer = BytesIO()
-                plt.savefig(buffer, format='png')
-                plt.close()
-                record.monthly_orders_chart = base64.b64encode(buffer.getvalue())
-
-                # Create monthly success rate chart
-                plt.figure(figsize=(12, 6))
-                plt.plot(months, success_rates, marker='o', color='green')
-                plt.xticks(rotation=45)
-                plt.xlabel('Month')
-                plt.ylabel('Success Rate (%)')
-                plt.title('Monthly Success Rate')
-                plt.grid(True)
-                plt.tight_layout()
-
-                buffer = BytesIO()
-                plt.savefig(buffer, format='png')
-                plt.close()
-                record.monthly_success_rate_chart = base64.b64encode(buffer.getvalue())
-
-                # Create cumulative success rate chart
-                plt.figure(figsize=(12, 6))
-                plt.plot(months, cumulative_rates, marker='o', color='purple')
-                plt.xticks(rotation=45)
-                plt.xlabel('Month')
-                plt.ylabel('Cumulative Success Rate (%)')
-                plt.title('Cumulative Success Rate Over Time')
-                plt.grid(True)
-                plt.tight_layout()
-
-                buffer = BytesIO()
-                plt.savefig(buffer, format='png')
-                plt.close()
-                record.cumulative_success_rate_chart = base64.b64encode(buffer.getvalue())
-
-                # Create cumulative orders chart
-                plt.figure(figsize=(12, 6))
-                plt.plot(months, cumulative_orders, marker='o', color='blue', linewidth=2, label='Total Orders')
-                plt.plot(months, cumulative_successful_orders, marker='o', color='gold', linewidth=2,
-                         label='Successful Orders')
-                plt.xticks(rotation=45)
-                plt.xlabel('Month')
-                plt.ylabel('Number of Orders')
-                plt.title('Cumulative Orders Over Time')
-                plt.legend()
-                plt.grid(True)
-                plt.tight_layout()
-
-                buffer = BytesIO()
-                plt.savefig(buffer, format='png')
-                plt.close()
-                record.cumulative_orders_chart = base64.b64encode(buffer.getvalue())
+
+                record.update(record._render_monthly_charts(months, total_orders, successful_orders))
 
             except Exception as e:
                 _logger.error('Error computing monthly charts: %s', str(e))
                 continue
+
+    def _render_monthly_charts(self, months, total_orders, successful_orders):
+        """Return the monthly chart values of orders counted per month"""
+        success_rates = [
+            (successful / total * 100)
+            for total, successful in zip(total_orders, successful_orders)
+        ]
+
+        # Calculate cumulative success rate and total orders
+        cumulative_orders = np.cumsum(total_orders).tolist()
+        cumulative_successful_orders = np.cumsum(successful_orders).tolist()
+        cumulative_rates = [
+            (successful / total * 100)
+            for total, successful in zip(cumulative_orders, cumulative_successful_orders)
+        ]
+
+        # Create monthly orders chart
+        plt.figure(figsize=(12, 6))
+        plt.scatter(months, total_orders, color='skyblue', label='Total Orders', s=50)
+        plt.scatter(months, successful_orders, color='gold', label='Successful Orders', s=50)
+        plt.xticks(rotation=45)
+        plt.xlabel('Month')
+        plt.ylabel('Number of Orders')
+        plt.title('Monthly Orders Analysis')
+        plt.legend()
+        plt.grid(True)
+        plt.tight_layout()
+        monthly_orders_chart = self._render_chart()
+        plt.close()
+
+        # Create monthly success rate chart
+        plt.figure(figsize=(12, 6))
+        plt.plot(months, success_rates, marker='o', color='green')
+        plt.xticks(rotation=45)
+        plt.xlabel('Month')
+        plt.ylabel('Success Rate (%)')
+        plt.title('Monthly Success Rate')
+        plt.grid(True)
+        plt.tight_layout()
+        monthly_success_rate_chart = self._render_chart()
+        plt.close()
+
+        # Create cumulative success rate chart
+        plt.figure(figsize=(12, 6))
+        plt.plot(months, cumulative_rates, marker='o', color='purple')
+        plt.xticks(rotation=45)
+        plt.xlabel('Month')
+        plt.ylabel('Cumulative Success Rate (%)')
+        plt.title('Cumulative Success Rate Over Time')
+        plt.grid(True)
+        plt.tight_layout()
+        cumulative_success_rate_chart = self._render_chart()
+        plt.close()
+
+        # Create cumulative orders chart
+        plt.figure(figsize=(12, 6))
+        plt.plot(months, cumulative_orders, marker='o', color='blue', linewidth=2, label='Total Orders')
+        plt.plot(months, cumulative_successful_orders, marker='o', color='gold', linewidth=2,
+                 label='Successful Orders')
+        plt.xticks(rotation=45)
+        plt.xlabel('Month')
+        plt.ylabel('Number of Orders')
+        plt.title('Cumulative Orders Over Time')
+        plt.legend()
+        plt.grid(True)
+        plt.tight_layout()
+        cumulative_orders_chart = self._render_chart()
+        plt.close()
+
+        return {
+            'monthly_orders_chart': monthly_orders_chart,
+            'monthly_success_rate_chart': monthly_success_rate_chart,
+            'cumulative_success_rate_chart': cumulative_success_rate_chart,
+            'cumulative_orders_chart': cumulative_orders_chart,
+        }
@@ -0,0 +1,34 @@
+from odoo import models, fields, _
+from odoo.exceptions import UserError
+from odoo.tools.safe_eval import safe_eval
+
+
+class PartnerDataAnalysisBatch(models.TransientModel):
+    _name = 'partner.data.analysis.batch'
+    _description = 'Partner Data Analysis Batch'
+
+    partner_domain = fields.Char(
+        string='Partners',
+        default="[('customer_rank', '>', 0)]",
+        help='Partners to analyze; one analysis is created per partner with orders.',
+    )
+
+    def action_create_analyses(self):
+        """Create the analyses of all matching partners at once"""
+        self.ensure_one()
+
+        partners = self.env['res.partner'].search(safe_eval(self.partner_domain or '[]'))
+        if not partners:
+            raise UserError(_('No partners match the selected filter.'))
+
+        analyses = self.env['partner.data.analysis']._create_batch(partners)
+        if not analyses:
+            raise UserError(_('No orders found for the selected partners.'))
+
+        return {
+            'type': 'ir.actions.act_window',
+            'name': _('Partner Analysis'),
+            'res_model': 'partner.data.analysis',
+            'view_mode': 'tree,form',
+            'domain': [('id', 'in', analyses.ids)],
+        }
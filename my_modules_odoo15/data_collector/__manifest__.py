@@ -19,7 +19,7 @@ This module collects historical data
     "license": "OPL-1",
     "category": "Sales/CRM",
     "depends": [
-        "sale_crm", "web",
+        "sale_crm", "web", "analytics_base",
     ],
     "data": [
         "security/ir.model.access.csv",
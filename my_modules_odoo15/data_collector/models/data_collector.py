@@ -1,6 +1,7 @@
 import csv
 import base64
 import logging
+import os
 import matplotlib
 import matplotlib.pyplot as plt
 from matplotlib.lines import Line2D
@@ -23,6 +24,7 @@ _logger = logging.getLogger(__name__)
 
 class DataCollector(models.Model):
     _name = 'data.collector'
+    _inherit = ['analytics.chart.mixin', 'analytics.distribution.mixin']
     _description = 'Data Collector'
 
     name = fields.Char(required=True)
@@ -720,26 +722,13 @@ class DataCollector(models.Model):
                 print("Partners only in extended data:", len(extended_partners - partners))
 
             # Calculate success rate ranges
-            success_rate_ranges = defaultdict(int)
-            for partner_data in partners_success_rate.values():
-                success_rate = (partner_data['successful'] / partner_data['total'] * 100) if partner_data[
-                                                                                                 'total'] > 0 else 0
-
-                # Розподіляємо по діапазонах
-                if success_rate == 100:
-                    range_key = '100%'
-                elif success_rate >= 80:
-                    range_key = '80-99%'
-                elif success_rate >= 60:
-                    range_key = '60-79%'
-                elif success_rate >= 40:
-                    range_key = '40-59%'
-                elif success_rate >= 20:
-                    range_key = '20-39%'
-                else:
-                    range_key = '0-19%'
-
-                success_rate_ranges[range_key] += 1
+            totals = np.fromiter((data['total'] for data in partners_success_rate.values()), dtype=float)
+            successful = np.fromiter((data['successful'] for data in partners_success_rate.values()), dtype=float)
+            success_rates = np.divide(successful * 100, totals, out=np.zeros_like(totals), where=totals > 0)
+            success_rate_ranges = {
+                range_key: count
+                for range_key, count in record._get_success_rate_distribution(success_rates).items() if count
+            }
 
             # Update computed fields
             record.total_partners = len(partners)
@@ -758,10 +747,35 @@ class DataCollector(models.Model):
     def save_plot_to_binary(self, plt_figure, filename):
         """Зберігає графік matplotlib у бінарне поле"""
         buffer = BytesIO()
-        plt_figure.savefig(buffer, format='png', dpi=300, bbox_inches='tight')
+        chart_format = self._savefig(buffer, plt_figure, bbox_inches='tight')
         buffer.seek(0)
+        # Розширення файлу відповідає формату профілю графіків
+        filename = '%s.%s' % (os.path.splitext(filename)[0], chart_format)
         return base64.b64encode(buffer.getvalue()), filename
 
+    def _get_full_resolution_charts(self):
+        """Перемальовує збережені графіки з повним профілем.
+
+        Графіки будуються на новому записі-копії, тож збережені мініатюри не змінюються.
+        """
+        self.ensure_one()
+        # Збережені графіки, які вже побудовані, та графіки, що обчислюються при відкритті
+        chart_fields = [
+            name for name, field in self._fields.items()
+            if field.type == 'binary' and name not in ('data_file', 'extended_data_file')
+            and (self.with_context(bin_size=True)[name] if field.store else field.compute)
+        ]
+        record = self.with_context(chart_profile='full').new(origin=self)
+        if self.extended_data_file:
+            record.generate_analysis()
+            if 'customer_amount_success_distribution_plot' in chart_fields:
+                record.create_customer_amount_success_distribution_plot()
+        if self.data_file:
+            record.action_visualize()
+            for method in {self._fields[name].compute for name in chart_fields if self._fields[name].compute}:
+                getattr(record, method)()
+        return {name: record[name] for name in chart_fields}
+
     def analyze_discounts(self, df):
         """Аналіз впливу знижок на успішність замовлень"""
         fig, ax1 = plt.subplots(figsize=(10, 6))
@@ -2444,8 +2458,7 @@ class DataCollector(models.Model):
 
             # Зберігаємо графік
             buffer = BytesIO()
-            plt.savefig(buffer, format='png', bbox_inches='tight',
-                        dpi=100, pad_inches=0.2)
+            self._savefig(buffer, bbox_inches='tight', pad_inches=0.2)
             plt.close()
 
             return base64.b64encode(buffer.getvalue())
@@ -2642,8 +2655,7 @@ class DataCollector(models.Model):
 
             # Зберігаємо графік
             buffer = BytesIO()
-            plt.savefig(buffer, format='png', bbox_inches='tight',
-                        dpi=100, pad_inches=0.2)
+            self._savefig(buffer, bbox_inches='tight', pad_inches=0.2)
             plt.close()
 
             return base64.b64encode(buffer.getvalue())
@@ -2832,7 +2844,7 @@ class DataCollector(models.Model):
 
             # Save chart
             buffer = BytesIO()
-            plt.savefig(buffer, format='png', bbox_inches='tight', dpi=100)
+            self._savefig(buffer, bbox_inches='tight')
             plt.close()
 
             return base64.b64encode(buffer.getvalue())
@@ -2846,15 +2858,6 @@ class DataCollector(models.Model):
     def _create_partners_rate_chart(self, partner_success_rates):
         """Create bar chart showing distribution of partners by success rate ranges"""
         try:
-            # Define success rate ranges with specific order
-            success_ranges = [
-                ('0-20%', (0, 20)),
-                ('21-40%', (21, 40)),
-                ('41-60%', (41, 60)),
-                ('61-80%', (61, 80)),
-                ('81-100%', (81, 100))
-            ]
-
             # Generate green shades from light to dark
             green_shades = [
                 '#c8e6c9',  # Very light green
@@ -2865,16 +2868,9 @@ class DataCollector(models.Model):
             ]
 
             # Calculate distribution
-            distribution = defaultdict(int)
-            for rate in partner_success_rates.values():
-                for range_name, (min_val, max_val) in success_ranges:
-                    if min_val <= rate <= max_val:
-                        distribution[range_name] += 1
-                        break
-
-            # Create ordered dictionary for success rate ranges
-            ordered_distribution = {range_name: distribution.get(range_name, 0)
-                                    for range_name, _ in success_ranges}
+            ordered_distribution = self._get_success_rate_distribution(
+                np.fromiter(partner_success_rates.values(), dtype=float, count=len(partner_success_rates)),
+                chart=True)
 
             # Create the chart
             plt.figure(figsize=(12, 6))
@@ -2888,7 +2884,7 @@ class DataCollector(models.Model):
 
             # Save the chart
             buffer = BytesIO()
-            plt.savefig(buffer, format='png', bbox_inches='tight')
+            self._savefig(buffer, bbox_inches='tight')
             plt.close()
 
             return base64.b64encode(buffer.getvalue())
@@ -3044,7 +3040,7 @@ class DataCollector(models.Model):
 
                 # Save chart
                 buffer = BytesIO()
-                plt.savefig(buffer, format='png', bbox_inches='tight', dpi=300)
+                self._savefig(buffer, bbox_inches='tight')
                 plt.close()
                 record.cumulative_monthly_analysis_chart = base64.b64encode(buffer.getvalue())
 
@@ -3055,8 +3051,7 @@ class DataCollector(models.Model):
             finally:
                 plt.close('all')
 
-    @staticmethod
-    def _create_chart(months, orders_data, successful_data, rate_data):
+    def _create_chart(self, months, orders_data, successful_data, rate_data):
         """Helper function for creating combined chart with three metrics"""
         try:
             # Create figure with primary axis
@@ -3101,7 +3096,7 @@ class DataCollector(models.Model):
 
             # Save chart
             buffer = BytesIO()
-            fig.savefig(buffer, format='png', bbox_inches='tight', dpi=300)
+            self._savefig(buffer, fig, bbox_inches='tight')
             plt.close()
 
             return base64.b64encode(buffer.getvalue())
@@ -3150,7 +3145,7 @@ class DataCollector(models.Model):
 
             # Save to buffer
             buffer = BytesIO()
-            fig.savefig(buffer, format='png', bbox_inches='tight', dpi=300)
+            self._savefig(buffer, fig, bbox_inches='tight')
             plt.close()
 
             return base64.b64encode(buffer.getvalue())
@@ -3210,7 +3205,7 @@ class DataCollector(models.Model):
 
             # Save chart
             buffer = BytesIO()
-            plt.savefig(buffer, format='png', bbox_inches='tight', dpi=100)
+            self._savefig(buffer, bbox_inches='tight')
             plt.close()
 
             return base64.b64encode(buffer.getvalue())
@@ -3269,7 +3264,7 @@ class DataCollector(models.Model):
 
             # Save chart
             buffer = BytesIO()
-            plt.savefig(buffer, format='png', bbox_inches='tight', dpi=100)
+            self._savefig(buffer, bbox_inches='tight')
             plt.close()
 
             return base64.b64encode(buffer.getvalue())
@@ -3484,8 +3479,7 @@ class DataCollector(models.Model):
 
             # Зберігаємо графік
             buffer = BytesIO()
-            plt.savefig(buffer, format='png', bbox_inches='tight',
-                        dpi=100, pad_inches=0.2)
+            self._savefig(buffer, bbox_inches='tight', pad_inches=0.2)
             plt.close()
 
             return base64.b64encode(buffer.getvalue())
@@ -3675,8 +3669,7 @@ class DataCollector(models.Model):
 
             # Зберігаємо графік
             buffer = BytesIO()
-            plt.savefig(buffer, format='png', bbox_inches='tight',
-                        dpi=100, pad_inches=0.2)
+            self._savefig(buffer, bbox_inches='tight', pad_inches=0.2)
             plt.close()
 
             return base64.b64encode(buffer.getvalue())
@@ -3814,8 +3807,7 @@ class DataCollector(models.Model):
 
                 # Save the chart
                 buffer = BytesIO()
-                plt.savefig(buffer, format='png', bbox_inches='tight',
-                            dpi=100, pad_inches=0.2)
+                self._savefig(buffer, bbox_inches='tight', pad_inches=0.2)
                 plt.close()
 
                 record.cumulative_success_rate_chart = base64.b64encode(buffer.getvalue())
@@ -3940,8 +3932,7 @@ class DataCollector(models.Model):
 
                 # Save the chart
                 buffer = BytesIO()
-                plt.savefig(buffer, format='png', bbox_inches='tight',
-                            dpi=100, pad_inches=0.2)
+                self._savefig(buffer, bbox_inches='tight', pad_inches=0.2)
                 plt.close()
 
                 record.order_intensity_success_chart = base64.b64encode(buffer.getvalue())
@@ -4067,8 +4058,7 @@ class DataCollector(models.Model):
 
                 # Save the chart
                 buffer = BytesIO()
-                plt.savefig(buffer, format='png', bbox_inches='tight',
-                            dpi=100, pad_inches=0.2)
+                self._savefig(buffer, bbox_inches='tight', pad_inches=0.2)
                 plt.close()
 
                 record.success_order_intensity_chart = base64.b64encode(buffer.getvalue())
@@ -4200,8 +4190,7 @@ class DataCollector(models.Model):
 
                 # Save the chart
                 buffer = BytesIO()
-                plt.savefig(buffer, format='png', bbox_inches='tight',
-                            dpi=100, pad_inches=0.2)
+                self._savefig(buffer, bbox_inches='tight', pad_inches=0.2)
                 plt.close()
 
                 record.amount_intensity_success_chart = base64.b64encode(buffer.getvalue())
@@ -4333,8 +4322,7 @@ class DataCollector(models.Model):
 
                 # Save the chart
                 buffer = BytesIO()
-                plt.savefig(buffer, format='png', bbox_inches='tight',
-                            dpi=100, pad_inches=0.2)
+                self._savefig(buffer, bbox_inches='tight', pad_inches=0.2)
                 plt.close()
 
                 record.success_amount_intensity_chart = base64.b64encode(buffer.getvalue())
@@ -4425,8 +4413,7 @@ class DataCollector(models.Model):
 
                 # Save the chart
                 buffer = BytesIO()
-                plt.savefig(buffer, format='png', bbox_inches='tight',
-                            dpi=100, pad_inches=0.2)
+                self._savefig(buffer, bbox_inches='tight', pad_inches=0.2)
                 plt.close()
 
                 record.monthly_success_rate_chart = base64.b64encode(buffer.getvalue())
@@ -4541,8 +4528,7 @@ class DataCollector(models.Model):
 
                 # Save the chart
                 buffer = BytesIO()
-                plt.savefig(buffer, format='png', bbox_inches='tight',
-                            dpi=100, pad_inches=0.2)
+                self._savefig(buffer, bbox_inches='tight', pad_inches=0.2)
                 plt.close()
 
                 record.monthly_volume_success_chart = base64.b64encode(buffer.getvalue())
@@ -4668,8 +4654,7 @@ class DataCollector(models.Model):
 
                 # Save the chart
                 buffer = BytesIO()
-                plt.savefig(buffer, format='png', bbox_inches='tight',
-                            dpi=100, pad_inches=0.2)
+                self._savefig(buffer, bbox_inches='tight', pad_inches=0.2)
                 plt.close()
 
                 record.monthly_orders_success_chart = base64.b64encode(buffer.getvalue())
@@ -4764,8 +4749,7 @@ class DataCollector(models.Model):
 
                 # Save the chart
                 buffer = BytesIO()
-                plt.savefig(buffer, format='png', bbox_inches='tight',
-                            dpi=100, pad_inches=0.2)
+                self._savefig(buffer, bbox_inches='tight', pad_inches=0.2)
                 plt.close()
 
                 record.payment_term_success_chart = base64.b64encode(buffer.getvalue())
@@ -4866,7 +4850,7 @@ class DataCollector(models.Model):
 
                 # Save chart
                 buffer = BytesIO()
-                plt.savefig(buffer, format='png', bbox_inches='tight', dpi=300)
+                self._savefig(buffer, bbox_inches='tight')
                 plt.close()
                 record.monthly_analysis_scatter_chart = base64.b64encode(buffer.getvalue())
                 print(f"Chart: {record.monthly_analysis_scatter_chart}")
@@ -4988,7 +4972,7 @@ class DataCollector(models.Model):
 
             # Save to binary field
             buffer = BytesIO()
-            plt.savefig(buffer, format='png', bbox_inches='tight')
+            self._savefig(buffer, bbox_inches='tight')
             plt.close()
             self.monthly_combined_chart = base64.b64encode(buffer.getvalue())
 
@@ -5123,7 +5107,7 @@ class DataCollector(models.Model):
 
             # Save to binary field
             buffer = BytesIO()
-            plt.savefig(buffer, format='png', bbox_inches='tight')
+            self._savefig(buffer, bbox_inches='tight')
             plt.close()
             self.relative_age_success_chart = base64.b64encode(buffer.getvalue())
 
@@ -5215,7 +5199,7 @@ class DataCollector(models.Model):
 
             # Зберігаємо графік
             buffer = BytesIO()
-            plt.savefig(buffer, format='png', dpi=300, bbox_inches='tight')
+            self._savefig(buffer, bbox_inches='tight')
             plt.close()
 
             # Конвертуємо в base64
@@ -5289,7 +5273,7 @@ class DataCollector(models.Model):
 
             # Зберігаємо графік
             buffer = BytesIO()
-            plt.savefig(buffer, format='png', dpi=300, bbox_inches='tight')
+            self._savefig(buffer, bbox_inches='tight')
             plt.close()
 
             # Конвертуємо в base64
@@ -5385,7 +5369,7 @@ class DataCollector(models.Model):
 
             # Зберігаємо графік
             buffer = BytesIO()
-            plt.savefig(buffer, format='png', dpi=300, bbox_inches='tight')
+            self._savefig(buffer, bbox_inches='tight')
             plt.close()
 
             # Конвертуємо в base64
@@ -5481,7 +5465,7 @@ class DataCollector(models.Model):
 
             # Зберігаємо графік
             buffer = BytesIO()
-            plt.savefig(buffer, format='png', dpi=300, bbox_inches='tight')
+            self._savefig(buffer, bbox_inches='tight')
             plt.close()
 
             # Конвертуємо в base64
@@ -5572,7 +5556,7 @@ class DataCollector(models.Model):
 
             # Зберігаємо графік
             buffer = BytesIO()
-            plt.savefig(buffer, format='png', dpi=300, bbox_inches='tight')
+            self._savefig(buffer, bbox_inches='tight')
             plt.close()
 
             # Конвертуємо в base64
@@ -5664,7 +5648,7 @@ class DataCollector(models.Model):
 
             # Зберігаємо графік
             buffer = BytesIO()
-            plt.savefig(buffer, format='png', dpi=300, bbox_inches='tight')
+            self._savefig(buffer, bbox_inches='tight')
             plt.close()
 
             # Конвертуємо в base64
@@ -5780,7 +5764,7 @@ class DataCollector(models.Model):
 
                 # Зберігаємо графік
                 buffer = BytesIO()
-                plt.savefig(buffer, format='png', dpi=300, bbox_inches='tight')
+                self._savefig(buffer, bbox_inches='tight')
                 plt.close()
 
                 # Конвертуємо в base64
@@ -5898,7 +5882,7 @@ class DataCollector(models.Model):
 
                 # Зберігаємо графік
                 buffer = BytesIO()
-                plt.savefig(buffer, format='png', dpi=300, bbox_inches='tight')
+                self._savefig(buffer, bbox_inches='tight')
                 plt.close()
 
                 # Конвертуємо в base64
@@ -6024,7 +6008,7 @@ class DataCollector(models.Model):
 
                 # Зберігаємо графік
                 buffer = BytesIO()
-                plt.savefig(buffer, format='png', dpi=300, bbox_inches='tight')
+                self._savefig(buffer, bbox_inches='tight')
                 plt.close()
 
                 # Конвертуємо в base64
@@ -6150,7 +6134,7 @@ class DataCollector(models.Model):
 
                 # Зберігаємо графік
                 buffer = BytesIO()
-                plt.savefig(buffer, format='png', dpi=300, bbox_inches='tight')
+                self._savefig(buffer, bbox_inches='tight')
                 plt.close()
 
                 # Конвертуємо в base64
@@ -6881,7 +6865,7 @@ class DataCollector(models.Model):
 
         buffer = BytesIO()
         print("\n=== Saving plot to buffer ===")
-        plt.savefig(buffer, format='png', dpi=300, bbox_inches='tight')
+        self._savefig(buffer, bbox_inches='tight')
         print(f"Buffer position after save: {buffer.tell()}")
         buffer.seek(0)
         print(f"Buffer position after seek: {buffer.tell()}")
@@ -12,7 +12,7 @@ This module analyzes customer data and creates visualizations
     "license": "OPL-1",
     "category": "Sales/CRM",
     "depends": [
-        "sale_crm", "web",
+        "sale_crm", "web", "analytics_base",
     ],
     "data": [
         "security/ir.model.access.csv",
@@ -22,6 +22,7 @@ This module analyzes customer data and creates visualizations
     "external_dependencies": {
         "python": ["matplotlib"],
     },
+    "post_init_hook": "post_init_hook",
     "installable": True,
     "auto_install": False,
     "application": True,
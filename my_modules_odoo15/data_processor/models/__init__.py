@@ -1 +1,3 @@
 from . import data_processor
+from . import index_advisor
+from . import federated_collector
@@ -11,16 +11,34 @@ import numpy as np
 import pandas as pd
 import seaborn as sns
 from io import StringIO, BytesIO
-from collections import defaultdict
+from types import MappingProxyType
 
 from odoo import models, fields, api, _
 from odoo.exceptions import UserError
 
 _logger = logging.getLogger(__name__)
 
+# Partner categories of the charts, computed once in _prepare_chart_data
+ORDER_COUNT_CATEGORIES = ['Нові', '2-5 замовлень', '6-10 замовлень', '11-20 замовлень', '20+ замовлень']
+# Relationship duration in months, lower edge included
+RELATIONSHIP_EDGES = [-float('inf'), 2, 6, 12, 24, float('inf')]
+RELATIONSHIP_CATEGORIES = ['Нові', '2-6 місяців', '6-12 місяців', '1-2 роки', '2+ роки']
+# Messages per partner, upper edge included
+MESSAGE_EDGES = [-float('inf'), 0, 3, 7, 15, 20, 50, 75, float('inf')]
+MESSAGE_CATEGORIES = ['Без повідомлень', '1-3 повідомлення', '4-7 повідомлень', '8-15 повідомлень',
+                      '15-20 повідомлень', '20-50 повідомлень', '50-75 повідомлень', '75+ повідомлень']
+# Changes per order, upper edge included
+CHANGES_EDGES = [-float('inf'), 0, 0.5, 1, 2, 3, 4, 5, float('inf')]
+CHANGES_CATEGORIES = ['Без змін', '0.1-0.5 змін', '0.5-1 зміна', '1-2 зміни',
+                      '2-3 зміни', '3-4 зміни', '4-5 змін', '5+ змін']
+# Average order amount
+AMOUNT_EDGES = [0, 100, 500, 1000, 2000, 5000, 10000, 20000, float('inf')]
+AMOUNT_LABELS = ['0-100', '100-500', '500-1K', '1K-2K', '2K-5K', '5K-10K', '10K-20K', '20K+']
+
 
 class DataProcessor(models.Model):
     _name = 'data.processor'
+    _inherit = ['analytics.query.mixin', 'analytics.chart.mixin', 'analytics.distribution.mixin']
     _description = 'Data Processor'
 
     name = fields.Char(required=True)
@@ -105,66 +123,92 @@ class DataProcessor(models.Model):
             else:
                 record.date_partner_display = "Period not defined"
 
+    def _get_partner_stats_query(self):
+        """Return the partner-level extraction query, parametrized by the prefix number"""
+        # Get all orders without date restriction.
+        # Messages and tracked changes are pre-aggregated per order, so joining
+        # them to sale_order keeps one row per order instead of messages².
+        query = """
+                    WITH order_messages AS (
+                        SELECT
+                            m.res_id as order_id,
+                            COUNT(*) as message_count
+                        FROM mail_message m
+                        WHERE m.model = 'sale.order'
+                        GROUP BY m.res_id
+                    ),
+                    order_changes AS (
+                        SELECT
+                            m.res_id as order_id,
+                            COUNT(*) as change_count
+                        FROM mail_message m
+                        WHERE m.model = 'sale.order'
+                        AND EXISTS (
+                            SELECT 1 FROM mail_tracking_value mtv
+                            WHERE mtv.mail_message_id = m.id
+                        )
+                        GROUP BY m.res_id
+                    ),
+                    partner_stats AS (
+                        SELECT 
+                            %s * 1000000 + p.id as partner_id,
+                            p.create_date as partner_create_date,
+                            COUNT(so.id) as total_orders,
+                            COUNT(so.id) FILTER (WHERE so.state = 'sale') as successful_orders,
+                            AVG(so.amount_total) as avg_amount,
+                            COALESCE(SUM(om.message_count), 0)::BIGINT as total_messages,
+                            CAST(
+                                CAST(COALESCE(SUM(oc.change_count), 0) AS DECIMAL(10,2)) / 
+                                NULLIF(COUNT(so.id), 0)
+                                AS DECIMAL(10,2)
+                            ) as changes_count,
+                            CAST(
+                                CAST(COUNT(so.id) FILTER (WHERE so.state = 'sale') AS DECIMAL(10,1)) * 100.0 / 
+                                NULLIF(COUNT(so.id), 0)
+                                AS DECIMAL(10,1)
+                            ) as success_rate,
+                            MIN(so.date_order::date) as first_order_date,
+                            MAX(so.date_order::date) as last_order_date,
+                            (MAX(so.date_order::date) - MIN(so.date_order::date)) as partner_order_age_days
+                        FROM res_partner p
+                        INNER JOIN sale_order so ON so.partner_id = p.id
+                        LEFT JOIN order_messages om ON om.order_id = so.id
+                        LEFT JOIN order_changes oc ON oc.order_id = so.id
+                        GROUP BY p.id, p.create_date
+                    )
+                    SELECT 
+                        partner_id,
+                        partner_create_date,
+                        total_orders,
+                        successful_orders,
+                        success_rate,
+                        avg_amount,
+                        total_messages,
+                        changes_count,
+                        first_order_date,
+                        last_order_date,
+                        partner_order_age_days
+                    FROM partner_stats
+                """
+        return query
+
+    def _get_cache_tables(self):
+        # Orders, messages and tracked changes feed the partner statistics
+        return {
+            'sale_order': ['MAX(id)', 'MAX(write_date)', 'COUNT(*)'],
+            'mail_message': ['MAX(id)', 'COUNT(*)'],
+            'mail_tracking_value': ['MAX(id)', 'COUNT(*)'],
+        }
+
+    def _get_federated_query(self, prefix_number):
+        """Return (query, params, csv header) used by the federated collector"""
+        return self._get_partner_stats_query(), (prefix_number,), None
+
     def action_collect_data(self):
         """Collect all necessary data and save to CSV"""
         self.ensure_one()
         try:
-            # Get all orders without date restriction
-            query = """
-                        WITH partner_stats AS (
-                            SELECT 
-                                %s * 1000000 + p.id as partner_id,
-                                p.create_date as partner_create_date,
-                                COUNT(DISTINCT so.id) as total_orders,
-                                COUNT(DISTINCT CASE WHEN so.state = 'sale' THEN so.id END) as successful_orders,
-                                AVG(so.amount_total) as avg_amount,
-                                COUNT(DISTINCT m.id) as total_messages,
-                                CAST(
-                                    CAST(COUNT(DISTINCT CASE 
-                                        WHEN EXISTS (
-                                            SELECT 1 FROM mail_tracking_value mtv 
-                                            WHERE mtv.mail_message_id = m2.id
-                                        ) THEN m2.id 
-                                    END) AS DECIMAL(10,2)) / 
-                                    NULLIF(COUNT(DISTINCT so.id), 0)
-                                    AS DECIMAL(10,2)
-                                ) as changes_count,
-                                CAST(
-                                    CAST(COUNT(DISTINCT CASE WHEN so.state = 'sale' THEN so.id END) AS DECIMAL(10,1)) * 100.0 / 
-                                    NULLIF(COUNT(DISTINCT so.id), 0)
-                                    AS DECIMAL(10,1)
-                                ) as success_rate,
-                                MIN(so.date_order::date) as first_order_date,
-                                MAX(so.date_order::date) as last_order_date,
-                                (MAX(so.date_order::date) - MIN(so.date_order::date)) as partner_order_age_days
-                            FROM res_partner p
-                            INNER JOIN sale_order so ON so.partner_id = p.id
-                            LEFT JOIN mail_message m ON m.res_id = so.id AND m.model = 'sale.order'
-                            LEFT JOIN mail_message m2 ON m2.res_id = so.id AND m2.model = 'sale.order'
-                            GROUP BY p.id, p.create_date
-                        )
-                        SELECT 
-                            partner_id,
-                            partner_create_date,
-                            total_orders,
-                            successful_orders,
-                            success_rate,
-                            avg_amount,
-                            total_messages,
-                            changes_count,
-                            first_order_date,
-                            last_order_date,
-                            partner_order_age_days
-                        FROM partner_stats
-                    """
-
-            self.env.cr.execute(query, (self.prefix_number,))
-            results = self.env.cr.dictfetchall()
-            for result in results[:10]:
-                print(result)
-
-            if not results:
-                raise UserError(_("No data found"))
+            query = self._get_partner_stats_query()
 
             # Find min and max dates from sale orders
             date_query = """
@@ -172,8 +216,35 @@ class DataProcessor(models.Model):
                        MAX(date_order)::date as max_date
                 FROM sale_order
             """
-            self.env.cr.execute(date_query)
-            date_result = self.env.cr.dictfetchone()
+
+            cache = self.env['analytics.query.cache']
+            fingerprint = cache._get_fingerprint(self._name, query, (self.prefix_number,))
+
+            with self._analytics_cursor() as cr:
+                change_marker = cache._get_change_marker(cr, self._get_cache_tables())
+                cached = cache._lookup(fingerprint, change_marker)
+                if not cached:
+                    cr.execute(query, (self.prefix_number,))
+                    results = cr.dictfetchall()
+                    cr.execute(date_query)
+                    date_result = cr.dictfetchone()
+
+            # Source tables unchanged since the last collection: reuse its CSV
+            if cached:
+                data_file, metadata = cached
+                self.write({
+                    'date_from': metadata['date_from'],
+                    'date_to': metadata['date_to'],
+                    'data_file': data_file,
+                    'data_filename': f"{self.env.cr.dbname}_{self.prefix_number}.csv"
+                })
+                return True
+
+            for result in results[:10]:
+                print(result)
+
+            if not results:
+                raise UserError(_("No data found"))
 
             # Convert to CSV
             output = StringIO()
@@ -181,12 +252,17 @@ class DataProcessor(models.Model):
             writer.writeheader()
             writer.writerows(results)
 
+            data_file = base64.b64encode(output.getvalue().encode('utf-8'))
             self.write({
                 'date_from': date_result['min_date'],
                 'date_to': date_result['max_date'],
-                'data_file': base64.b64encode(output.getvalue().encode('utf-8')),
+                'data_file': data_file,
                 'data_filename': f"{self.env.cr.dbname}_{self.prefix_number}.csv"
             })
+            cache._store(self._name, fingerprint, change_marker, data_file, {
+                'date_from': date_result['min_date'],
+                'date_to': date_result['max_date'],
+            })
 
             return True
 
@@ -215,27 +291,13 @@ class DataProcessor(models.Model):
             unsuccessful_orders = total_orders - successful_orders
 
             # Calculate success rate ranges
-            success_rate_ranges = defaultdict(int)
-            for success_rate in df['success_rate']:
-                if success_rate == 100:
-                    range_key = '100%'
-                elif success_rate >= 80:
-                    range_key = '80-99%'
-                elif success_rate >= 60:
-                    range_key = '60-79%'
-                elif success_rate >= 40:
-                    range_key = '40-59%'
-                elif success_rate >= 20:
-                    range_key = '20-39%'
-                else:
-                    range_key = '0-19%'
-                success_rate_ranges[range_key] += 1
-
-            # Format success rate ranges
+            success_rate_ranges = self._get_success_rate_distribution(df['success_rate'].to_numpy())
+
+            # Format success rate ranges, from the highest
             success_rate_text = []
-            for rate_range in ['100%', '80-99%', '60-79%', '40-59%', '20-39%', '0-19%']:
-                if rate_range in success_rate_ranges:
-                    success_rate_text.append(f"{rate_range}: {success_rate_ranges[rate_range]} partners")
+            for rate_range, count in reversed(list(success_rate_ranges.items())):
+                if count:
+                    success_rate_text.append(f"{rate_range}: {count} partners")
 
             stats = {
                 'date_partner_from': min_date.date(),
@@ -264,109 +326,134 @@ Unsuccessful: {unsuccessful_orders} ({(unsuccessful_orders / total_orders * 100
             csv_data = StringIO(base64.b64decode(self.data_file).decode())
             df = pd.read_csv(csv_data)
 
-            print("\nDataFrame columns:")
-            print(df.columns)
-            print("\nFirst few rows:")
-            print(df.head())
-
-            # Create all charts
-            charts_data = {
-                'partners_by_rate_chart': self._create_partners_by_rate_chart,
-                'customer_history_graph': self._create_customer_history_graph,
-                'partner_orders_success_chart': self._create_partner_orders_success_chart,
-                'customer_relationship_graph': self._create_customer_relationship_graph,
-                'partner_age_success_chart': self._create_partner_age_success_chart,
-                'customer_avg_messages_graph': self._create_customer_avg_messages_graph,
-                'customer_avg_changes_graph': self._create_customer_avg_changes_graph,
-                'customer_relationship_distribution_graph': self._create_customer_relationship_distribution_graph,
-                'customer_amount_success_distribution_plot': self._create_customer_amount_success_distribution_plot,
-                'customer_amount_success_distribution_graph': self._create_customer_amount_success_distribution_graph,
-                'customer_order_dependency': self._create_customer_order_dependency,
-                'customer_age_dependency': self._create_customer_age_dependency,
-                'customer_messages_dependency': self._create_customer_messages_dependency,
-                'customer_changes_dependency': self._create_customer_changes_dependency,
-
-            }
-
-            update_vals = {}
-            for field_name, chart_function in charts_data.items():
-                plt.figure(figsize=(12, 6))
-                chart_function(df)
-                update_vals[field_name] = self._save_plot_to_binary()
-                plt.close()
-
-            self.write(update_vals)
+            self.write(self._render_charts(self._prepare_chart_data(df)))
 
         except Exception as e:
             raise UserError(_("Error creating charts: %s") % str(e))
 
-    def _save_plot_to_binary(self):
-        """Save current plot to binary field"""
-        buffer = BytesIO()
-        plt.savefig(buffer, format='png', bbox_inches='tight', dpi=300)
-        plt.close()
-        return base64.b64encode(buffer.getvalue())
-
-    def _create_partners_by_rate_chart(self, df):
-        """Create distribution of partners by success rate"""
-        # Створюємо групи для success rate
-        bins = [0, 20, 40, 60, 80, 100]
-        labels = ['0-19%', '20-39%', '40-59%', '60-79%', '80-99%', '100%']
-
-        # Групуємо дані
-        df['success_rate_group'] = pd.cut(df['success_rate'],
-                                          bins=[-float('inf')] + bins,
-                                          labels=labels,
-                                          include_lowest=True)
-
-        # Рахуємо кількість партнерів в кожній групі
-        success_rate_counts = df['success_rate_group'].value_counts().sort_index()
-
-        # Створюємо графік
-        plt.figure(figsize=(15, 8))
-        colors = ['#FF9999', '#66B2FF', '#99FF99', '#FFCC99', '#FF99CC', '#99CCFF']
-        bars = plt.bar(range(len(success_rate_counts)), success_rate_counts, color=colors)
-
-        # Додаємо підписи
-        plt.title('Distribution of Partners by Success Rate')
-        plt.xlabel('Success Rate Range')
-        plt.ylabel('Number of Partners')
-        plt.xticks(range(len(success_rate_counts)), success_rate_counts.index, rotation=45)
-
-        # Додаємо значення над стовпчиками
-        for bar in bars:
-            height = bar.get_height()
-            plt.text(bar.get_x() + bar.get_width() / 2., height,
-                     f'{int(height):,}',
-                     ha='center', va='bottom')
-
-        # Додаємо сітку
-        plt.grid(True, linestyle='--', alpha=0.7)
-        plt.tight_layout()
-
-    def _create_customer_relationship_distribution_graph(self, df):
-        """Create distribution of customer relationship duration"""
-        print("\n=== Аналіз даних для графіку ===")
-        print("\n1. Початкові дані:")
-        print(f"Кількість рядків: {len(df)}")
-        print("\nПерші 5 рядків:")
-        print(df[['partner_id', 'partner_order_age_days', 'total_orders', 'success_rate']].head())
-
-        # Конвертуємо дні в місяці та забезпечуємо числовий формат
-        df['relationship_months'] = pd.to_numeric(df['partner_order_age_days'],
-                                                errors='coerce').fillna(0) / 30
+    def _prepare_chart_data(self, df):
+        """Compute every derived column and grouped table of the charts in one pass.
+
+        The chart functions only plot from the returned mapping: neither the
+        mapping nor its frames may be modified, so charts never depend on the
+        order in which they are rendered. They are still rendered one after
+        another, see ``_render_charts``.
+        """
+        partners = df.copy()
+        partners['avg_amount'] = pd.to_numeric(partners['avg_amount'], errors='coerce')
+        partners['total_messages'] = pd.to_numeric(partners['total_messages'], errors='coerce').fillna(0)
+        partners['changes_count'] = pd.to_numeric(partners['changes_count'], errors='coerce').fillna(0)
+
+        age_days = pd.to_numeric(partners['partner_order_age_days'], errors='coerce').fillna(0).astype(int)
+        partners['relationship_months'] = age_days / 30
+        partners['partner_order_age_months'] = age_days // 30
+
+        # Partner categories
+        partners['orders_category'] = np.select([
+            (partners['total_orders'] == 1),
+            (partners['total_orders'].between(2, 5)),
+            (partners['total_orders'].between(6, 10)),
+            (partners['total_orders'].between(11, 20)),
+            (partners['total_orders'] >= 21)
+        ], ORDER_COUNT_CATEGORIES, default='')
+        partners['relationship_category'] = self._bucket_labels(
+            partners['relationship_months'], RELATIONSHIP_EDGES, RELATIONSHIP_CATEGORIES)
+        partners['message_category'] = self._bucket_labels(
+            partners['total_messages'], MESSAGE_EDGES, MESSAGE_CATEGORIES, right=True)
+        partners['changes_category'] = self._bucket_labels(
+            partners['changes_count'], CHANGES_EDGES, CHANGES_CATEGORIES, right=True)
+
+        # Partner age as days below a month, months below a year, then years
+        partners['age_range'] = np.where(
+            age_days < 30, age_days.astype(str) + 'd',
+            np.where(age_days < 365, (age_days // 30).astype(str) + 'm', (age_days // 365).astype(str) + 'y'))
+        partners['age_sort_key'] = np.where(
+            age_days < 30, age_days, np.where(age_days < 365, age_days // 30 * 30, age_days // 365 * 365))
+
+        # Average amount per customer, shared by both amount charts
+        amount_customers = partners[partners['avg_amount'] >= 0].groupby('partner_id').agg({
+            'avg_amount': 'mean',
+            'success_rate': 'mean'  # відсоток успішності
+        }).reset_index()
 
-        print("\n2. Після конвертації в місяці:")
-        print("\nСтатистика relationship_months:")
-        print(df['relationship_months'].describe())
+        return MappingProxyType({
+            'partners': partners,
+            'success_rate_counts': pd.Series(
+                self._get_success_rate_distribution(partners['success_rate'].to_numpy())),
+            'orders_category_stats': partners.groupby('orders_category').agg(
+                partners_count=('partner_id', 'count'),
+                total_orders_sum=('total_orders', 'sum'),
+                success_rate=('success_rate', 'mean')
+            ).reindex(ORDER_COUNT_CATEGORIES),
+            'orders_count_groups': self._prepare_orders_count_groups(partners),
+            'relationship_stats': self._prepare_relationship_stats(partners),
+            'relationship_distribution': self._prepare_relationship_distribution(partners),
+            'age_stats': partners.groupby('age_range').agg(
+                success_rate=('success_rate', 'mean'),
+                total_orders=('total_orders', 'sum'),
+                partner_id=('partner_id', 'nunique'),  # кількість унікальних партнерів
+                sort_key=('age_sort_key', 'first')
+            ).reset_index().sort_values('sort_key').drop('sort_key', axis=1),
+            'message_stats': partners.groupby('message_category').agg({
+                'partner_id': 'count',  # кількість клієнтів
+                'total_orders': 'sum',  # кількість замовлень
+                'success_rate': 'mean'  # середній відсоток успішності
+            }).reindex(MESSAGE_CATEGORIES).fillna(0),
+            'changes_stats': partners.groupby('changes_category').agg({
+                'partner_id': 'count',
+                'changes_count': 'mean',
+                'success_rate': 'mean',
+                'total_orders': 'sum'
+            }).reindex(CHANGES_CATEGORIES).dropna(subset=['partner_id']),
+            'amount_quantile_stats': self._prepare_amount_quantile_stats(amount_customers),
+            'amount_group_stats': self._prepare_amount_group_stats(amount_customers),
+        })
+
+    @api.model
+    def _prepare_orders_count_groups(self, partners):
+        """Split partners sorted by orders count into groups of equal size"""
+        data = partners[['total_orders', 'success_rate']].sort_values('total_orders')
+        total_partners = len(data)
 
+        # Визначаємо кількість груп (мінімум 20 партнерів на групу, але не менше 5 груп)
+        num_groups = max(5, min(30, total_partners // 20))
+        group_sizes = [total_partners // num_groups + (1 if i < total_partners % num_groups else 0)
+                       for i in range(num_groups)]
+        group_sizes = [size for size in group_sizes if size]
+
+        groups = data.assign(group=np.repeat(np.arange(len(group_sizes)), group_sizes)).groupby('group').agg(
+            min_orders=('total_orders', 'min'),
+            max_orders=('total_orders', 'max'),
+            rate=('success_rate', 'mean'),
+            partners_count=('total_orders', 'size'),
+            orders_count=('total_orders', 'sum'),
+        )
+        groups['range'] = (groups['min_orders'].astype(int).astype(str) + '-' +
+                           groups['max_orders'].astype(int).astype(str))
+        return groups
+
+    @api.model
+    def _prepare_relationship_stats(self, partners):
+        """Customers, orders and success rate per relationship duration category"""
+        # Рахуємо клієнтів серед унікальних партнерів
+        clients = partners.drop_duplicates('partner_id', keep='last')
+        by_category = partners.groupby('relationship_category').agg(
+            successful=('successful_orders', 'sum'),
+            total=('total_orders', 'sum')
+        ).reindex(RELATIONSHIP_CATEGORIES)
+        return pd.DataFrame({
+            'customers': clients['relationship_category'].value_counts().reindex(RELATIONSHIP_CATEGORIES),
+            'total_orders': by_category['total'],
+            'success_rate': by_category['successful'] / by_category['total'] * 100,
+        })
+
+    @api.model
+    def _prepare_relationship_distribution(self, partners):
+        """Customers, orders and success rate per relationship duration percentile"""
         # Створюємо власні межі для груп на основі процентилів
-        percentiles = np.percentile(df['relationship_months'].unique(),
+        percentiles = np.percentile(partners['relationship_months'].unique(),
                                     np.linspace(0, 100, 11))  # 11 точок для 10 інтервалів
 
-        print("\n3. Процентилі для груп:")
-        print(percentiles)
-
         # Переконуємося, що межі унікальні
         percentiles = np.unique(percentiles)
         if len(percentiles) < 11:
@@ -390,13 +477,13 @@ Unsuccessful: {unsuccessful_orders} ({(unsuccessful_orders / total_orders * 100
         labels = [f"{format_duration(left)}-{format_duration(right)}"
                   for left, right in zip(percentiles[:-1], percentiles[1:])]
 
-        df['relationship_group'] = pd.cut(df['relationship_months'],
-                                          bins=percentiles,
-                                          labels=labels,
-                                          include_lowest=True)
+        relationship_group = pd.cut(partners['relationship_months'],
+                                    bins=percentiles,
+                                    labels=labels,
+                                    include_lowest=True)
 
         # Рахуємо статистику для кожної групи
-        group_stats = df.groupby('relationship_group').agg({
+        group_stats = partners.groupby(relationship_group).agg({
             'partner_id': 'nunique',  # кількість унікальних клієнтів
             'total_orders': 'sum',    # сума всіх замовлень
             'success_rate': 'mean'    # середня успішність
@@ -405,14 +492,131 @@ Unsuccessful: {unsuccessful_orders} ({(unsuccessful_orders / total_orders * 100
         # Перейменовуємо колонки для зручності
         group_stats.columns = ['group', 'customers', 'total_orders', 'success_rate']
 
-        print("\n4. Статистика по групах:")
-        print(group_stats)
-
         # Додаємо середню кількість замовлень на клієнта
         group_stats['avg_orders'] = group_stats['total_orders'] / group_stats['customers']
+        return group_stats
+
+    @api.model
+    def _prepare_amount_quantile_stats(self, amount_customers):
+        """Customers and success rate per average amount, in 20 groups of similar size"""
+        # Форматуємо мітки груп
+        def format_amount(interval):
+            left = int(interval.left)
+            right = int(interval.right)
+
+            def format_number(num):
+                if num >= 1000000:
+                    return f"{num / 1000000:.1f}M"
+                elif num >= 1000:
+                    return f"{num / 1000:.0f}K"
+                return str(int(num))
+
+            return f'{format_number(left)}-{format_number(right)}'
+
+        # Створюємо 20 груп з приблизно однаковою кількістю клієнтів
+        amount_group = pd.qcut(amount_customers['avg_amount'], q=20, duplicates='drop')
+        amount_group = amount_group.cat.rename_categories(
+            [format_amount(interval) for interval in amount_group.cat.categories])
+
+        # Рахуємо статистику для кожної групи
+        return amount_customers.groupby(amount_group).agg({
+            'partner_id': 'count',  # кількість клієнтів
+            'success_rate': 'mean',  # середній відсоток успішності
+            'avg_amount': 'mean'  # середня сума замовлення
+        }).rename_axis('amount_group').reset_index()
 
-        print("\n5. Фінальна статистика з середніми замовленнями:")
-        print(group_stats[['group', 'customers', 'total_orders', 'avg_orders', 'success_rate']])
+    @api.model
+    def _prepare_amount_group_stats(self, amount_customers):
+        """Customers and success rate per average amount range"""
+        # Видаляємо викиди (суми більше 99-го перцентиля)
+        amount_99th = np.percentile(amount_customers['avg_amount'], 99)
+        customer_stats = amount_customers[amount_customers['avg_amount'] <= amount_99th]
+
+        amount_group = pd.cut(customer_stats['avg_amount'], bins=AMOUNT_EDGES, labels=AMOUNT_LABELS,
+                              include_lowest=True)
+
+        # Рахуємо статистику для кожної групи
+        return customer_stats.groupby(amount_group).agg({
+            'partner_id': 'count',  # кількість клієнтів
+            'success_rate': 'mean',  # середній відсоток успішності
+            'avg_amount': 'mean'  # середня сума замовлення
+        }).rename_axis('amount_group').reset_index()
+
+    def _render_charts(self, chart_data):
+        """Render every chart of the prepared ``chart_data`` with the active chart profile"""
+        # Create all charts
+        charts_data = {
+            'partners_by_rate_chart': self._create_partners_by_rate_chart,
+            'customer_history_graph': self._create_customer_history_graph,
+            'partner_orders_success_chart': self._create_partner_orders_success_chart,
+            'customer_relationship_graph': self._create_customer_relationship_graph,
+            'partner_age_success_chart': self._create_partner_age_success_chart,
+            'customer_avg_messages_graph': self._create_customer_avg_messages_graph,
+            'customer_avg_changes_graph': self._create_customer_avg_changes_graph,
+            'customer_relationship_distribution_graph': self._create_customer_relationship_distribution_graph,
+            'customer_amount_success_distribution_plot': self._create_customer_amount_success_distribution_plot,
+            'customer_amount_success_distribution_graph': self._create_customer_amount_success_distribution_graph,
+            'customer_order_dependency': self._create_customer_order_dependency,
+            'customer_age_dependency': self._create_customer_age_dependency,
+            'customer_messages_dependency': self._create_customer_messages_dependency,
+            'customer_changes_dependency': self._create_customer_changes_dependency,
+
+        }
+
+        # Sequential on purpose: the chart functions draw through pyplot, whose
+        # current figure is global state and not thread-safe
+        update_vals = {}
+        for field_name, chart_function in charts_data.items():
+            plt.figure(figsize=(12, 6))
+            chart_function(chart_data)
+            update_vals[field_name] = self._save_plot_to_binary()
+            plt.close()
+        return update_vals
+
+    def _get_full_resolution_charts(self):
+        self.ensure_one()
+        if not self.data_file:
+            raise UserError(_("Please collect data first"))
+        df = pd.read_csv(StringIO(base64.b64decode(self.data_file).decode()))
+        return self.with_context(chart_profile='full')._render_charts(self._prepare_chart_data(df))
+
+    def _save_plot_to_binary(self):
+        """Save current plot to binary field"""
+        buffer = BytesIO()
+        self._savefig(buffer, bbox_inches='tight')
+        plt.close()
+        return base64.b64encode(buffer.getvalue())
+
+    def _create_partners_by_rate_chart(self, data):
+        """Create distribution of partners by success rate"""
+        # Кількість партнерів в кожній групі success rate
+        success_rate_counts = data['success_rate_counts']
+
+        # Створюємо графік
+        plt.figure(figsize=(15, 8))
+        colors = ['#FF9999', '#66B2FF', '#99FF99', '#FFCC99', '#FF99CC', '#99CCFF']
+        bars = plt.bar(range(len(success_rate_counts)), success_rate_counts, color=colors)
+
+        # Додаємо підписи
+        plt.title('Distribution of Partners by Success Rate')
+        plt.xlabel('Success Rate Range')
+        plt.ylabel('Number of Partners')
+        plt.xticks(range(len(success_rate_counts)), success_rate_counts.index, rotation=45)
+
+        # Додаємо значення над стовпчиками
+        for bar in bars:
+            height = bar.get_height()
+            plt.text(bar.get_x() + bar.get_width() / 2., height,
+                     f'{int(height):,}',
+                     ha='center', va='bottom')
+
+        # Додаємо сітку
+        plt.grid(True, linestyle='--', alpha=0.7)
+        plt.tight_layout()
+
+    def _create_customer_relationship_distribution_graph(self, data):
+        """Create distribution of customer relationship duration"""
+        group_stats = data['relationship_distribution']
 
         # Створення графіку з двома осями
         fig, ax = plt.subplots(figsize=(15, 8))
@@ -496,68 +700,9 @@ Unsuccessful: {unsuccessful_orders} ({(unsuccessful_orders / total_orders * 100
                   'n=X - кількість унікальних клієнтів, (Y) - загальна кількість замовлень')
         plt.tight_layout()
 
-    def _create_customer_amount_success_distribution_plot(self, df):
+    def _create_customer_amount_success_distribution_plot(self, data):
         """Create distribution of customer amount success"""
-        print("\n=== Starting customer amount success distribution analysis ===")
-        print("DataFrame columns:", df.columns.tolist())
-        print("\nFirst few rows of DataFrame:")
-        print(df.head())
-
-        # Конвертуємо суму в числовий формат
-        print("\nConverting avg_amount to numeric...")
-        df['avg_amount'] = pd.to_numeric(df['avg_amount'], errors='coerce')
-        print("Unique values in avg_amount after conversion:", df['avg_amount'].unique()[:10])
-
-        # Відфільтруємо від'ємні значення
-        df = df[df['avg_amount'] >= 0]
-        print("\nNumber of rows after filtering negative values:", len(df))
-
-        # Форматуємо мітки груп
-        def format_amount(interval):
-            left = int(interval.left)
-            right = int(interval.right)
-
-            def format_number(num):
-                if num >= 1000000:
-                    return f"{num / 1000000:.1f}M"
-                elif num >= 1000:
-                    return f"{num / 1000:.0f}K"
-                return str(int(num))
-
-            return f'{format_number(left)}-{format_number(right)}'
-
-        # Створюємо 20 груп з приблизно однаковою кількістю клієнтів
-        print("\nGrouping data...")
-        customer_stats = df.groupby('partner_id').agg({
-            'avg_amount': 'mean',
-            'success_rate': 'mean'  # відсоток успішності
-        }).reset_index()
-
-        # Створюємо групи
-        customer_stats['amount_group'] = pd.qcut(customer_stats['avg_amount'],
-                                               q=20,
-                                               duplicates='drop')
-
-        # Отримуємо межі інтервалів та створюємо нові лейбли
-        intervals = customer_stats['amount_group'].cat.categories
-        labels = [format_amount(interval) for interval in intervals]
-
-        # Застосовуємо нові лейбли
-        customer_stats['amount_group'] = pd.qcut(customer_stats['avg_amount'],
-                                               q=20,
-                                               labels=labels,
-                                               duplicates='drop')
-
-        print("\nCalculating group statistics...")
-        # Рахуємо статистику для кожної групи
-        group_stats = customer_stats.groupby('amount_group').agg({
-            'partner_id': 'count',  # кількість клієнтів
-            'success_rate': 'mean',  # середній відсоток успішності
-            'avg_amount': 'mean'  # середня сума замовлення
-        }).reset_index()
-
-        print("\nGroup statistics:")
-        print(group_stats)
+        group_stats = data['amount_quantile_stats']
 
         # Створення графіку з двома осями
         fig, ax = plt.subplots(figsize=(15, 8))
@@ -604,25 +749,11 @@ Unsuccessful: {unsuccessful_orders} ({(unsuccessful_orders / total_orders * 100
         plt.title('Залежність успішності від середньої суми замовлення клієнта')
         plt.tight_layout()
 
-    def _create_customer_history_graph(self, df):
+    def _create_customer_history_graph(self, data):
         """Create customer history analysis"""
-        # Створюємо групи за кількістю замовлень
-        conditions = [
-            (df['total_orders'] == 1),
-            (df['total_orders'].between(2, 5)),
-            (df['total_orders'].between(6, 10)),
-            (df['total_orders'].between(11, 20)),
-            (df['total_orders'] >= 21)
-        ]
-        categories = ['Нові', '2-5 замовлень', '6-10 замовлень', '11-20 замовлень', '20+ замовлень']
-        df['category'] = np.select(conditions, categories)
-
-        # Рахуємо статистику по групах
-        group_stats = df.groupby('category').agg(
-            partners_count=('partner_id', 'count'),
-            total_orders_sum=('total_orders', 'sum'),
-            success_rate=('success_rate', 'mean')
-        ).reindex(categories)
+        # Статистика по групах за кількістю замовлень
+        categories = ORDER_COUNT_CATEGORIES
+        group_stats = data['orders_category_stats']
 
         # Створюємо графік з двома осями
         fig, ax1 = plt.subplots(figsize=(15, 8))
@@ -702,73 +833,19 @@ Unsuccessful: {unsuccessful_orders} ({(unsuccessful_orders / total_orders * 100
         # Налаштовуємо відступи
         plt.tight_layout()
 
-    def _create_partner_orders_success_chart(self, df):
+    def _create_partner_orders_success_chart(self, data):
         """Create partner orders vs success rate chart"""
         plt.figure(figsize=(12, 6))
 
-        # Підготовка даних
-        data = df[['total_orders', 'success_rate']].copy()
-        total_partners = len(data)
-
-        # Сортуємо за кількістю замовлень
-        data = data.sort_values('total_orders')
-
-        # Визначаємо кількість груп (зменшуємо якщо партнерів мало)
-        num_groups = min(30, total_partners // 20)  # Мінімум 20 партнерів на групу
-        if num_groups < 5:  # Якщо груп менше 5, встановлюємо мінімум 5 груп
-            num_groups = 5
-
-        # Розраховуємо розмір кожної групи
-        group_size = total_partners // num_groups
-        remainder = total_partners % num_groups
-
-        # Ініціалізуємо результат
-        result = {
-            'ranges': [],
-            'rates': [],
-            'partners_count': [],
-            'orders_count': []
-        }
-
-        # Розбиваємо на групи
-        start_idx = 0
-        for i in range(num_groups):
-            current_group_size = group_size + (1 if i < remainder else 0)
-            if current_group_size == 0:
-                break
-
-            end_idx = start_idx + current_group_size
-            group_data = data.iloc[start_idx:end_idx]
-
-            # Рахуємо статистику для групи
-            min_orders = group_data['total_orders'].min()
-            max_orders = group_data['total_orders'].max()
-            avg_success_rate = group_data['success_rate'].mean()
-            total_orders = group_data['total_orders'].sum()
-
-            # Форматуємо діапазон
-            range_str = f'{int(min_orders)}-{int(max_orders)}'
-
-            # Додаємо дані до результату
-            result['ranges'].append(range_str)
-            result['rates'].append(avg_success_rate)
-            result['partners_count'].append(len(group_data))
-            result['orders_count'].append(total_orders)
-
-            start_idx = end_idx
+        # Групи партнерів однакового розміру за кількістю замовлень
+        groups = data['orders_count_groups']
+        ranges = groups['range'].tolist()
 
         # Створюємо точковий графік
-        x_points = []
-        y_points = []
-        counts = []
-        orders = []
-        for i, (rate, count, order_count) in enumerate(
-                zip(result['rates'], result['partners_count'], result['orders_count'])):
-            if count > 0:
-                x_points.append(i)
-                y_points.append(rate)
-                counts.append(count)
-                orders.append(order_count)
+        x_points = list(range(len(groups)))
+        y_points = groups['rate'].tolist()
+        counts = groups['partners_count'].tolist()
+        orders = groups['orders_count'].tolist()
 
         # Створюємо градієнт кольорів від червоного до зеленого в залежності від success rate
         colors = ['#ff4d4d' if rate < 50 else '#00cc00' for rate in y_points]
@@ -811,13 +888,10 @@ Unsuccessful: {unsuccessful_orders} ({(unsuccessful_orders / total_orders * 100
         plt.ylim(-5, 105)
 
         # Показуємо всі мітки, якщо їх менше 10, інакше кожну другу
-        if len(result['ranges']) <= 10:
-            plt.xticks(range(len(result['ranges'])), result['ranges'],
-                       rotation=45, ha='right')
+        if len(ranges) <= 10:
+            plt.xticks(x_points, ranges, rotation=45, ha='right')
         else:
-            plt.xticks(range(len(result['ranges']))[::2],
-                       [result['ranges'][i] for i in range(0, len(result['ranges']), 2)],
-                       rotation=45, ha='right')
+            plt.xticks(x_points[::2], ranges[::2], rotation=45, ha='right')
 
         plt.grid(True, linestyle='--', alpha=0.7)
 
@@ -840,59 +914,16 @@ Unsuccessful: {unsuccessful_orders} ({(unsuccessful_orders / total_orders * 100
 
         plt.tight_layout()
 
-    def _create_customer_relationship_graph(self, df):
+    def _create_customer_relationship_graph(self, data):
         """Create customer relationship duration analysis"""
-        # Встановлюємо відображення всіх стовпців
-        pd.set_option('display.max_columns', None)
-        # Можна також налаштувати ширину виводу
-        pd.set_option('display.width', None)
-
-        # Тепер виводимо дані
-        print('DATA FRAME PROCESSOR')
-        print(df.head(10))
         fig, ax1 = plt.subplots(figsize=(12, 6))
 
-        # Конвертуємо дні в місяці
-        df['relationship_months'] = df['partner_order_age_days'] / 30
-
-        # Функція для категоризації терміну співпраці
-        def get_relationship_category(months):
-            if months < 2:
-                return 'Нові'
-            elif 2 <= months < 6:
-                return '2-6 місяців'
-            elif 6 <= months < 12:
-                return '6-12 місяців'
-            elif 12 <= months < 24:
-                return '1-2 роки'
-            else:
-                return '2+ роки'
-
-        # Визначаємо порядок категорій
-        category_order = ['Нові', '2-6 місяців', '6-12 місяців', '1-2 роки', '2+ роки']
-
-        # Застосовуємо категоризацію
-        df['relationship_category'] = df['relationship_months'].apply(get_relationship_category)
-
-        # Створюємо DataFrame для клієнтів (беремо тільки унікальних клієнтів)
-        clients_df = df.drop_duplicates('partner_id', keep='last')
-
-        # Рахуємо кількість клієнтів в кожній категорії
-        category_counts = clients_df['relationship_category'].value_counts()
-        category_counts = category_counts.reindex(category_order)
-
-        # Рахуємо кількість замовлень в кожній категорії
-        # Використовуємо агрегацію для підрахунку total_orders для кожної категорії
-        orders_counts = df.groupby('relationship_category')['total_orders'].sum()
-        orders_counts = orders_counts.reindex(category_order)
-
-        # Рахуємо відсоток успішності для кожної категорії
-        success_by_category = df.groupby('relationship_category').agg(
-            successful=('successful_orders', 'sum'),
-            total=('total_orders', 'sum')
-        )
-        success_by_category['success_rate'] = (success_by_category['successful'] / success_by_category['total']) * 100
-        success_by_category = success_by_category['success_rate'].reindex(category_order)
+        category_order = RELATIONSHIP_CATEGORIES
+        relationship_stats = data['relationship_stats']
+        # Кількість клієнтів, замовлень та відсоток успішності в кожній категорії
+        category_counts = relationship_stats['customers']
+        orders_counts = relationship_stats['total_orders']
+        success_by_category = relationship_stats['success_rate']
 
         # Створюємо позиції для стовпчиків
         x = np.arange(len(category_counts))
@@ -952,53 +983,9 @@ Unsuccessful: {unsuccessful_orders} ({(unsuccessful_orders / total_orders * 100
         plt.tight_layout()
 
 
-    def _create_partner_age_success_chart(self, df):
+    def _create_partner_age_success_chart(self, data):
         """Create partner age vs success rate chart"""
-
-        # Функція для створення міток вікових діапазонів
-        def get_age_range(days):
-            if days < 30:
-                return f"{days}d"
-            elif days < 365:
-                months = days // 30
-                return f"{months}m"
-            else:
-                years = days // 365
-                return f"{years}y"
-
-        # Створюємо діапазони для групування
-        df['age_range'] = df['partner_order_age_days'].apply(get_age_range)
-
-        # Групуємо дані
-        grouped = df.groupby('age_range').agg({
-            'success_rate': 'mean',
-            'total_orders': 'sum',
-            'partner_id': 'nunique'  # Додаємо підрахунок унікальних партнерів
-        }).reset_index()
-
-        # Створюємо допоміжну колонку для сортування
-        def get_sort_key(x):
-            value = int(x[:-1])
-            unit = x[-1]
-            if unit == 'd':
-                return value
-            elif unit == 'm':
-                return value * 30
-            else:  # 'y'
-                return value * 365
-
-        grouped['sort_key'] = grouped['age_range'].apply(get_sort_key)
-        grouped = grouped.sort_values('sort_key')
-
-        # Виводимо статистику для кожної точки
-        print("\nСтатистика по точках:")
-        print("Діапазон | Замовлення | Партнери | Успішність")
-        print("-" * 50)
-        for _, row in grouped.iterrows():
-            print(
-                f"{row['age_range']:8} | {int(row['total_orders']):10} | {int(row['partner_id']):8} | {row['success_rate']:.1f}%")
-
-        grouped = grouped.drop('sort_key', axis=1)
+        grouped = data['age_stats']
 
         plt.figure(figsize=(15, 8))
 
@@ -1079,49 +1066,13 @@ Unsuccessful: {unsuccessful_orders} ({(unsuccessful_orders / total_orders * 100
         ]
         plt.legend(handles=legend_elements, loc='upper right')
 
-    def _create_customer_avg_messages_graph(self, df):
+    def _create_customer_avg_messages_graph(self, data):
         """Create average messages analysis"""
         fig, ax1 = plt.subplots(figsize=(12, 6))
 
-        # Конвертуємо total_messages в числовий формат
-        df['total_messages'] = pd.to_numeric(df['total_messages'], errors='coerce').fillna(0)
-
-        # Функція категоризації
-        def get_message_category(avg_messages):
-            if pd.isna(avg_messages) or avg_messages == 0:
-                return 'Без повідомлень'
-            elif 0 < avg_messages <= 3:
-                return '1-3 повідомлення'
-            elif 3 < avg_messages <= 7:
-                return '4-7 повідомлень'
-            elif 7 < avg_messages <= 15:
-                return '8-15 повідомлень'
-            elif 15 < avg_messages <= 20:
-                return '15-20 повідомлень'
-            elif 20 < avg_messages <= 50:
-                return '20-50 повідомлень'
-            elif 50 < avg_messages <= 75:
-                return '50-75 повідомлень'
-            else:
-                return '75+ повідомлень'
-
-        # Визначаємо порядок категорій
-        category_order = ['Без повідомлень', '1-3 повідомлення', '4-7 повідомлень',
-                         '8-15 повідомлень', '15-20 повідомлень', '20-50 повідомлень',
-                         '50-75 повідомлень', '75+ повідомлень']
-
-        # Категоризуємо клієнтів
-        df['message_category'] = df['total_messages'].apply(get_message_category)
-
-        # Рахуємо статистику по категоріях
-        category_stats = df.groupby('message_category').agg({
-            'partner_id': 'count',  # кількість клієнтів
-            'total_orders': 'sum',  # кількість замовлень
-            'success_rate': 'mean'  # середній відсоток успішності
-        }).reindex(category_order)
-
-        # Замінюємо NaN на 0
-        category_stats = category_stats.fillna(0)
+        # Статистика по категоріях кількості повідомлень
+        category_order = MESSAGE_CATEGORIES
+        category_stats = data['message_stats']
 
         # Створюємо позиції для стовпчиків
         x = np.arange(len(category_order))
@@ -1175,61 +1126,12 @@ Unsuccessful: {unsuccessful_orders} ({(unsuccessful_orders / total_orders * 100
         plt.title('Аналіз клієнтів за середньою кількістю повідомлень')
         fig.tight_layout()
 
-    def _create_customer_avg_changes_graph(self, df):
+    def _create_customer_avg_changes_graph(self, data):
         """Create average changes analysis"""
         fig, ax1 = plt.subplots(figsize=(15, 8))
 
-        # Конвертуємо changes_count в числовий формат
-        df['changes_count'] = pd.to_numeric(df['changes_count'], errors='coerce').fillna(0)
-
-        # Створення категорій на основі середньої кількості змін на замовлення
-        def get_changes_category(changes):
-            if changes == 0:
-                return '0. Без змін'
-            elif changes <= 0.5:
-                return '1. 0.1-0.5 змін'
-            elif changes <= 1:
-                return '2. 0.5-1 зміна'
-            elif changes <= 2:
-                return '3. 1-2 зміни'
-            elif changes <= 3:
-                return '4. 2-3 зміни'
-            elif changes <= 4:
-                return '5. 3-4 зміни'
-            elif changes <= 5:
-                return '6. 4-5 змін'
-            else:
-                return '7. 5+ змін'
-
-        # Словник для відображення категорій без номерів
-        display_categories = {
-            '0. Без змін': 'Без змін',
-            '1. 0.1-0.5 змін': '0.1-0.5 змін',
-            '2. 0.5-1 зміна': '0.5-1 зміна',
-            '3. 1-2 зміни': '1-2 зміни',
-            '4. 2-3 зміни': '2-3 зміни',
-            '5. 3-4 зміни': '3-4 зміни',
-            '6. 4-5 змін': '4-5 змін',
-            '7. 5+ змін': '5+ змін'
-        }
-
-        df['category'] = df['changes_count'].apply(get_changes_category)
-
-        # Агрегація даних за категоріями
-        category_stats = df.groupby('category').agg({
-            'partner_id': 'count',
-            'changes_count': 'mean',
-            'success_rate': 'mean',
-            'total_orders': 'sum'
-        }).reset_index()
-
-        # Сортування категорій у правильному порядку
-        category_order = ['0. Без змін', '1. 0.1-0.5 змін', '2. 0.5-1 зміна', '3. 1-2 зміни',
-                          '4. 2-3 зміни', '5. 3-4 зміни', '6. 4-5 змін', '7. 5+ змін']
-        category_stats['category'] = pd.Categorical(category_stats['category'],
-                                                    categories=category_order,
-                                                    ordered=True)
-        category_stats = category_stats.sort_values('category')
+        # Статистика по категоріях середньої кількості змін на замовлення
+        category_stats = data['changes_stats']
 
         # Створення графіку
         x = np.arange(len(category_stats))
@@ -1259,7 +1161,7 @@ Unsuccessful: {unsuccessful_orders} ({(unsuccessful_orders / total_orders * 100
 
         # Налаштовуємо мітки осі X
         ax1.set_xticks(x)
-        ax1.set_xticklabels([display_categories[cat] for cat in category_stats['category']], rotation=45, ha='right')
+        ax1.set_xticklabels(category_stats.index, rotation=45, ha='right')
 
         # Додаємо підписи значень для клієнтів
         for i, v in enumerate(category_stats['partner_id']):
@@ -1284,69 +1186,12 @@ Unsuccessful: {unsuccessful_orders} ({(unsuccessful_orders / total_orders * 100
         plt.title('Аналіз клієнтів за середньою кількістю змін на одне замовлення')
         fig.tight_layout()
 
-    def _create_customer_amount_success_distribution_graph(self, df):
-        print("\n=== Starting analysis ===")
-
-        # Закриваємо всі відкриті фігури перед створенням нової
-        plt.close('all')
-
+    def _create_customer_amount_success_distribution_graph(self, data):
+        """Create customer amount success by fixed amount ranges"""
         fig, ax = plt.subplots(figsize=(15, 8))
 
-        # Конвертуємо суму в числовий формат
-        df['avg_amount'] = pd.to_numeric(df['avg_amount'], errors='coerce')
-
-        # Відфільтруємо від'ємні значення
-        df = df[df['avg_amount'] >= 0]
-
-        # Розраховуємо середню суму замовлень для кожного клієнта
-        customer_stats = df.groupby('partner_id').agg({
-            'avg_amount': 'mean',
-            'success_rate': 'mean'  # відсоток успішності
-        }).reset_index()
-
-        # Видаляємо викиди (суми більше 99-го перцентиля)
-        amount_99th = np.percentile(customer_stats['avg_amount'], 99)
-        customer_stats = customer_stats[customer_stats['avg_amount'] <= amount_99th]
-
-        # Створюємо власні межі для груп
-        amount_bins = [
-            0,  # мінімум
-            100,  # до 100 грн
-            500,  # до 500 грн
-            1000,  # до 1000 грн
-            2000,  # до 2000 грн
-            5000,  # до 5000 грн
-            10000,  # до 10000 грн
-            20000,  # до 20000 грн
-            float('inf')  # решта
-        ]
-
-        # Створюємо мітки для груп
-        labels = [
-            '0-100',
-            '100-500',
-            '500-1K',
-            '1K-2K',
-            '2K-5K',
-            '5K-10K',
-            '10K-20K',
-            '20K+'
-        ]
-
-        # Застосовуємо групування
-        customer_stats['amount_group'] = pd.cut(
-            customer_stats['avg_amount'],
-            bins=amount_bins,
-            labels=labels,
-            include_lowest=True
-        )
-
-        # Рахуємо статистику для кожної групи
-        group_stats = customer_stats.groupby('amount_group').agg({
-            'partner_id': 'count',  # кількість клієнтів
-            'success_rate': 'mean',  # середній відсоток успішності
-            'avg_amount': 'mean'  # середня сума замовлення
-        }).reset_index()
+        # Середня сума замовлень клієнтів без викидів, за групами сум
+        group_stats = data['amount_group_stats']
 
         # Створення графіку з двома осями
         x = np.arange(len(group_stats))
@@ -1397,8 +1242,9 @@ Unsuccessful: {unsuccessful_orders} ({(unsuccessful_orders / total_orders * 100
         plt.tight_layout()
 
 
-    def _create_customer_order_dependency(self, df):
+    def _create_customer_order_dependency(self, data):
         """Create a scatter plot showing dependency between success rate and total orders"""
+        df = data['partners']
         plt.figure(figsize=(10, 6))
         plt.scatter(df['total_orders'], df['success_rate'], s=3, alpha=0.5)
         plt.xlabel('Total Orders')
@@ -1408,9 +1254,9 @@ Unsuccessful: {unsuccessful_orders} ({(unsuccessful_orders / total_orders * 100
         plt.tight_layout()
 
 
-    def _create_customer_age_dependency(self, df):
+    def _create_customer_age_dependency(self, data):
+        df = data['partners']
         plt.figure(figsize=(10, 6))
-        df['partner_order_age_months'] = df['partner_order_age_days'] // 30
         plt.scatter(df['partner_order_age_months'], df['success_rate'], s=3, alpha=0.5)
         plt.xlabel('Partner Age (months)')
         plt.ylabel('Success Rate (%)')
@@ -1418,7 +1264,8 @@ Unsuccessful: {unsuccessful_orders} ({(unsuccessful_orders / total_orders * 100
         plt.grid(True, linestyle='--', alpha=0.7)
         plt.tight_layout()
 
-    def _create_customer_messages_dependency(self, df):
+    def _create_customer_messages_dependency(self, data):
+        df = data['partners']
         plt.figure(figsize=(10, 6))
         plt.scatter(df['total_messages'], df['success_rate'], s=3, alpha=0.5)
         plt.xlabel('Messages')
@@ -1428,7 +1275,8 @@ Unsuccessful: {unsuccessful_orders} ({(unsuccessful_orders / total_orders * 100
         plt.tight_layout()
 
 
-    def _create_customer_changes_dependency(self, df):
+    def _create_customer_changes_dependency(self, data):
+        df = data['partners']
         plt.figure(figsize=(10, 6))
 
         plt.scatter(df['changes_count'], df['success_rate'], s=3, alpha=0.5)
@@ -0,0 +1,10 @@
+from odoo import models, fields
+
+
+class AnalyticsFederatedCollector(models.Model):
+    _inherit = 'analytics.federated.collector'
+
+    collector_model = fields.Selection(
+        selection_add=[('data.processor', 'Data Processor (partners)')],
+        ondelete={'data.processor': 'cascade'},
+    )
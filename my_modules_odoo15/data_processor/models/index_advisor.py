@@ -0,0 +1,20 @@
+from odoo import models, api
+
+
+class AnalyticsIndexAdvisor(models.Model):
+    _inherit = 'analytics.index.advisor'
+
+    @api.model
+    def _get_analytics_queries(self):
+        queries = super()._get_analytics_queries()
+        queries.append({
+            'name': 'data.processor: partner statistics',
+            'query': self.env['data.processor']._get_partner_stats_query(),
+            'params': (0,),
+            'indexes': [
+                {'table': 'mail_message', 'columns': ['model', 'res_id']},
+                {'table': 'mail_message', 'columns': ['res_id'], 'where': "model = 'sale.order'"},
+                {'table': 'mail_tracking_value', 'columns': ['mail_message_id']},
+            ],
+        })
+        return queries
@@ -12,7 +12,7 @@ This module collects and analyzes sales order data with focus on order success r
     "license": "OPL-1",
     "category": "Sales/CRM",
     "depends": [
-        "sale_crm",
+        "sale_crm", "analytics_base",
     ],
     "data": [
         "security/ir.model.access.csv",
@@ -22,6 +22,7 @@ This module collects and analyzes sales order data with focus on order success r
     "external_dependencies": {
         "python": ["pandas"],
     },
+    "post_init_hook": "post_init_hook",
     "installable": True,
     "auto_install": False,
     "application": True,
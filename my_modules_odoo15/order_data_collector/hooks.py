@@ -0,0 +1,6 @@
+from odoo import api, SUPERUSER_ID
+
+
+def post_init_hook(cr, registry):
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    env['analytics.index.advisor']._auto_provision_indexes()
@@ -1 +1,3 @@
 from . import order_data_collector
+from . import index_advisor
+from . import federated_collector
@@ -0,0 +1,20 @@
+from odoo import models, api
+
+
+class AnalyticsIndexAdvisor(models.Model):
+    _inherit = 'analytics.index.advisor'
+
+    @api.model
+    def _get_analytics_queries(self):
+        queries = super()._get_analytics_queries()
+        queries.append({
+            'name': 'order.data.collector: order statistics',
+            'query': self.env['order.data.collector']._get_order_stats_query(),
+            'params': (0, 0),
+            'indexes': [
+                {'table': 'sale_order', 'columns': ['partner_id', 'create_date']},
+                {'table': 'mail_message', 'columns': ['model', 'res_id']},
+                {'table': 'mail_tracking_value', 'columns': ['mail_message_id']},
+            ],
+        })
+        return queries
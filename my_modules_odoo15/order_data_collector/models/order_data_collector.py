@@ -12,6 +12,7 @@ _logger = logging.getLogger(__name__)
 
 class OrderDataCollector(models.Model):
     _name = 'order.data.collector'
+    _inherit = ['analytics.query.mixin']
     _description = 'Order Data Collector'
 
     name = fields.Char(required=True)
@@ -67,191 +68,243 @@ class OrderDataCollector(models.Model):
             else:
                 record.date_range_display = "Period not defined"
 
-    def action_collect_data(self):
-        """Collect all necessary data and save to CSV"""
-        self.ensure_one()
-        try:
-            # SQL query to get order data with success rates
-            query = """
-                WITH order_data AS (
-                    SELECT 
-                        so.id as order_id,
-                        so.name as order_name,
-                        so.create_date as create_date,
-                        so.partner_id,
-                        so.state,
-                        so.amount_total as order_amount,
-                        CASE WHEN so.state = 'sale' THEN 1 ELSE 0 END as is_successful,
-                        (
-                            SELECT COUNT(DISTINCT m.id)
-                            FROM mail_message m 
-                            WHERE m.res_id = so.id AND m.model = 'sale.order'
-                        ) as order_messages,
-                        (
-                            SELECT COUNT(DISTINCT CASE 
-                                WHEN EXISTS (
-                                    SELECT 1 FROM mail_tracking_value mtv 
-                                    WHERE mtv.mail_message_id = m.id
-                                ) THEN m.id 
-                            END)
-                            FROM mail_message m
-                            WHERE m.res_id = so.id AND m.model = 'sale.order'
-                        ) as order_changes,
-                        (
-                            SELECT COALESCE(
-                                CAST(COUNT(CASE WHEN s2.state = 'sale' THEN 1 END) AS DECIMAL(10,2)) /
-                                NULLIF(COUNT(*), 0),
-                                0
-                            )
-                            FROM sale_order s2
-                            WHERE s2.partner_id = so.partner_id
-                            AND s2.create_date < so.create_date
-                        ) as partner_success_rate,
-                        (
-                            SELECT COUNT(*)
-                            FROM sale_order s2
-                            WHERE s2.partner_id = so.partner_id
-                            AND s2.create_date < so.create_date
-                        ) as partner_total_orders,
-                        (
-                            SELECT 
-                                EXTRACT(DAY FROM (so.create_date - MIN(s2.create_date)))::INTEGER
-                            FROM sale_order s2
-                            WHERE s2.partner_id = so.partner_id
-                            AND s2.create_date < so.create_date
-                        ) as partner_order_age_days,
-                        (
-                            SELECT COALESCE(AVG(s2.amount_total), 0)
-                            FROM sale_order s2
-                            WHERE s2.partner_id = so.partner_id
-                            AND s2.create_date < so.create_date
-                        ) as partner_avg_amount,
-                        (
-                            SELECT COALESCE(AVG(s2.amount_total), 0)
+    def _get_order_stats_query(self):
+        """Return the order-level extraction query, parametrized twice by the prefix number"""
+        # SQL query to get order data with success rates
+        query = """
+            WITH order_data AS (
+                SELECT 
+                    so.id as order_id,
+                    so.name as order_name,
+                    so.create_date as create_date,
+                    so.partner_id,
+                    so.state,
+                    so.amount_total as order_amount,
+                    CASE WHEN so.state = 'sale' THEN 1 ELSE 0 END as is_successful,
+                    (
+                        SELECT COUNT(DISTINCT m.id)
+                        FROM mail_message m 
+                        WHERE m.res_id = so.id AND m.model = 'sale.order'
+                    ) as order_messages,
+                    (
+                        SELECT COUNT(DISTINCT CASE 
+                            WHEN EXISTS (
+                                SELECT 1 FROM mail_tracking_value mtv 
+                                WHERE mtv.mail_message_id = m.id
+                            ) THEN m.id 
+                        END)
+                        FROM mail_message m
+                        WHERE m.res_id = so.id AND m.model = 'sale.order'
+                    ) as order_changes,
+                    (
+                        SELECT COALESCE(
+                            CAST(COUNT(CASE WHEN s2.state = 'sale' THEN 1 END) AS DECIMAL(10,2)) /
+                            NULLIF(COUNT(*), 0),
+                            0
+                        )
+                        FROM sale_order s2
+                        WHERE s2.partner_id = so.partner_id
+                        AND s2.create_date < so.create_date
+                    ) as partner_success_rate,
+                    (
+                        SELECT COUNT(*)
+                        FROM sale_order s2
+                        WHERE s2.partner_id = so.partner_id
+                        AND s2.create_date < so.create_date
+                    ) as partner_total_orders,
+                    (
+                        SELECT 
+                            EXTRACT(DAY FROM (so.create_date - MIN(s2.create_date)))::INTEGER
+                        FROM sale_order s2
+                        WHERE s2.partner_id = so.partner_id
+                        AND s2.create_date < so.create_date
+                    ) as partner_order_age_days,
+                    (
+                        SELECT COALESCE(AVG(s2.amount_total), 0)
+                        FROM sale_order s2
+                        WHERE s2.partner_id = so.partner_id
+                        AND s2.create_date < so.create_date
+                    ) as partner_avg_amount,
+                    (
+                        SELECT COALESCE(AVG(s2.amount_total), 0)
+                        FROM sale_order s2
+                        WHERE s2.partner_id = so.partner_id
+                        AND s2.create_date < so.create_date
+                        AND s2.state = 'sale'
+                    ) as partner_success_avg_amount,
+                    (
+                        SELECT COALESCE(AVG(s2.amount_total), 0)
+                        FROM sale_order s2
+                        WHERE s2.partner_id = so.partner_id
+                        AND s2.create_date < so.create_date
+                        AND s2.state != 'sale'
+                    ) as partner_fail_avg_amount,
+                    (
+                        SELECT COUNT(DISTINCT m.id)
+                        FROM sale_order s2
+                        LEFT JOIN mail_message m ON m.res_id = s2.id AND m.model = 'sale.order'
+                        WHERE s2.partner_id = so.partner_id
+                        AND s2.create_date < so.create_date
+                    ) as partner_total_messages,
+                    (
+                        SELECT COALESCE(AVG(message_count), 0)
+                        FROM (
+                            SELECT s2.id, COUNT(DISTINCT m.id) as message_count
                             FROM sale_order s2
+                            LEFT JOIN mail_message m ON m.res_id = s2.id AND m.model = 'sale.order'
                             WHERE s2.partner_id = so.partner_id
                             AND s2.create_date < so.create_date
                             AND s2.state = 'sale'
-                        ) as partner_success_avg_amount,
-                        (
-                            SELECT COALESCE(AVG(s2.amount_total), 0)
+                            GROUP BY s2.id
+                        ) as t
+                    ) as partner_success_avg_messages,
+                    (
+                        SELECT COALESCE(AVG(message_count), 0)
+                        FROM (
+                            SELECT s2.id, COUNT(DISTINCT m.id) as message_count
                             FROM sale_order s2
+                            LEFT JOIN mail_message m ON m.res_id = s2.id AND m.model = 'sale.order'
                             WHERE s2.partner_id = so.partner_id
                             AND s2.create_date < so.create_date
                             AND s2.state != 'sale'
-                        ) as partner_fail_avg_amount,
-                        (
-                            SELECT COUNT(DISTINCT m.id)
+                            GROUP BY s2.id
+                        ) as t
+                    ) as partner_fail_avg_messages,
+                    (
+                        SELECT COALESCE(
+                            CAST(COUNT(DISTINCT CASE 
+                                WHEN EXISTS (
+                                    SELECT 1 FROM mail_tracking_value mtv 
+                                    WHERE mtv.mail_message_id = m2.id
+                                ) THEN m2.id 
+                            END) AS DECIMAL(10,2)) /
+                            NULLIF(COUNT(DISTINCT s2.id), 0),
+                            0
+                        )
+                        FROM sale_order s2
+                        LEFT JOIN mail_message m2 ON m2.res_id = s2.id AND m2.model = 'sale.order'
+                        WHERE s2.partner_id = so.partner_id
+                        AND s2.create_date < so.create_date
+                    ) as partner_avg_changes,
+                    (
+                        SELECT COALESCE(AVG(change_count), 0)
+                        FROM (
+                            SELECT s2.id,
+                            COUNT(DISTINCT CASE 
+                                WHEN EXISTS (
+                                    SELECT 1 FROM mail_tracking_value mtv 
+                                    WHERE mtv.mail_message_id = m2.id
+                                ) THEN m2.id 
+                            END) as change_count
                             FROM sale_order s2
-                            LEFT JOIN mail_message m ON m.res_id = s2.id AND m.model = 'sale.order'
+                            LEFT JOIN mail_message m2 ON m2.res_id = s2.id AND m2.model = 'sale.order'
                             WHERE s2.partner_id = so.partner_id
                             AND s2.create_date < so.create_date
-                        ) as partner_total_messages,
-                        (
-                            SELECT COALESCE(AVG(message_count), 0)
-                            FROM (
-                                SELECT s2.id, COUNT(DISTINCT m.id) as message_count
-                                FROM sale_order s2
-                                LEFT JOIN mail_message m ON m.res_id = s2.id AND m.model = 'sale.order'
-                                WHERE s2.partner_id = so.partner_id
-                                AND s2.create_date < so.create_date
-                                AND s2.state = 'sale'
-                                GROUP BY s2.id
-                            ) as t
-                        ) as partner_success_avg_messages,
-                        (
-                            SELECT COALESCE(AVG(message_count), 0)
-                            FROM (
-                                SELECT s2.id, COUNT(DISTINCT m.id) as message_count
-                                FROM sale_order s2
-                                LEFT JOIN mail_message m ON m.res_id = s2.id AND m.model = 'sale.order'
-                                WHERE s2.partner_id = so.partner_id
-                                AND s2.create_date < so.create_date
-                                AND s2.state != 'sale'
-                                GROUP BY s2.id
-                            ) as t
-                        ) as partner_fail_avg_messages,
-                        (
-                            SELECT COALESCE(
-                                CAST(COUNT(DISTINCT CASE 
-                                    WHEN EXISTS (
-                                        SELECT 1 FROM mail_tracking_value mtv 
-                                        WHERE mtv.mail_message_id = m2.id
-                                    ) THEN m2.id 
-                                END) AS DECIMAL(10,2)) /
-                                NULLIF(COUNT(DISTINCT s2.id), 0),
-                                0
-                            )
+                            AND s2.state = 'sale'
+                            GROUP BY s2.id
+                        ) as t
+                    ) as partner_success_avg_changes,
+                    (
+                        SELECT COALESCE(AVG(change_count), 0)
+                        FROM (
+                            SELECT s2.id,
+                            COUNT(DISTINCT CASE 
+                                WHEN EXISTS (
+                                    SELECT 1 FROM mail_tracking_value mtv 
+                                    WHERE mtv.mail_message_id = m2.id
+                                ) THEN m2.id 
+                            END) as change_count
                             FROM sale_order s2
                             LEFT JOIN mail_message m2 ON m2.res_id = s2.id AND m2.model = 'sale.order'
                             WHERE s2.partner_id = so.partner_id
                             AND s2.create_date < so.create_date
-                        ) as partner_avg_changes,
-                        (
-                            SELECT COALESCE(AVG(change_count), 0)
-                            FROM (
-                                SELECT s2.id,
-                                COUNT(DISTINCT CASE 
-                                    WHEN EXISTS (
-                                        SELECT 1 FROM mail_tracking_value mtv 
-                                        WHERE mtv.mail_message_id = m2.id
-                                    ) THEN m2.id 
-                                END) as change_count
-                                FROM sale_order s2
-                                LEFT JOIN mail_message m2 ON m2.res_id = s2.id AND m2.model = 'sale.order'
-                                WHERE s2.partner_id = so.partner_id
-                                AND s2.create_date < so.create_date
-                                AND s2.state = 'sale'
-                                GROUP BY s2.id
-                            ) as t
-                        ) as partner_success_avg_changes,
-                        (
-                            SELECT COALESCE(AVG(change_count), 0)
-                            FROM (
-                                SELECT s2.id,
-                                COUNT(DISTINCT CASE 
-                                    WHEN EXISTS (
-                                        SELECT 1 FROM mail_tracking_value mtv 
-                                        WHERE mtv.mail_message_id = m2.id
-                                    ) THEN m2.id 
-                                END) as change_count
-                                FROM sale_order s2
-                                LEFT JOIN mail_message m2 ON m2.res_id = s2.id AND m2.model = 'sale.order'
-                                WHERE s2.partner_id = so.partner_id
-                                AND s2.create_date < so.create_date
-                                AND s2.state != 'sale'
-                                GROUP BY s2.id
-                            ) as t
-                        ) as partner_fail_avg_changes
-                    FROM sale_order so
-                    ORDER BY so.create_date
-                )
-                SELECT
-                    %s * 1000000 + order_id as order_id_with_prefix,
-                    order_name,
-                    is_successful,
-                    create_date,
-                    %s * 1000000 + partner_id as partner_id_with_prefix,
-                    order_amount,
-                    order_messages,
-                    order_changes,
-                    COALESCE(partner_success_rate * 100, 0) as partner_success_rate,
-                    COALESCE(partner_total_orders, 0) as partner_total_orders,
-                    COALESCE(partner_order_age_days, 0) as partner_order_age_days,
-                    COALESCE(partner_avg_amount, 0) as partner_avg_amount,
-                    COALESCE(partner_success_avg_amount, 0) as partner_success_avg_amount,
-                    COALESCE(partner_fail_avg_amount, 0) as partner_fail_avg_amount,
-                    COALESCE(partner_total_messages, 0) as partner_total_messages,
-                    COALESCE(partner_success_avg_messages, 0) as partner_success_avg_messages,
-                    COALESCE(partner_fail_avg_messages, 0) as partner_fail_avg_messages,
-                    COALESCE(partner_avg_changes, 0) as partner_avg_changes,
-                    COALESCE(partner_success_avg_changes, 0) as partner_success_avg_changes,
-                    COALESCE(partner_fail_avg_changes, 0) as partner_fail_avg_changes
-                FROM order_data
-            """
-
-            self.env.cr.execute(query, (self.prefix_number, self.prefix_number))
-            results = self.env.cr.fetchall()
+                            AND s2.state != 'sale'
+                            GROUP BY s2.id
+                        ) as t
+                    ) as partner_fail_avg_changes
+                FROM sale_order so
+                ORDER BY so.create_date
+            )
+            SELECT
+                %s * 1000000 + order_id as order_id_with_prefix,
+                order_name,
+                is_successful,
+                create_date,
+                %s * 1000000 + partner_id as partner_id_with_prefix,
+                order_amount,
+                order_messages,
+                order_changes,
+                COALESCE(partner_success_rate * 100, 0) as partner_success_rate,
+                COALESCE(partner_total_orders, 0) as partner_total_orders,
+                COALESCE(partner_order_age_days, 0) as partner_order_age_days,
+                COALESCE(partner_avg_amount, 0) as partner_avg_amount,
+                COALESCE(partner_success_avg_amount, 0) as partner_success_avg_amount,
+                COALESCE(partner_fail_avg_amount, 0) as partner_fail_avg_amount,
+                COALESCE(partner_total_messages, 0) as partner_total_messages,
+                COALESCE(partner_success_avg_messages, 0) as partner_success_avg_messages,
+                COALESCE(partner_fail_avg_messages, 0) as partner_fail_avg_messages,
+                COALESCE(partner_avg_changes, 0) as partner_avg_changes,
+                COALESCE(partner_success_avg_changes, 0) as partner_success_avg_changes,
+                COALESCE(partner_fail_avg_changes, 0) as partner_fail_avg_changes
+            FROM order_data
+        """
+        return query
+
+    def _get_csv_header(self):
+        return ['order_id', 'order_name', 'is_successful', 'create_date', 'partner_id',
+                'order_amount', 'order_messages', 'order_changes',
+                'partner_success_rate', 'partner_total_orders', 'partner_order_age_days',
+                'partner_avg_amount', 'partner_success_avg_amount', 'partner_fail_avg_amount',
+                'partner_total_messages', 'partner_success_avg_messages', 'partner_fail_avg_messages',
+                'partner_avg_changes', 'partner_success_avg_changes', 'partner_fail_avg_changes']
+
+    def _get_cache_tables(self):
+        # Orders, messages and tracked changes feed the order statistics
+        return {
+            'sale_order': ['MAX(id)', 'MAX(write_date)', 'COUNT(*)'],
+            'mail_message': ['MAX(id)', 'COUNT(*)'],
+            'mail_tracking_value': ['MAX(id)', 'COUNT(*)'],
+        }
+
+    def _get_federated_query(self, prefix_number):
+        """Return (query, params, csv header) used by the federated collector"""
+        return self._get_order_stats_query(), (prefix_number, prefix_number), self._get_csv_header()
+
+    def action_collect_data(self):
+        """Collect all necessary data and save to CSV"""
+        self.ensure_one()
+        try:
+            query = self._get_order_stats_query()
+
+            cache = self.env['analytics.query.cache']
+            fingerprint = cache._get_fingerprint(self._name, query, (self.prefix_number, self.prefix_number))
+
+            with self._analytics_cursor() as cr:
+                change_marker = cache._get_change_marker(cr, self._get_cache_tables())
+                cached = cache._lookup(fingerprint, change_marker)
+                if not cached:
+                    cr.execute(query, (self.prefix_number, self.prefix_number))
+                    results = cr.fetchall()
+
+            # Source tables unchanged since the last collection: reuse its CSV
+            if cached:
+                data_file, metadata = cached
+                self.write({
+                    'date_from': metadata['date_from'],
+                    'date_to': metadata['date_to'],
+                    'data_file': data_file,
+                    'data_filename': f"{self.env.cr.dbname}_{self.prefix_number}.csv"
+                })
+                return {
+                    'type': 'ir.actions.client',
+                    'tag': 'display_notification',
+                    'params': {
+                        'title': _('Success'),
+                        'message': _('Data loaded from the query cache'),
+                        'sticky': False,
+                        'type': 'success',
+                    }
+                }
 
             if not results:
                 raise UserError(_("No data found to analyze"))
@@ -261,12 +314,7 @@ class OrderDataCollector(models.Model):
             writer = csv.writer(output)
 
             # Write header
-            writer.writerow(['order_id', 'order_name', 'is_successful', 'create_date', 'partner_id',
-                             'order_amount', 'order_messages', 'order_changes',
-                             'partner_success_rate', 'partner_total_orders', 'partner_order_age_days',
-                             'partner_avg_amount', 'partner_success_avg_amount', 'partner_fail_avg_amount',
-                             'partner_total_messages', 'partner_success_avg_messages', 'partner_fail_avg_messages',
-                             'partner_avg_changes', 'partner_success_avg_changes', 'partner_fail_avg_changes'])
+            writer.writerow(self._get_csv_header())
 
             # Write data rows
             for row in results:
@@ -282,6 +330,10 @@ class OrderDataCollector(models.Model):
                 'data_file': encoded_data,
                 'data_filename': f"{self.env.cr.dbname}_{self.prefix_number}.csv"
             })
+            cache._store(self._name, fingerprint, change_marker, encoded_data, {
+                'date_from': fields.Date.to_string(self.date_from),
+                'date_to': fields.Date.to_string(self.date_to),
+            })
 
             return {
                 'type': 'ir.actions.client',
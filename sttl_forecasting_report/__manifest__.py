@@ -3,7 +3,7 @@
 
 {
     "name": "Odoo Business Intelligence",
-    "version": "17.0.1.0",
+    "version": "17.0.1.1",
     "category": "Analytic",
     "summary": "AI module predicts sales and purchase metrics, enhancing decision-making and optimizing inventory and procurement.",
     "description": """
@@ -23,6 +23,7 @@
         # VIEWS
         "views/sale_forecasting_report_view.xml",
         "views/purchase_forecasting_report.xml",
+        "views/forecasting_backtest_views.xml",
         "views/menus.xml"
     ],
     "price": 0,
@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+from odoo import api, SUPERUSER_ID
+
+# Crons of data/forecasting_cron.xml (noupdate) changed by this version
+DOCUMENT_CRONS = ['sale_forecasting_scheduler', 'purchase_forecasting_scheduler']
+FAMILY_CRONS = [
+    'salesperson_forecasting_scheduler', 'salescustomer_forecasting_scheduler', 'salesproduct_forecasting_scheduler',
+    'purchaseperson_forecasting_scheduler', 'purchasevendor_forecasting_scheduler',
+    'purchaseproduct_forecasting_scheduler',
+]
+
+
+def migrate(cr, version):
+    """Refresh all the families from the document crons and stop the per-family crons"""
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    for xmlid in DOCUMENT_CRONS:
+        cron = env.ref('sttl_forecasting_report.%s' % xmlid, raise_if_not_found=False)
+        if cron:
+            cron.code = 'model.forecasting_run_all()'
+    for xmlid in FAMILY_CRONS:
+        cron = env.ref('sttl_forecasting_report.%s' % xmlid, raise_if_not_found=False)
+        if cron:
+            cron.active = False
@@ -1,3 +1,8 @@
+from . import forecasting_mixin
+from . import forecasting_model_state
+from . import forecasting_backtest
 from . import sale_forecasting_report
 from . import purchase_forecasting_report
 from . import forecasting
+from . import sale_order
+from . import purchase_order
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""Rolling-origin backtesting of the forecasting methods.
+
+Every series is cut at several forecast origins: the methods are fitted on the
+history before the origin and their forecasts compared with the periods after it.
+"""
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+import numpy as np
+import pandas as pd
+
+from . import holt_winters
+from . import model_selection
+from .forecasting import GRANULARITIES, VALUE_COLUMNS, resample_history, _fit_model, _can_fork_workers, _init_worker
+
+_logger = logging.getLogger(__name__)
+
+
+def rolling_origins(length, horizon=3, folds=3, step=None, min_train=2):
+    """Return the forecast origins (lengths of the training history) of a series of ``length`` periods.
+
+    The last origin leaves ``horizon`` periods to compare with, the previous ones
+    are ``step`` periods apart (``horizon`` by default).
+    """
+    step = step or horizon
+    last = length - horizon
+    return [origin for origin in (last - step * fold for fold in reversed(range(folds))) if origin >= min_train]
+
+
+def forecast_errors(actual, forecast, train, seasonal_periods=12):
+    """Return the MAPE and sMAPE (in %) and the MASE of ``forecast``.
+
+    MAPE ignores the periods without actual value; MASE is scaled by the in-sample
+    error of the seasonal naive method (naive when the history is shorter than a season).
+    """
+    error = forecast - actual
+    nonzero = actual != 0
+    mape = np.mean(np.abs(error[nonzero] / actual[nonzero])) * 100 if nonzero.any() else np.nan
+    denominator = np.abs(actual) + np.abs(forecast)
+    valid = denominator > 0
+    smape = np.mean(2 * np.abs(error[valid]) / denominator[valid]) * 100 if valid.any() else 0.0
+    lag = seasonal_periods if len(train) > seasonal_periods else 1
+    scale = np.mean(np.abs(train[lag:] - train[:-lag])) if len(train) > lag else 0.0
+    mase = np.mean(np.abs(error)) / scale if scale else np.nan
+    return mape, smape, mase
+
+
+def _forecast_amounts(model, train, steps, seasonal_periods=12, backend='statsmodels'):
+    """Forecast the ``train`` series (1-D) with ``model``"""
+    if model != model_selection.HOLT_WINTERS:
+        return model_selection.forecast(model, train[None, :], steps, seasonal_periods)[0]
+    if backend == 'numpy':
+        return holt_winters.fit_forecast(train[None, :], steps, seasonal_periods)[0][0]
+    series = pd.Series(train)
+    try:
+        model_fit = _fit_model(series, seasonal_periods, True)
+    except Exception:
+        model_fit = _fit_model(series, seasonal_periods, False)
+    return np.asarray(model_fit.forecast(steps), dtype=float)
+
+
+def _backtest_chunk(chunk, seasonal_periods=12, horizon=3, folds=3, models=None, backend='statsmodels'):
+    """Evaluate the series of ``chunk`` at their rolling origins.
+
+    Without ``models`` every origin is forecast with the method the selector
+    picks from its history. Returns a list of (series, model, MAPE, sMAPE, MASE, fit seconds).
+    """
+    evaluations = []
+    for name, amounts in chunk:
+        for origin in rolling_origins(len(amounts), horizon, folds):
+            train, actual = amounts[:origin], amounts[origin:origin + horizon]
+            for model in models or [model_selection.select_model(train, seasonal_periods)]:
+                start = time.process_time()
+                try:
+                    forecast = _forecast_amounts(model, train, horizon, seasonal_periods, backend)
+                except Exception as e:
+                    _logger.debug("Backtest of %s with %s at origin %s failed: %s", name, model, origin, e)
+                    continue
+                fit_time = time.process_time() - start
+                evaluations.append((name, model) + forecast_errors(actual, forecast, train, seasonal_periods) + (fit_time,))
+    return evaluations
+
+
+def backtest(sql_result, grouped=True, granularity='month', horizon=3, folds=3, models=None,
+             workers=0, chunk_size=50, memory_limit=0, backend='statsmodels'):
+    """Backtest the forecasting of the amount series of ``sql_result``.
+
+    ``sql_result`` has the rows of ``forecasting_prediction`` or, with ``grouped=False``,
+    of ``forecasting_details``. Series are evaluated by a pool of ``workers`` processes
+    in chunks of ``chunk_size`` like in ``forecasting_prediction``.
+    Returns {model: {series, origins, mape, smape, mase, fit_time, total_fit_time}}
+    where the errors and fit time are averages over the evaluations.
+    """
+    columns = ["month_date", "responsible"] + VALUE_COLUMNS if grouped else ["month_date"] + VALUE_COLUMNS
+    data = pd.DataFrame(sql_result, columns=columns)
+    if data.empty:
+        return {}
+    data = resample_history(data, granularity, by='responsible' if grouped else None)
+    seasonal_periods = GRANULARITIES[granularity][2]
+
+    if grouped:
+        series = [(name, total['sum'].to_numpy(dtype=float)) for name, total in data.groupby('responsible')]
+    else:
+        series = [(0, data['sum'].to_numpy(dtype=float))]
+    chunk_size = max(1, chunk_size or 1)
+    chunks = [series[i:i + chunk_size] for i in range(0, len(series), chunk_size)]
+
+    evaluations = []
+    arguments = (seasonal_periods, horizon, folds, models, backend)
+    if workers and workers > 1 and len(chunks) > 1 and _can_fork_workers():
+        # Same pool setup as forecasting_prediction: forked workers never touch the database
+        with ProcessPoolExecutor(max_workers=workers,
+                                 mp_context=multiprocessing.get_context('fork'),
+                                 initializer=_init_worker,
+                                 initargs=(memory_limit,)) as executor:
+            for chunk_evaluations in executor.map(_backtest_chunk, chunks, *map(repeat, arguments)):
+                evaluations.extend(chunk_evaluations)
+    else:
+        for chunk in chunks:
+            evaluations.extend(_backtest_chunk(chunk, *arguments))
+
+    if not evaluations:
+        return {}
+    frame = pd.DataFrame(evaluations, columns=['series', 'model', 'mape', 'smape', 'mase', 'fit_time'])
+    results = {}
+    for model, model_frame in frame.groupby('model'):
+        results[model] = {
+            'series': model_frame['series'].nunique(),
+            'origins': len(model_frame),
+            'mape': model_frame['mape'].mean(),
+            'smape': model_frame['smape'].mean(),
+            'mase': model_frame['mase'].mean(),
+            'fit_time': model_frame['fit_time'].mean(),
+            'total_fit_time': model_frame['fit_time'].sum(),
+        }
+    return results
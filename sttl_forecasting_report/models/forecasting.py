@@ -1,162 +1,472 @@
 # -*- coding: utf-8 -*-
+import hashlib
+import logging
+import multiprocessing
+import resource
+import signal
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+import numpy as np
 import pandas as pd
 from statsmodels.tsa.api import ExponentialSmoothing
 import warnings
 
+from . import holt_winters
+from . import model_selection
 
-def forecasting_details(sql_result):
+_logger = logging.getLogger(__name__)
+
+# Columns fitted for every series and the keys of their forecasts
+VALUE_COLUMNS = ['sum', 'qty_ordered', 'qty_delivered', 'qty_invoiced']
+FORECAST_KEYS = ['Total', 'Forecast_Qty_Ordered', 'Forecast_Qty_Delivered', 'Forecast_Qty_Invoiced']
+
+
+# Resampling granularities: (period alias, frequency of the period starts, seasonal periods)
+GRANULARITIES = {
+    'month': ('M', 'MS', 12),
+    'week': ('W-SUN', 'W-MON', 52),
+}
+
+
+def resample_history(data, granularity='month', by=None):
+    """Aggregate the daily history of ``data`` into calendar periods.
+
+    Every series (grouped by the ``by`` column, or the whole frame) is summed per
+    month or week and runs from its first period to the last period of the history,
+    periods without orders being filled with zeros. ``month_date`` becomes the first
+    day of the period.
+    """
+    period_alias = GRANULARITIES[granularity][0]
+    if data.empty:
+        return data
+
+    series = by or '_series'
+    frame = data.assign(period=pd.to_datetime(data['month_date']).dt.to_period(period_alias).array.asi8)
+    if not by:
+        frame['_series'] = 0
+    frame[VALUE_COLUMNS] = frame[VALUE_COLUMNS].astype(float)
+    totals = frame.groupby([series, 'period'])[VALUE_COLUMNS].sum()
+
+    # Full range of periods of every series, built without a loop over the series
+    first = frame.groupby(series)['period'].min()
+    lengths = frame['period'].max() - first.to_numpy() + 1
+    starts = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    periods = np.repeat(first.to_numpy(), lengths) + np.arange(lengths.sum()) - starts
+    full_index = pd.MultiIndex.from_arrays(
+        [np.repeat(first.index.to_numpy(), lengths), periods], names=[series, 'period'])
+    totals = totals.reindex(full_index, fill_value=0.0).reset_index()
+
+    totals['month_date'] = pd.PeriodIndex(
+        pd.arrays.PeriodArray(totals['period'].to_numpy(), dtype=pd.PeriodDtype(period_alias))).to_timestamp()
+    return totals[[column for column in data.columns if column in totals.columns]]
+
+
+def _forecast_dates(data, granularity='month', forecast_periods=12):
+    """Return the starts of the ``forecast_periods`` periods following the history"""
+    freq = GRANULARITIES[granularity][1]
+    last_date = data['month_date'].max()
+    return pd.date_range(start=last_date, periods=forecast_periods + 1, freq=freq)[1:]
+
+
+def history_hash(total, granularity='month'):
+    """Fingerprint the resampled history of a series, see ``model_states``"""
+    digest = hashlib.sha1(granularity.encode())
+    digest.update(pd.util.hash_pandas_object(total[['month_date'] + VALUE_COLUMNS], index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def forecasting_details(sql_result, granularity='month', model_states=None):
+    """Forecast the next 12 months (or weeks) of the whole history of ``sql_result``.
+
+    ``model_states`` is the model store of the series under the key 0, see
+    ``forecasting_prediction``.
+    """
     data = pd.DataFrame(sql_result, columns=["month_date", "sum", "qty_ordered", "qty_delivered", "qty_invoiced"])
+    data = resample_history(data, granularity)
+    model_states = {} if model_states is None else model_states
 
-    # Forecasting for each product
-    forecast_periods = 12  # Forecasting for the next 12 months
     forecast_results = []
-
     if(len(data)) >= 2:
-        
-        # seasonal forecasting if enough data
-        try:
-            model_total = ExponentialSmoothing(
-                data['sum'].astype(float), trend='add', seasonal='add', seasonal_periods=12)
-            model_fit_total = model_total.fit()
+        seasonal_periods = GRANULARITIES[granularity][2]
+        forecast_dates = _forecast_dates(data, granularity)
+        total_hash = history_hash(data, granularity)
+        model = model_selection.select_model(data['sum'].to_numpy(dtype=float), seasonal_periods)
+        if model == model_selection.HOLT_WINTERS:
+            forecast_results, state = _forecast_group(
+                0, data, forecast_dates, seasonal_periods, total_hash, model_states.get(0))
+        else:
+            _name, forecast_results, state = _forecast_simple(
+                0, data, forecast_dates, seasonal_periods, total_hash, model)
+        model_states[0] = state
+        for forecast_dict in forecast_results:
+            del forecast_dict['Responsible']
+    else:
+        print(f"Skipping data due to insufficient data points.")
+
+    return forecast_results
 
-            model_qty = ExponentialSmoothing(
-                data['qty_ordered'].astype(float), trend='add', seasonal='add', seasonal_periods=12)
-            model_fit_qty_ordered = model_qty.fit()
 
-            model_qty_delivered = ExponentialSmoothing(
-                data['qty_delivered'].astype(float), trend='add', seasonal='add', seasonal_periods=12)
-            model_fit_qty_delivered = model_qty_delivered.fit()
+def _model_params(model_fit):
+    """Return the smoothing parameters and initial states of ``model_fit``"""
+    params = model_fit.params
+    seasonal = model_fit.model.seasonal is not None
+    return {
+        'seasonal': seasonal,
+        'smoothing_level': float(params['smoothing_level']),
+        'smoothing_trend': float(params['smoothing_trend']),
+        'smoothing_seasonal': float(params['smoothing_seasonal']) if seasonal else None,
+        'initial_level': float(params['initial_level']),
+        'initial_trend': float(params['initial_trend']),
+        'initial_seasons': [float(value) for value in params['initial_seasons']] if seasonal else [],
+    }
+
+
+def _start_params(params):
+    """Return the optimizer starting values of a model fitted with ``params``"""
+    values = [params['smoothing_level'], params['smoothing_trend']]
+    if params['seasonal']:
+        values.append(params['smoothing_seasonal'])
+    values += [params['initial_level'], params['initial_trend']]
+    values += params['initial_seasons']
+    return np.asarray(values, dtype=float)
+
+
+class SeriesTimeout(Exception):
+    pass
+
+
+def _fit_model(series, seasonal_periods, seasonal, params=None):
+    """Fit one series, starting the optimizer from the ``params`` of a previous fit if any"""
+    model = ExponentialSmoothing(
+        series, trend='add', seasonal='add' if seasonal else None, seasonal_periods=seasonal_periods)
+    if params and params['seasonal'] == seasonal:
+        try:
+            return model.fit(start_params=_start_params(params))
+        except (SeriesTimeout, MemoryError):
+            # Over the limits of _fit_chunk: the series is skipped, not fitted again
+            raise
+        except Exception as e:
+            _logger.debug("Warm start failed, fitting from scratch: %s", e)
+    return model.fit()
 
-            model_qty_invoiced = ExponentialSmoothing(
-                data['qty_invoiced'].astype(float), trend='add', seasonal='add', seasonal_periods=12)
-            model_fit_qty_invoiced = model_qty_invoiced.fit()
 
+def _fit_models(total, name, seasonal_periods=12, previous=None):
+    """Fit one model per value column of a group and return their fitted results.
 
+    ``previous`` holds the parameters of the last fits of the group, used as starting values.
+    """
+    previous = previous or [None] * len(VALUE_COLUMNS)
+    # seasonal forecasting if enough data: the seasonal states need two full seasons
+    if len(total) >= 2 * seasonal_periods:
+        try:
+            return [
+                _fit_model(total[column].astype(float), seasonal_periods, True, params)
+                for column, params in zip(VALUE_COLUMNS, previous)
+            ]
+        except (SeriesTimeout, MemoryError):
+            raise
         except Exception as e:
-            warnings.warn(f"Error for product {data} when adding seasonality: {str(e)}")
-
-            model_total = ExponentialSmoothing(
-                data['sum'].astype(float), trend='add', seasonal_periods=12)
-            model_fit_total = model_total.fit()
-
-            model_qty = ExponentialSmoothing(
-                data['qty_ordered'].astype(float), trend='add', seasonal_periods=12)
-            model_fit_qty_ordered = model_qty.fit()
-
-            model_qty_delivered = ExponentialSmoothing(
-                data['qty_delivered'].astype(float), trend='add', seasonal_periods=12)
-            model_fit_qty_delivered = model_qty_delivered.fit()
-
-            model_qty_invoiced = ExponentialSmoothing(
-                data['qty_invoiced'].astype(float), trend='add', seasonal_periods=12)
-            model_fit_qty_invoiced = model_qty_invoiced.fit()
-
-         # Forecast the next 12 months
-        forecast_values_total = model_fit_total.forecast(steps=forecast_periods).tolist()
-        forecast_values_qty_ordered = model_fit_qty_ordered.forecast(steps=forecast_periods).tolist()
-        forecast_values_qty_delivered = model_fit_qty_delivered.forecast(steps=forecast_periods).tolist()
-        forecast_values_qty_invoiced = model_fit_qty_invoiced.forecast(steps=forecast_periods).tolist()
-
-        # Generate the date range for the forecast (next 12 months)
-        last_date = data['month_date'].max()
-        forecast_dates = pd.date_range(
-            start=last_date, periods=forecast_periods, freq='MS')
-
-        # Create a list of dictionaries to store the forecast results for the current product
-        forecast_dicts = []
-        for i in range(forecast_periods):
-            forecast_dict = {
-                'Month': forecast_dates[i],
-                'Total': forecast_values_total[i],
-                'Forecast_Qty_Ordered': forecast_values_qty_ordered[i],
-                'Forecast_Qty_Delivered': forecast_values_qty_delivered[i],
-                'Forecast_Qty_Invoiced': forecast_values_qty_invoiced[i],
-            }
-            forecast_dicts.append(forecast_dict)
+            warnings.warn(f"Error for product {name} when adding seasonality: {str(e)}")
+    return [
+        _fit_model(total[column].astype(float), seasonal_periods, False, params)
+        for column, params in zip(VALUE_COLUMNS, previous)
+    ]
+
+
+def _forecast_dicts(name, forecast_dates, forecast_values):
+    # Create a list of dictionaries to store the forecast results for the current product
+    forecast_dicts = []
+    for i in range(len(forecast_dates)):
+        forecast_dict = {
+            'Month': forecast_dates[i],
+            'Responsible': name,
+        }
+        forecast_dict.update({key: values[i] for key, values in zip(FORECAST_KEYS, forecast_values)})
+        forecast_dicts.append(forecast_dict)
+    return forecast_dicts
+
+
+def _is_reusable(state, total_hash, forecast_dates):
+    """Tell whether the stored forecasts of ``state`` still hold for the history ``total_hash``"""
+    return bool(state and total_hash and state['hash'] == total_hash
+                and not state.get('budget_fallback')
+                and state['forecasts'] and len(state['forecasts'][0]) == len(forecast_dates))
+
+
+def _forecast_simple(name, total, forecast_dates, seasonal_periods=12, total_hash=None, model=None,
+                     budget_fallback=False):
+    """Forecast one group with a method cheaper than Holt-Winters, see ``model_selection``.
+
+    Returns (name, forecast dictionaries, model state).
+    """
+    forecast_values = model_selection.forecast(
+        model, total[VALUE_COLUMNS].to_numpy(dtype=float).T, len(forecast_dates), seasonal_periods).tolist()
+    state = {
+        'hash': total_hash,
+        'model': model,
+        'params': [None] * len(VALUE_COLUMNS),
+        'forecasts': forecast_values,
+    }
+    if budget_fallback:
+        # Not reused by the next refresh, which fits the group again if the budget allows
+        state['budget_fallback'] = True
+    return name, _forecast_dicts(name, forecast_dates, forecast_values), state
+
+
+def _forecast_fallback(chunk, forecast_dates, seasonal_periods=12):
+    """Forecast the Holt-Winters groups of ``chunk`` with a cheap method once the CPU budget is spent"""
+    return [
+        _forecast_simple(name, total, forecast_dates, seasonal_periods, total_hash,
+                         model_selection.fallback_model(len(total), seasonal_periods), budget_fallback=True)
+        for name, total, total_hash, _state in chunk
+    ]
+
+
+def _forecast_group(name, total, forecast_dates, seasonal_periods=12, total_hash=None, state=None):
+    """Return the Holt-Winters forecast dictionaries of one group and its new model state.
+
+    When ``state`` was computed from the same history (``total_hash``), its
+    forecasts are reused without fitting; otherwise its parameters warm-start the fit.
+    """
+    if _is_reusable(state, total_hash, forecast_dates):
+        return _forecast_dicts(name, forecast_dates, state['forecasts']), state
+
+    previous = state and state.get('model') == model_selection.HOLT_WINTERS and state['params']
+    model_fits = _fit_models(total, name, seasonal_periods, previous)
+    forecast_values = [
+        model_fit.forecast(steps=len(forecast_dates)).tolist()
+        for model_fit in model_fits
+    ]
+    new_state = {
+        'hash': total_hash,
+        'model': model_selection.HOLT_WINTERS,
+        'params': [_model_params(model_fit) for model_fit in model_fits],
+        'forecasts': forecast_values,
+    }
+    return _forecast_dicts(name, forecast_dates, forecast_values), new_state
+
+
+@contextmanager
+def _time_limit(seconds):
+    """Interrupt the block after ``seconds``.
+
+    Relies on SIGALRM, so it only applies in the main thread of a process,
+    i.e. in the pool workers; elsewhere the block runs without limit (logged by
+    ``_fit_chunk``).
+    """
+    if not seconds or threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    def _timeout(signum, frame):
+        raise SeriesTimeout(f"fitting took more than {seconds} seconds")
+
+    previous = signal.signal(signal.SIGALRM, _timeout)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _can_fork_workers():
+    """Return whether the fitting pool may fork this process.
+
+    Fork copies only the calling thread: a lock held by another thread (logging
+    handlers, the database connection pool) would stay locked in the workers. In
+    the threaded server the groups are fitted in the calling thread instead; the
+    prefork server (``--workers``) runs the crons in single-threaded processes.
+    """
+    if threading.active_count() > 1:
+        _logger.warning("%s threads running, fitting without worker processes", threading.active_count())
+        return False
+    return True
+
+
+def _init_worker(memory_limit):
+    """Cap the address space of a pool worker to ``memory_limit`` MB"""
+    if memory_limit:
+        _soft, hard = resource.getrlimit(resource.RLIMIT_AS)
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit * 1024 * 1024, hard))
+
+
+def _fit_chunk(chunk, forecast_dates, timeout=0, seasonal_periods=12):
+    """Forecast the groups of ``chunk`` in order, skipping those over the time or memory limit.
+
+    Returns ([(name, forecast dictionaries, model state)], CPU seconds spent).
+    """
+    if timeout and threading.current_thread() is not threading.main_thread():
+        _logger.warning("Fitting timeout of %s seconds not enforced outside the main thread", timeout)
+    start = time.process_time()
+    forecast_results = []
+    for name, total, total_hash, state in chunk:
+        try:
+            with _time_limit(timeout):
+                forecast_results.append(
+                    (name,) + _forecast_group(name, total, forecast_dates, seasonal_periods, total_hash, state))
+        except (SeriesTimeout, MemoryError) as e:
+            _logger.warning("Skipping data with id %s: %s", name, e)
+    return forecast_results, time.process_time() - start
 
-        # Append the current product's forecast dictionaries to the list
-        forecast_results.extend(forecast_dicts)
 
-    else:
-        print(f"Skipping data due to insufficient data points.")
+def _forecast_groups_batch(groups, forecast_dates, seasonal_periods=12):
+    """Forecast ``groups`` with the NumPy batch engine, see ``holt_winters``.
 
+    Groups of the same length are fitted together, the four value columns of
+    a group being four rows of the batch. Returns [(name, forecast dictionaries, model state)].
+    """
+    forecast_results = []
+    by_length = {}
+    for group in groups:
+        by_length.setdefault(len(group[1]), []).append(group)
+
+    for length, length_groups in by_length.items():
+        values = np.concatenate([total[VALUE_COLUMNS].to_numpy(dtype=float).T for _name, total, _hash, _state in length_groups])
+        start_params = np.array([
+            [params['smoothing_level'], params['smoothing_trend'], params['smoothing_seasonal'] or 0.0]
+            if params else [np.nan] * 3
+            for _name, _total, _hash, state in length_groups
+            for params in (state['params'] if state and state.get('model') == model_selection.HOLT_WINTERS
+                           else [None] * len(VALUE_COLUMNS))
+        ])
+        forecasts, params = holt_winters.fit_forecast(
+            values, len(forecast_dates), seasonal_periods, start_params=start_params)
+
+        for index, (name, _total, total_hash, _state) in enumerate(length_groups):
+            rows = slice(index * len(VALUE_COLUMNS), (index + 1) * len(VALUE_COLUMNS))
+            forecast_values = forecasts[rows].tolist()
+            state = {
+                'hash': total_hash,
+                'model': model_selection.HOLT_WINTERS,
+                'params': params[rows],
+                'forecasts': forecast_values,
+            }
+            forecast_results.append((name, _forecast_dicts(name, forecast_dates, forecast_values), state))
     return forecast_results
 
-def forecasting_prediction(sql_result):
 
+def forecasting_prediction(sql_result, workers=0, chunk_size=50, timeout=0, memory_limit=0,
+                           granularity='month', model_states=None, backend='statsmodels', cpu_budget=0,
+                           timings=None):
+    """Forecast the next 12 months of every ``responsible`` group of ``sql_result``.
+
+    The daily history is first resampled to months, or to weeks with ``granularity='week'``
+    (then the next 12 weeks are forecast with a yearly season of 52 weeks).
+    With ``workers`` > 1 the groups are fitted by a pool of processes, in chunks
+    of ``chunk_size`` groups. ``timeout`` (seconds) and ``memory_limit`` (MB per
+    worker) bound the fitting of a single group; groups over the limits are
+    skipped. Results keep the order of the groups whatever the number of workers.
+
+    ``model_states`` ({group id: state}) is updated in place with the fitted
+    parameters and forecasts of every group. Groups whose history did not change
+    since their state was saved are not fitted again, the others start the
+    optimizer from their previous parameters.
+
+    With ``backend='numpy'`` the groups are fitted in batches by the NumPy engine of
+    ``holt_winters`` in the current process, instead of one statsmodels model per series.
+
+    Only the groups with enough regular history are fitted with Holt-Winters, the
+    others are forecast with the cheaper methods of ``model_selection``; the method
+    is recorded in the model state of every group. Once the statsmodels fits used
+    ``cpu_budget`` CPU seconds (0: no limit), the remaining groups fall back to a
+    cheap method too.
+
+    ``timings``, when given, is a dict filled with the wall-clock seconds of the
+    ``resampling``, ``selection`` (cheap methods and reused forecasts included),
+    ``fitting`` and ``assembly`` stages.
+    """
+    timings = {} if timings is None else timings
+    start = time.perf_counter()
     data = pd.DataFrame(sql_result, columns=["month_date", "responsible", "sum", "qty_ordered", "qty_delivered", "qty_invoiced"])
+    model_states = {} if model_states is None else model_states
 
     # Forecasting for each product
-    forecast_periods = 12  # Forecasting for the next 12 months
     forecast_results = []
+    if data.empty:
+        return forecast_results
 
-    for name, total in data.groupby('responsible'):
+    data = resample_history(data, granularity, by='responsible')
+    seasonal_periods = GRANULARITIES[granularity][2]
+    forecast_dates = _forecast_dates(data, granularity)
+    timings['resampling'] = time.perf_counter() - start
+    start = time.perf_counter()
 
-        if len(total) >= 2:
-            try:
-                model_total = ExponentialSmoothing(
-                    total['sum'].astype(float), trend='add', seasonal='add', seasonal_periods=12)
-                model_fit_total = model_total.fit()
-
-                model_qty = ExponentialSmoothing(
-                    total['qty_ordered'].astype(float), trend='add', seasonal='add', seasonal_periods=12)
-                model_fit_qty_ordered = model_qty.fit()
-
-                model_qty_delivered = ExponentialSmoothing(
-                    total['qty_delivered'].astype(float), trend='add', seasonal='add', seasonal_periods=12)
-                model_fit_qty_delivered = model_qty_delivered.fit()
-
-                model_qty_invoiced = ExponentialSmoothing(
-                    total['qty_invoiced'].astype(float), trend='add', seasonal='add', seasonal_periods=12)
-                model_fit_qty_invoiced = model_qty_invoiced.fit()
-
-            except Exception as e:
-                warnings.warn(f"Error for product {name} when adding seasonality: {str(e)}")
-
-                model_total = ExponentialSmoothing(
-                    total['sum'].astype(float), trend='add', seasonal_periods=12)
-                model_fit_total = model_total.fit()
-
-                model_qty = ExponentialSmoothing(
-                    total['qty_ordered'].astype(float), trend='add', seasonal_periods=12)
-                model_fit_qty_ordered = model_qty.fit()
-
-                model_qty_delivered = ExponentialSmoothing(
-                    total['qty_delivered'].astype(float), trend='add', seasonal_periods=12)
-                model_fit_qty_delivered = model_qty_delivered.fit()
-
-                model_qty_invoiced = ExponentialSmoothing(
-                    total['qty_invoiced'].astype(float), trend='add', seasonal_periods=12)
-                model_fit_qty_invoiced = model_qty_invoiced.fit()
-
-            # Forecast the next 12 months
-            forecast_values_total = model_fit_total.forecast(steps=forecast_periods).tolist()
-            forecast_values_qty_ordered = model_fit_qty_ordered.forecast(steps=forecast_periods).tolist()
-            forecast_values_qty_delivered = model_fit_qty_delivered.forecast(steps=forecast_periods).tolist()
-            forecast_values_qty_invoiced = model_fit_qty_invoiced.forecast(steps=forecast_periods).tolist()
-
-            # Generate the date range for the forecast (next 12 months)
-            last_date = data['month_date'].max()
-            forecast_dates = pd.date_range(
-                start=last_date, periods=forecast_periods, freq='MS')
-
-            # Create a list of dictionaries to store the forecast results for the current product
-            forecast_dicts = []
-            for i in range(forecast_periods):
-                forecast_dict = {
-                    'Month': forecast_dates[i],
-                    'Responsible': name,
-                    'Total': forecast_values_total[i],
-                    'Forecast_Qty_Ordered': forecast_values_qty_ordered[i],
-                    'Forecast_Qty_Delivered': forecast_values_qty_delivered[i],
-                    'Forecast_Qty_Invoiced': forecast_values_qty_invoiced[i],
-                }
-                forecast_dicts.append(forecast_dict)
-
-            # Append the current product's forecast dictionaries to the list
-            forecast_results.extend(forecast_dicts)
-        
-        else:
+    names = []
+    groups = []
+    group_forecasts = {}
+
+    def _collect(chunk_results):
+        for name, forecast_dicts, state in chunk_results:
+            group_forecasts[name] = forecast_dicts
+            model_states[name] = state
+
+    for name, total in data.groupby('responsible'):
+        if len(total) < 2:
             print(f"Skipping data with id {name} due to insufficient data points.")
+            continue
+        names.append(name)
+        total_hash = history_hash(total, granularity)
+        state = model_states.get(name)
+        if _is_reusable(state, total_hash, forecast_dates):
+            # Unchanged history: reuse the stored forecasts without sending the group to a worker
+            group_forecasts[name] = _forecast_dicts(name, forecast_dates, state['forecasts'])
+            continue
+        model = model_selection.select_model(total['sum'].to_numpy(dtype=float), seasonal_periods)
+        if model == model_selection.HOLT_WINTERS:
+            groups.append((name, total, total_hash, state))
+        else:
+            _collect([_forecast_simple(name, total, forecast_dates, seasonal_periods, total_hash, model)])
+    timings['selection'] = time.perf_counter() - start
+    start = time.perf_counter()
+
+    chunk_size = max(1, chunk_size or 1)
+    chunks = [groups[i:i + chunk_size] for i in range(0, len(groups), chunk_size)]
+
+    spent = 0.0
+    fallback_chunks = []
+    if backend == 'numpy':
+        _collect(_forecast_groups_batch(groups, forecast_dates, seasonal_periods))
+    elif workers and workers > 1 and len(chunks) > 1 and _can_fork_workers():
+        # Workers are forked: they inherit the loaded modules and never touch the database
+        with ProcessPoolExecutor(max_workers=workers,
+                                 mp_context=multiprocessing.get_context('fork'),
+                                 initializer=_init_worker,
+                                 initargs=(memory_limit,)) as executor:
+            futures = [executor.submit(_fit_chunk, chunk, forecast_dates, timeout, seasonal_periods)
+                       for chunk in chunks]
+            for future, chunk in zip(futures, chunks):
+                # Chunks already running when the budget is spent are still used
+                if cpu_budget and spent >= cpu_budget and future.cancel():
+                    fallback_chunks.append(chunk)
+                    continue
+                chunk_results, chunk_spent = future.result()
+                spent += chunk_spent
+                _collect(chunk_results)
+    else:
+        for chunk in chunks:
+            if cpu_budget and spent >= cpu_budget:
+                fallback_chunks.append(chunk)
+                continue
+            chunk_results, chunk_spent = _fit_chunk(chunk, forecast_dates, timeout, seasonal_periods)
+            spent += chunk_spent
+            _collect(chunk_results)
+    if fallback_chunks:
+        _logger.warning("Forecasting CPU budget of %s seconds spent, %s series use cheap methods",
+                        cpu_budget, sum(len(chunk) for chunk in fallback_chunks))
+        for chunk in fallback_chunks:
+            _collect(_forecast_fallback(chunk, forecast_dates, seasonal_periods))
+    timings['fitting'] = time.perf_counter() - start
+    start = time.perf_counter()
+
+    # Groups which no longer have enough history
+    for name in set(model_states) - set(names):
+        del model_states[name]
+
+    for name in names:
+        forecast_results.extend(group_forecasts.get(name, []))
+    timings['assembly'] = time.perf_counter() - start
     return forecast_results
-
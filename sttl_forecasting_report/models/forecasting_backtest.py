@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+from odoo import fields, models
+
+from .model_selection import MODEL_TYPES
+
+
+class ForecastingBacktest(models.Model):
+    _name = "forecasting.backtest"
+    _description = "Forecasting Backtest"
+    _order = "run_date desc, report_model, model_type"
+
+    run_date = fields.Datetime("Run Date", readonly=True, default=fields.Datetime.now)
+    source = fields.Selection([('sale', 'Sale'), ('purchase', 'Purchase')], readonly=True)
+    report_model = fields.Char("Series Family", readonly=True)
+    model_type = fields.Selection(MODEL_TYPES, readonly=True)
+    granularity = fields.Char(readonly=True)
+    horizon = fields.Integer(readonly=True)
+    series_count = fields.Integer("Series", readonly=True)
+    origin_count = fields.Integer("Evaluations", readonly=True)
+    mape = fields.Float("MAPE (%)", readonly=True, group_operator='avg',
+                        help="Empty when every actual value of the evaluations is zero")
+    smape = fields.Float("sMAPE (%)", readonly=True, group_operator='avg')
+    mase = fields.Float("MASE", readonly=True, group_operator='avg',
+                        help="Empty when the training histories are constant")
+    fit_time = fields.Float("Fit Time (s)", digits=(16, 6), readonly=True, group_operator='avg',
+                            help="Average CPU time of one fit and forecast")
+    total_fit_time = fields.Float("Total Fit Time (s)", readonly=True)
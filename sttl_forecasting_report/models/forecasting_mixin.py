@@ -0,0 +1,400 @@
+# -*- coding: utf-8 -*-
+import logging
+import threading
+from contextlib import contextmanager
+
+import pandas as pd
+import psycopg2
+from psycopg2.extensions import parse_dsn
+
+from odoo import api, fields, models
+from odoo.sql_db import ConnectionPool, Connection
+from odoo.osv import expression
+from odoo.tools import split_every
+
+from .backtesting import backtest
+from .forecasting import FORECAST_KEYS, GRANULARITIES, forecasting_details, forecasting_prediction
+
+_logger = logging.getLogger(__name__)
+
+# Separate pool for the secondary server, so forecasting extraction does not
+# consume the connections of the primary pool.
+_secondary_pool = None
+_secondary_pool_lock = threading.Lock()
+
+
+def _get_secondary_pool(maxconn):
+    global _secondary_pool
+    with _secondary_pool_lock:
+        if _secondary_pool is None:
+            _secondary_pool = ConnectionPool(maxconn)
+        return _secondary_pool
+
+
+def _metric(value):
+    """Return the error metric ``value`` as a float, or False (empty) when undefined (NaN)"""
+    return False if pd.isna(value) else float(value)
+
+
+# Series families of the documents: (grouping column or None for the whole history,
+# amount, quantities) where the amount and quantities are sums of the extraction
+FORECASTING_SOURCES = {
+    'sale': {
+        'order_table': 'sale_order',
+        'line_table': 'sale_order_line',
+        'quantities': ['product_uom_qty', 'qty_delivered', 'qty_invoiced'],
+        'families': {
+            'total': (None, 'order_total', ['product_uom_qty', 'qty_delivered', 'qty_invoiced']),
+            'user': ('user_id', 'order_total', ['product_uom_qty', 'qty_delivered', 'qty_invoiced']),
+            'partner': ('partner_id', 'order_total', ['product_uom_qty', 'qty_delivered', 'qty_invoiced']),
+            'product': ('product_id', 'price_subtotal', ['product_uom_qty', 'qty_delivered', 'qty_invoiced']),
+        },
+    },
+    'purchase': {
+        'order_table': 'purchase_order',
+        'line_table': 'purchase_order_line',
+        'quantities': ['product_qty', 'product_uom_qty', 'qty_received', 'qty_invoiced', 'qty_to_invoice'],
+        'families': {
+            'total': (None, 'order_total', ['product_qty', 'qty_received', 'qty_invoiced']),
+            'user': ('user_id', 'order_total', ['product_uom_qty', 'qty_received', 'qty_to_invoice']),
+            'partner': ('partner_id', 'order_total', ['product_uom_qty', 'qty_received', 'qty_to_invoice']),
+            'product': ('product_id', 'price_subtotal', ['product_uom_qty', 'qty_received', 'qty_invoiced']),
+        },
+    },
+}
+
+
+class ForecastingReportMixin(models.AbstractModel):
+    _name = "forecasting.report.mixin"
+    _description = "Forecasting Report Mixin"
+
+    # Document type and series family forecast by the report, see FORECASTING_SOURCES
+    _forecasting_source = None
+    _forecasting_family = None
+    # (date field, value fields in FORECAST_KEYS order, group field or None)
+    _forecasting_fields = None
+
+    # Refresh run which wrote the record; only the published generation is visible
+    generation = fields.Integer(readonly=True, index=True, copy=False, default=0)
+
+    def init(self):
+        super().init()
+        # Generation numbers of all the reports, see _new_generation
+        self.env.cr.execute("CREATE SEQUENCE IF NOT EXISTS forecasting_report_generation_seq")
+        if not self._abstract:
+            # Never hand out a generation already used by the rows of the report
+            self.env.cr.execute('SELECT MAX(generation) FROM "%s"' % self._table)
+            used = max(self.env.cr.fetchone()[0] or 0, self._get_current_generation())
+            self.env.cr.execute("""
+                SELECT setval('forecasting_report_generation_seq', GREATEST(last_value, %s))
+                FROM forecasting_report_generation_seq
+            """, (used,))
+
+    @api.model
+    def _search(self, domain, offset=0, limit=None, order=None):
+        if not self._abstract and not self.env.context.get('forecasting_all_generations'):
+            domain = expression.AND([domain, [('generation', '=', self._get_current_generation())]])
+        return super()._search(domain, offset=offset, limit=limit, order=order)
+
+    def _get_generation_param(self):
+        return 'sttl_forecasting_report.generation.%s' % self._table
+
+    def _get_current_generation(self):
+        """Return the published generation of the report"""
+        return int(self.env['ir.config_parameter'].sudo().get_param(self._get_generation_param(), 0))
+
+    def _new_generation(self):
+        """Return the generation the rows of a refresh of the report are written with.
+
+        Numbers come from a sequence, so concurrent refreshes never share a generation
+        and nothing is locked while they fit and insert their forecasts.
+        """
+        self.env.cr.execute("SELECT nextval('forecasting_report_generation_seq')")
+        return self.env.cr.fetchone()[0]
+
+    def _publish_generation(self, generation):
+        """Make ``generation`` the visible content of the report and delete the older ones.
+
+        Only this switch runs under the table lock, which conflicts with itself and with
+        writes but not with reads: refreshes finishing together publish one after the
+        other, the newest generation winning, while readers keep seeing a complete one.
+        Rows of interrupted refreshes are left to ``_gc_forecast_generations``.
+        """
+        self.env.cr.execute('LOCK TABLE "%s" IN SHARE ROW EXCLUSIVE MODE' % self._table)
+        if generation > self._get_current_generation():
+            self.env['ir.config_parameter'].sudo().set_param(self._get_generation_param(), generation)
+            self.env.cr.execute('DELETE FROM "%s" WHERE generation < %%s OR generation IS NULL' % self._table,
+                                (generation,))
+        else:
+            # A newer refresh was published meanwhile
+            self.env.cr.execute('DELETE FROM "%s" WHERE generation = %%s' % self._table, (generation,))
+        self.invalidate_model()
+
+    @api.autovacuum
+    def _gc_forecast_generations(self):
+        """Delete the rows of the generations which are no longer published"""
+        if self._abstract:
+            return
+        self.env.cr.execute('DELETE FROM "%s" WHERE generation IS DISTINCT FROM %%s' % self._table,
+                            (self._get_current_generation(),))
+        self.invalidate_model()
+
+    @api.model
+    def _extract_forecasting_history(self, families=None):
+        """Return {family: daily history rows} of the document type of the report.
+
+        All the ``families`` (by default every family of the document type) are read
+        with a single scan of the orders and their lines grouped by GROUPING SETS.
+        Rows are (date, amount, quantities...) for the whole history and
+        (date, group id, amount, quantities...) for the other families.
+        """
+        source = FORECASTING_SOURCES[self._forecasting_source]
+        families = families or list(source['families'])
+        # Only the grouping columns of the requested families may be selected
+        group_columns = {source['families'][family][0]: family for family in families if source['families'][family][0]}
+        quantities = source['quantities']
+        query = """
+            WITH lines AS (
+                SELECT
+                    DATE(o.date_order) AS day,
+                    o.user_id,
+                    o.partner_id,
+                    l.product_id,
+                    -- The order amount is counted once, on the first line of the order
+                    CASE WHEN ROW_NUMBER() OVER (PARTITION BY o.id ORDER BY l.id) = 1
+                         THEN o.amount_total ELSE 0 END AS order_total,
+                    l.price_subtotal,
+                    {line_quantities},
+                    -- Only the totals leave out the orders dated after tomorrow
+                    CASE WHEN o.date_order <= CURRENT_DATE + INTERVAL '1 DAY'
+                         THEN DATE(o.date_order) END AS total_day
+                FROM {order_table} o
+                LEFT JOIN {line_table} l ON l.order_id = o.id
+            )
+            SELECT
+                CASE {family_cases}WHEN TRUE THEN 'total' END AS family,
+                {day_column} AS day,
+                COALESCE({group_columns}) AS responsible,
+                SUM(order_total),
+                COALESCE(SUM(price_subtotal), 0),
+                {sums}
+            FROM lines
+            GROUP BY GROUPING SETS ({grouping_sets})
+            {having}
+            ORDER BY family, responsible, day
+        """.format(
+            line_quantities=', '.join('l.%s' % quantity for quantity in quantities),
+            order_table=source['order_table'],
+            line_table=source['line_table'],
+            family_cases=''.join("WHEN GROUPING(%s) = 0 THEN '%s' " % (column, family)
+                                 for column, family in group_columns.items()),
+            group_columns=', '.join(list(group_columns) + ['NULL::integer']),
+            sums=', '.join('COALESCE(SUM(%s), 0)' % quantity for quantity in quantities),
+            day_column='COALESCE(day, total_day)' if 'total' in families else 'day',
+            grouping_sets=', '.join('(day, %s)' % source['families'][family][0]
+                                    if source['families'][family][0] else '(total_day)' for family in families),
+            having='HAVING GROUPING(total_day) = 1 OR total_day IS NOT NULL' if 'total' in families else '',
+        )
+        with self._forecasting_cursor() as read_cr:
+            read_cr.execute(query)
+            rows = read_cr.fetchall()
+
+        # Positions of the sums in the rows
+        positions = {'order_total': 3, 'price_subtotal': 4}
+        positions.update({quantity: 5 + index for index, quantity in enumerate(quantities)})
+        history = {family: [] for family in families}
+        for row in rows:
+            family = row[0]
+            _column, amount, family_quantities = source['families'][family]
+            values = [row[positions[amount]]] + [row[positions[quantity]] for quantity in family_quantities]
+            if family == 'total':
+                history[family].append([row[1]] + values)
+            elif row[2] is not None:
+                history[family].append([row[1], row[2]] + values)
+        return history
+
+    def _refresh_forecasts(self, history=None):
+        """Forecast the series family of the report and publish the new forecasts.
+
+        ``history`` is the daily history of the family, extracted when not given.
+        """
+        if history is None:
+            history = self._extract_forecasting_history([self._forecasting_family])[self._forecasting_family]
+
+        # Fitted models of the previous refresh, see forecasting.model.state
+        ModelState = self.env['forecasting.model.state']
+        model_states = ModelState._load_states(self._name)
+        if self._forecasting_family == 'total':
+            forecasts = forecasting_details(
+                history, granularity=self._get_forecasting_granularity(), model_states=model_states)
+        else:
+            forecasts = forecasting_prediction(history, model_states=model_states, **self._get_forecasting_options())
+        ModelState._save_states(self._name, model_states)
+
+        # The new forecasts replace the published ones at once, see _publish_generation
+        generation = self._new_generation()
+        date_field, value_fields, group_field = self._forecasting_fields
+        self._write_forecasts(forecasts, date_field, value_fields, group_field=group_field, generation=generation)
+        self._publish_generation(generation)
+
+    @api.model
+    def _get_source_reports(self):
+        """Return the report models of the document type of this model"""
+        return [
+            self.env[name] for name in sorted(self.env.registry.models)
+            if not self.env[name]._abstract
+            and getattr(self.env[name], '_forecasting_source', None) == self._forecasting_source
+        ]
+
+    @api.model
+    def forecasting_run_all(self):
+        """Refresh every report of the document type of this model from a single extraction"""
+        reports = self._get_source_reports()
+        history = self._extract_forecasting_history([report._forecasting_family for report in reports])
+        for report in reports:
+            report._refresh_forecasts(history[report._forecasting_family])
+
+    def _run_backtest(self, history=None):
+        """Backtest the forecasting of the series family of the report at rolling origins.
+
+        Stores one ``forecasting.backtest`` record per forecasting method. Configured with
+        system parameters:
+            * sttl_forecasting_report.backtest_horizon: periods forecast from every origin (3)
+            * sttl_forecasting_report.backtest_folds: origins per series (3)
+            * sttl_forecasting_report.backtest_models: comma separated methods evaluated on
+              every series; by default the method the selector picks for each origin
+        and the execution options of ``_get_forecasting_options``.
+        """
+        if history is None:
+            history = self._extract_forecasting_history([self._forecasting_family])[self._forecasting_family]
+        get_param = self.env['ir.config_parameter'].sudo().get_param
+        options = self._get_forecasting_options()
+        horizon = int(get_param('sttl_forecasting_report.backtest_horizon', 3))
+        models = [model.strip() for model in (get_param('sttl_forecasting_report.backtest_models') or '').split(',')
+                  if model.strip()]
+
+        results = backtest(
+            history, grouped=self._forecasting_family != 'total', granularity=options['granularity'],
+            horizon=horizon, folds=int(get_param('sttl_forecasting_report.backtest_folds', 3)),
+            models=models or None, workers=options['workers'], chunk_size=options['chunk_size'],
+            memory_limit=options['memory_limit'], backend=options['backend'])
+
+        run_date = fields.Datetime.now()
+        return self.env['forecasting.backtest'].sudo().create([{
+            'run_date': run_date,
+            'source': self._forecasting_source,
+            'report_model': self._name,
+            'model_type': model,
+            'granularity': options['granularity'],
+            'horizon': horizon,
+            'series_count': int(result['series']),
+            'origin_count': int(result['origins']),
+            'mape': _metric(result['mape']),
+            'smape': _metric(result['smape']),
+            'mase': _metric(result['mase']),
+            'fit_time': float(result['fit_time']),
+            'total_fit_time': float(result['total_fit_time']),
+        } for model, result in results.items()])
+
+    @api.model
+    def forecasting_backtest_all(self):
+        """Backtest every report of the document type of this model from a single extraction"""
+        reports = self._get_source_reports()
+        history = self._extract_forecasting_history([report._forecasting_family for report in reports])
+        for report in reports:
+            report._run_backtest(history[report._forecasting_family])
+
+    @contextmanager
+    def _forecasting_cursor(self):
+        """Yield the cursor used to read the forecasting history.
+
+        Reads go to the server configured in the ``sttl_forecasting_report.secondary_dsn``
+        system parameter (e.g. a streaming replica), in a read-only transaction limited by
+        ``sttl_forecasting_report.secondary_statement_timeout`` (ms). Falls back to the
+        current cursor when no secondary server is configured or reachable.
+        """
+        get_param = self.env['ir.config_parameter'].sudo().get_param
+        dsn = get_param('sttl_forecasting_report.secondary_dsn')
+        if not dsn:
+            yield self.env.cr
+            return
+
+        try:
+            connection_info = parse_dsn(dsn)
+            connection_info.setdefault('dbname', self.env.cr.dbname)
+            pool = _get_secondary_pool(int(get_param('sttl_forecasting_report.secondary_maxconn', 4)))
+            cr = Connection(pool, connection_info['dbname'], connection_info).cursor()
+        except psycopg2.Error as e:
+            _logger.warning("Secondary forecasting database unavailable, using the primary: %s", e)
+            yield self.env.cr
+            return
+
+        try:
+            cr.execute("SET TRANSACTION READ ONLY")
+            cr.execute("SET LOCAL statement_timeout = %s",
+                       (int(get_param('sttl_forecasting_report.secondary_statement_timeout', 0)),))
+            yield cr
+        finally:
+            cr.close()
+
+    def _get_forecasting_granularity(self):
+        """Return the period the history is resampled to before fitting: ``month`` or ``week``.
+
+        Configured with the ``sttl_forecasting_report.granularity`` system parameter.
+        """
+        granularity = self.env['ir.config_parameter'].sudo().get_param('sttl_forecasting_report.granularity', 'month')
+        return granularity if granularity in GRANULARITIES else 'month'
+
+    def _get_forecasting_options(self):
+        """Return the execution options of ``forecasting_prediction``.
+
+        Configured with system parameters:
+            * sttl_forecasting_report.workers: number of fitting processes (0: in the cron process)
+            * sttl_forecasting_report.chunk_size: series sent to a worker at once (50)
+            * sttl_forecasting_report.series_timeout: seconds allowed to fit one series (0: no limit)
+            * sttl_forecasting_report.worker_memory_limit: memory cap of a worker in MB (0: no limit)
+            * sttl_forecasting_report.backend: statsmodels (default) or numpy, the batch
+              engine of ``holt_winters`` which fits in the cron process
+            * sttl_forecasting_report.cpu_budget: CPU seconds of statsmodels fits per report
+              refresh, beyond which series get cheap methods (0: no limit)
+        and the resampling granularity, see ``_get_forecasting_granularity``.
+        """
+        get_param = self.env['ir.config_parameter'].sudo().get_param
+        return {
+            'workers': int(get_param('sttl_forecasting_report.workers', 0)),
+            'chunk_size': int(get_param('sttl_forecasting_report.chunk_size', 50)),
+            'timeout': float(get_param('sttl_forecasting_report.series_timeout', 0)),
+            'memory_limit': int(get_param('sttl_forecasting_report.worker_memory_limit', 0)),
+            'granularity': self._get_forecasting_granularity(),
+            'backend': 'numpy' if get_param('sttl_forecasting_report.backend') == 'numpy' else 'statsmodels',
+            'cpu_budget': float(get_param('sttl_forecasting_report.cpu_budget', 0)),
+        }
+
+    def _write_forecasts(self, forecasts, date_field, value_fields, group_field=None, generation=0):
+        """Insert the report rows of ``forecasts`` with multi-row INSERT statements.
+
+        ``value_fields`` receive the forecast values (in ``FORECAST_KEYS`` order) clamped
+        to zero, ``date_field`` the start of the period and ``group_field`` the
+        ``Responsible`` id; rows belong to ``generation``. The report models are plain data sinks without computed
+        fields, so the per-record work of the ORM create is skipped.
+        """
+        if not forecasts:
+            return
+        frame = pd.DataFrame(forecasts)
+        values = frame[FORECAST_KEYS].astype(float).clip(lower=0.0).to_numpy().tolist()
+        dates = pd.to_datetime(frame['Month']).dt.date.tolist()
+        columns = [date_field] + list(value_fields)
+        rows = [[date] + row for date, row in zip(dates, values)]
+        if group_field:
+            columns.append(group_field)
+            for row, group_id in zip(rows, frame['Responsible'].astype(int).tolist()):
+                row.append(group_id)
+
+        now = fields.Datetime.now()
+        log_values = [generation, self.env.uid, now, self.env.uid, now]
+        columns += ['generation', 'create_uid', 'create_date', 'write_uid', 'write_date']
+        query = 'INSERT INTO "%s" (%s) VALUES ' % (self._table, ', '.join('"%s"' % column for column in columns))
+        for batch in split_every(10000, rows):
+            self.env.cr.execute(query + ', '.join(['%s'] * len(batch)),
+                                [tuple(row + log_values) for row in batch])
+        self.invalidate_model()
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+import json
+
+from odoo import api, fields, models
+from odoo.tools import split_every
+
+from .model_selection import MODEL_TYPES
+
+
+class ForecastingModelState(models.Model):
+    _name = "forecasting.model.state"
+    _description = "Forecasting Model State"
+
+    family = fields.Char("Series Family", required=True, readonly=True, index=True)
+    group_id = fields.Integer("Group", readonly=True)
+    history_hash = fields.Char(readonly=True)
+    model_type = fields.Selection(MODEL_TYPES, readonly=True)
+    budget_fallback = fields.Boolean(readonly=True, help="Holt-Winters was replaced because the CPU budget was spent")
+    params = fields.Text("Fitted Parameters", readonly=True)
+    forecasts = fields.Text(readonly=True)
+
+    _sql_constraints = [
+        ('family_group_uniq', 'unique(family, group_id)', 'A series can only have one model state.'),
+    ]
+
+    @api.model
+    def _load_states(self, family):
+        """Return {group id: state} of the series of ``family`` (a report model name)"""
+        self.env.cr.execute("""
+            SELECT group_id, history_hash, model_type, budget_fallback, params, forecasts
+            FROM forecasting_model_state
+            WHERE family = %s
+        """, (family,))
+        return {
+            group_id: {
+                'hash': history_hash,
+                'model': model_type,
+                'budget_fallback': budget_fallback,
+                'params': json.loads(params or '[]'),
+                'forecasts': json.loads(forecasts or '[]'),
+            }
+            for group_id, history_hash, model_type, budget_fallback, params, forecasts in self.env.cr.fetchall()
+        }
+
+    @api.model
+    def _save_states(self, family, states):
+        """Replace the stored states of ``family`` with ``states`` ({group id: state})"""
+        now = fields.Datetime.now()
+        rows = [
+            (family, int(group_id), state['hash'], state.get('model'), bool(state.get('budget_fallback')),
+             json.dumps(state['params']), json.dumps(state['forecasts']), self.env.uid, now, self.env.uid, now)
+            for group_id, state in states.items()
+        ]
+        for batch in split_every(10000, rows):
+            self.env.cr.execute("""
+                INSERT INTO forecasting_model_state
+                    (family, group_id, history_hash, model_type, budget_fallback, params, forecasts,
+                     create_uid, create_date, write_uid, write_date)
+                VALUES %s
+                ON CONFLICT (family, group_id) DO UPDATE SET
+                    history_hash = EXCLUDED.history_hash,
+                    model_type = EXCLUDED.model_type,
+                    budget_fallback = EXCLUDED.budget_fallback,
+                    params = EXCLUDED.params,
+                    forecasts = EXCLUDED.forecasts,
+                    write_uid = EXCLUDED.write_uid,
+                    write_date = EXCLUDED.write_date
+                WHERE forecasting_model_state.history_hash IS DISTINCT FROM EXCLUDED.history_hash
+                   OR forecasting_model_state.budget_fallback
+            """ % ', '.join(['%s'] * len(batch)), batch)
+
+        # Groups which no longer have a history
+        self.env.cr.execute("""
+            DELETE FROM forecasting_model_state
+            WHERE family = %s AND NOT group_id = ANY(%s)
+        """, (family, [int(group_id) for group_id in states]))
+        self.invalidate_model()
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""Batch additive Holt-Winters written with NumPy.
+
+Fits many series of the same length at once: the smoothing recursions run over
+2-D arrays (series x candidate parameters) and the smoothing parameters of every
+series are chosen by a coarse grid search refined around its best candidate.
+"""
+import itertools
+
+import numpy as np
+
+# Candidate values of the coarse grid search
+GRID = [0.05, 0.2, 0.4, 0.6, 0.8, 0.95]
+# Step of the refinement around the best candidate of the grid
+REFINE_STEP = 0.075
+# Maximum number of cells of the seasonal states held in memory at once
+MAX_CELLS = 2 ** 22
+# First periods of a series without season whose regression line gives its initial level and trend
+INITIAL_TREND_PERIODS = 10
+
+
+def _grid(seasonal):
+    """Return the (alpha, beta, gamma) candidates of the coarse search"""
+    if not seasonal:
+        return np.array([(alpha, beta, 0.0) for alpha, beta in itertools.product(GRID, GRID)])
+    return np.array([
+        (alpha, beta, gamma) for alpha, beta, gamma in itertools.product(GRID, GRID, GRID)
+        if gamma <= 1 - alpha
+    ])
+
+
+def _initial_states(values, seasonal_periods, seasonal):
+    """Return the heuristic initial level, trend and seasons of every series"""
+    if not seasonal:
+        # Least squares line over the first periods, less noisy than the first difference
+        head = values[:, :INITIAL_TREND_PERIODS]
+        t = np.arange(head.shape[1]) - (head.shape[1] - 1) / 2
+        trend = (head * t).sum(axis=1) / (t * t).sum()
+        return head.mean(axis=1) - trend * (head.shape[1] - 1) / 2, trend, np.zeros((len(values), 1))
+    m = seasonal_periods
+    first = values[:, :m].mean(axis=1)
+    second = values[:, m:2 * m].mean(axis=1)
+    return first, (second - first) / m, values[:, :m] - first[:, None]
+
+
+def _smooth(values, alpha, beta, gamma, level, trend, seasons):
+    """Run the additive recursions of every series for every candidate.
+
+    ``alpha``, ``beta`` and ``gamma`` are (series, candidates) arrays. Returns the
+    sum of squared one-step errors and the final level, trend and seasons.
+    """
+    shape = alpha.shape
+    m = seasons.shape[1]
+    level = np.repeat(level[:, None], shape[1], axis=1)
+    trend = np.repeat(trend[:, None], shape[1], axis=1)
+    seasons = np.repeat(seasons[:, None, :], shape[1], axis=1)
+    sse = np.zeros(shape)
+    for t in range(values.shape[1]):
+        x = values[:, t, None]
+        season = seasons[:, :, t % m]
+        error = x - (level + trend + season)
+        sse += error * error
+        seasons[:, :, t % m] = gamma * (x - level - trend) + (1 - gamma) * season
+        new_level = alpha * (x - season) + (1 - alpha) * (level + trend)
+        trend = beta * (new_level - level) + (1 - beta) * trend
+        level = new_level
+    return sse, level, trend, seasons
+
+
+def _best_candidates(values, candidates, level, trend, seasons):
+    """Return the (series, 3) parameters of the lowest error among ``candidates``.
+
+    ``candidates`` is a (series, candidates, 3) array. Series are processed in
+    slices so the seasonal states stay within ``MAX_CELLS``.
+    """
+    n, count, _dims = candidates.shape
+    rows = max(1, MAX_CELLS // (count * seasons.shape[1]))
+    best = np.empty((n, 3))
+    for start in range(0, n, rows):
+        part = slice(start, start + rows)
+        sse, *_states = _smooth(
+            values[part], candidates[part, :, 0], candidates[part, :, 1], candidates[part, :, 2],
+            level[part], trend[part], seasons[part])
+        sse = np.where(np.isfinite(sse), sse, np.inf)
+        best[part] = candidates[part][np.arange(len(sse)), sse.argmin(axis=1)]
+    return best
+
+
+def _refine(best, seasonal):
+    """Return the candidates around the ``best`` parameters of every series"""
+    offsets = np.array(list(itertools.product(
+        (-REFINE_STEP, 0.0, REFINE_STEP), (-REFINE_STEP, 0.0, REFINE_STEP),
+        (-REFINE_STEP, 0.0, REFINE_STEP) if seasonal else (0.0,))))
+    candidates = np.clip(best[:, None, :] + offsets[None, :, :], 0.001, 0.999)
+    if seasonal:
+        candidates[:, :, 2] = np.minimum(candidates[:, :, 2], 1 - candidates[:, :, 0])
+    else:
+        candidates[:, :, 2] = 0.0
+    return candidates
+
+
+def fit_forecast(values, steps, seasonal_periods=12, seasonal=True, start_params=None):
+    """Fit additive trend (and season) Holt-Winters models to every row of ``values``.
+
+    ``values`` is a (series, length) array of equal-length series; the season needs
+    two full cycles. ``start_params`` is an optional (series, 3) array of
+    (alpha, beta, gamma) of previous fits, tried alongside the grid (NaN rows are ignored).
+    Returns the (series, steps) forecasts and the fitted parameters of every series,
+    in the format of ``forecasting._model_params``.
+    """
+    values = np.asarray(values, dtype=float)
+    n, length = values.shape
+    seasonal = seasonal and length >= 2 * seasonal_periods
+    level, trend, seasons = _initial_states(values, seasonal_periods, seasonal)
+
+    grid = _grid(seasonal)
+    candidates = np.repeat(grid[None, :, :], n, axis=0)
+    if start_params is not None:
+        start_params = np.asarray(start_params, dtype=float).copy()
+        if not seasonal:
+            start_params[:, 2] = 0.0
+        # Series without previous parameters repeat the first grid candidate instead
+        start_params = np.where(np.isnan(start_params), grid[0], start_params)
+        candidates = np.concatenate([candidates, start_params[:, None, :]], axis=1)
+
+    best = _best_candidates(values, candidates, level, trend, seasons)
+    best = _best_candidates(values, _refine(best, seasonal), level, trend, seasons)
+
+    _sse, final_level, final_trend, final_seasons = _smooth(
+        values, best[:, :1], best[:, 1:2], best[:, 2:], level, trend, seasons)
+    horizon = np.arange(1, steps + 1)
+    season_index = (length + horizon - 1) % seasons.shape[1]
+    forecasts = final_level + horizon * final_trend + final_seasons[:, 0, season_index]
+
+    params = [{
+        'seasonal': seasonal,
+        'smoothing_level': float(alpha),
+        'smoothing_trend': float(beta),
+        'smoothing_seasonal': float(gamma) if seasonal else None,
+        'initial_level': float(initial_level),
+        'initial_trend': float(initial_trend),
+        'initial_seasons': initial_seasons.tolist() if seasonal else [],
+    } for (alpha, beta, gamma), initial_level, initial_trend, initial_seasons in zip(best, level, trend, seasons)]
+    return forecasts, params
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""Choice of the forecasting method of a series and the methods cheaper than Holt-Winters.
+
+Every forecaster takes a (columns, length) array of the resampled history and
+returns the (columns, steps) forecasts.
+"""
+import numpy as np
+
+HOLT_WINTERS = 'holt_winters'
+SEASONAL_NAIVE = 'seasonal_naive'
+MOVING_AVERAGE = 'moving_average'
+CROSTON = 'croston'
+
+MODEL_TYPES = [
+    (HOLT_WINTERS, 'Holt-Winters'),
+    (SEASONAL_NAIVE, 'Seasonal Naive'),
+    (MOVING_AVERAGE, 'Moving Average'),
+    (CROSTON, 'Croston'),
+]
+
+# Average interval between demands above which a series is intermittent (Syntetos-Boylan)
+INTERMITTENT_INTERVAL = 1.32
+# Periods of history below which a series is too short for Holt's trend model
+MIN_HOLT_PERIODS = 6
+MOVING_AVERAGE_WINDOW = 3
+CROSTON_ALPHA = 0.1
+
+
+def select_model(values, seasonal_periods=12):
+    """Return the method forecasting the ``values`` series (1-D, resampled history).
+
+    Very short series average their last periods and series with few demands are
+    intermittent. The others get Holt-Winters, which drops the season (additive
+    trend only) when the history has less than two full seasons.
+    """
+    length = len(values)
+    if length < MIN_HOLT_PERIODS:
+        return MOVING_AVERAGE
+    demands = np.count_nonzero(values)
+    if demands < 2:
+        return MOVING_AVERAGE
+    if length / demands >= INTERMITTENT_INTERVAL:
+        return CROSTON
+    return HOLT_WINTERS
+
+
+def fallback_model(length, seasonal_periods=12):
+    """Return the cheap method replacing Holt-Winters when the CPU budget is spent"""
+    return SEASONAL_NAIVE if length >= seasonal_periods else MOVING_AVERAGE
+
+
+def moving_average(values, steps, window=MOVING_AVERAGE_WINDOW):
+    """Repeat the mean of the last ``window`` periods"""
+    return np.repeat(values[:, -window:].mean(axis=1, keepdims=True), steps, axis=1)
+
+
+def seasonal_naive(values, steps, seasonal_periods=12):
+    """Repeat the last season"""
+    return values[:, -seasonal_periods:][:, np.arange(steps) % seasonal_periods]
+
+
+def croston(values, steps, alpha=CROSTON_ALPHA):
+    """Forecast the demand rate of intermittent series: smoothed demand size over smoothed interval"""
+    forecasts = np.zeros((len(values), steps))
+    for row, series in enumerate(values):
+        demand_indexes = np.flatnonzero(series)
+        if not len(demand_indexes):
+            continue
+        size = series[demand_indexes[0]]
+        interval = demand_indexes[0] + 1.0
+        for previous, index in zip(demand_indexes, demand_indexes[1:]):
+            size += alpha * (series[index] - size)
+            interval += alpha * ((index - previous) - interval)
+        forecasts[row] = size / interval
+    return forecasts
+
+
+def forecast(model, values, steps, seasonal_periods=12):
+    """Forecast ``values`` with one of the methods cheaper than Holt-Winters"""
+    values = np.asarray(values, dtype=float)
+    if model == SEASONAL_NAIVE:
+        return seasonal_naive(values, steps, seasonal_periods)
+    if model == CROSTON:
+        return croston(values, steps)
+    return moving_average(values, steps)
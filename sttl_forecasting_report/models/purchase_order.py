@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models
+from odoo.tools.sql import create_index
+
+
+class PurchaseOrder(models.Model):
+    _inherit = "purchase.order"
+
+    def init(self):
+        super().init()
+        # Per representative / per vendor forecasting series are grouped by date
+        create_index(self._cr, 'purchase_order_user_id_date_order_idx', self._table, ['user_id', 'date_order'])
+        create_index(self._cr, 'purchase_order_partner_id_date_order_idx', self._table, ['partner_id', 'date_order'])
+
+
+class PurchaseOrderLine(models.Model):
+    _inherit = "purchase.order.line"
+
+    def init(self):
+        super().init()
+        create_index(self._cr, 'purchase_order_line_product_id_order_id_idx', self._table, ['product_id', 'order_id'])
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""Benchmark of the forecasting pipeline on synthetic series.
+
+Times every stage separately and writes the results as JSON:
+    * generation: synthetic history of ``synthetic_series``
+    * extraction: ``_extract_forecasting_history`` on the orders of the database
+    * cold run: ``forecasting_prediction`` without model states, split into its
+      resampling, selection, fitting and assembly stages (process_cpu: CPU seconds of
+      this process, fitting workers excluded)
+    * warm run: the same history again with the model states of the cold run
+    * persistence: ``_write_forecasts`` and ``_save_states`` of the cold run
+
+Runs headless with the Python of the Odoo server, the addon being installed in a
+local test database, e.g.::
+
+    python3 benchmark_forecasting.py -c odoo.conf -d forecasting_bench --series 1000 10000 100000 --output bench.json
+
+The database is only written inside a transaction which is rolled back. The
+extraction times the orders already in the database (fill it with ``odoo-bin
+populate``); without ``-d`` the extraction and persistence stages are skipped.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from contextlib import contextmanager
+
+from synthetic_series import DEFAULT_MIX, KINDS, generate_history
+
+# Directory holding the addon, added to the addons path
+ADDONS_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@contextmanager
+def timed(timings, stage):
+    """Store the wall-clock seconds of the block in ``timings[stage]``"""
+    start = time.perf_counter()
+    yield
+    timings[stage] = time.perf_counter() - start
+
+
+def load_odoo(config_file=None, database=None):
+    """Configure the Odoo server and return the ``odoo`` package and the ``forecasting`` module"""
+    import odoo
+    args = ['-c', config_file] if config_file else []
+    if database:
+        args += ['-d', database]
+    odoo.tools.config.parse_config(args)
+    odoo.modules.module.initialize_sys_path()
+    if ADDONS_DIR not in odoo.addons.__path__:
+        odoo.addons.__path__.append(ADDONS_DIR)
+    from odoo.addons.sttl_forecasting_report.models import forecasting
+    return odoo, forecasting
+
+
+def run_database_stages(env, report_name, history, forecasts, model_states, timings):
+    """Time the extraction and the persistence stages in the transaction of ``env``"""
+    report = env[report_name]
+    family = report._forecasting_family
+    with timed(timings, 'extraction'):
+        extracted = report._extract_forecasting_history([family])[family]
+    timings['extracted_rows'] = len(extracted)
+
+    date_field, value_fields, group_field = report._forecasting_fields
+    if group_field:
+        # Synthetic series ids are mapped onto existing records of the grouped model
+        comodel = env[report._fields[group_field].comodel_name]
+        record_ids = comodel.with_context(active_test=False).search([]).ids
+        if not record_ids:
+            raise SystemExit("No %s record to attach the forecasts of %s to" % (comodel._name, report_name))
+        for forecast in forecasts:
+            forecast['Responsible'] = record_ids[int(forecast['Responsible']) % len(record_ids)]
+
+    with timed(timings, 'persistence_forecasts'):
+        generation = report._new_generation()
+        report._write_forecasts(forecasts, date_field, value_fields, group_field=group_field, generation=generation)
+    with timed(timings, 'persistence_states'):
+        env['forecasting.model.state']._save_states(report_name, model_states)
+
+
+def benchmark(forecasting, series, args, env=None):
+    """Return the results of the benchmark of ``series`` synthetic series"""
+    result = {'series': series, 'stages': {}}
+    stages = result['stages']
+    with timed(stages, 'generation'):
+        history, kinds = generate_history(series, months=args.months, orders_per_month=args.orders_per_month,
+                                          seed=args.seed)
+    result['rows'] = len(history)
+    result['kinds'] = {kind: sum(1 for value in kinds.values() if value == kind) for kind in KINDS}
+
+    options = {
+        'workers': args.workers,
+        'chunk_size': args.chunk_size,
+        'granularity': args.granularity,
+        'backend': args.backend,
+        'cpu_budget': args.cpu_budget,
+    }
+    model_states = {}
+    cold = {}
+    cpu_start = time.process_time()
+    with timed(cold, 'total'):
+        forecasts = forecasting.forecasting_prediction(history, model_states=model_states, timings=cold, **options)
+    cold['process_cpu'] = time.process_time() - cpu_start
+    stages['cold'] = cold
+    result['forecast_rows'] = len(forecasts)
+    result['models'] = {}
+    for state in model_states.values():
+        result['models'][state['model']] = result['models'].get(state['model'], 0) + 1
+    result['budget_fallbacks'] = sum(1 for state in model_states.values() if state.get('budget_fallback'))
+
+    warm = {}
+    with timed(warm, 'total'):
+        forecasting.forecasting_prediction(history, model_states=dict(model_states), timings=warm, **options)
+    stages['warm'] = warm
+
+    if env is not None:
+        run_database_stages(env, args.report, history, forecasts, model_states, stages)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('-c', '--config', help="Odoo configuration file")
+    parser.add_argument('-d', '--database', help="Local test database with the addon installed")
+    parser.add_argument('--series', type=int, nargs='+', default=[1000], help="Numbers of series to benchmark")
+    parser.add_argument('--months', type=int, default=36, help="Months of history of every series")
+    parser.add_argument('--orders-per-month', type=int, default=2)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--granularity', choices=['month', 'week'], default='month')
+    parser.add_argument('--backend', choices=['statsmodels', 'numpy'], default='statsmodels')
+    parser.add_argument('--workers', type=int, default=0)
+    parser.add_argument('--chunk-size', type=int, default=50)
+    parser.add_argument('--cpu-budget', type=float, default=0)
+    parser.add_argument('--report', default='salesperson.forecasting',
+                        help="Report model of the extraction and persistence stages")
+    parser.add_argument('--output', help="JSON file of the results (standard output by default)")
+    args = parser.parse_args(argv)
+
+    odoo, forecasting = load_odoo(args.config, args.database)
+    import numpy
+    import pandas
+    import statsmodels
+    results = {
+        'config': dict(vars(args), mix=DEFAULT_MIX),
+        'environment': {
+            'python': platform.python_version(),
+            'odoo': odoo.release.version,
+            'numpy': numpy.__version__,
+            'pandas': pandas.__version__,
+            'statsmodels': statsmodels.__version__,
+            'cpu_count': os.cpu_count(),
+        },
+        'runs': [],
+    }
+    for series in args.series:
+        if args.database:
+            registry = odoo.modules.registry.Registry(args.database)
+            with registry.cursor() as cr:
+                env = odoo.api.Environment(cr, odoo.SUPERUSER_ID, {})
+                try:
+                    results['runs'].append(benchmark(forecasting, series, args, env))
+                finally:
+                    cr.rollback()
+        else:
+            results['runs'].append(benchmark(forecasting, series, args))
+
+    output = json.dumps(results, indent=2, default=str)
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""Synthetic order history for benchmarking the forecasting.
+
+The rows have the columns of the grouped history given to ``forecasting_prediction``:
+(order date, series id, amount, qty ordered, qty delivered, qty invoiced).
+"""
+import numpy as np
+import pandas as pd
+
+COLUMNS = ["month_date", "responsible", "sum", "qty_ordered", "qty_delivered", "qty_invoiced"]
+
+SEASONAL = 'seasonal'
+TRENDING = 'trending'
+INTERMITTENT = 'intermittent'
+SHORT = 'short'
+KINDS = [SEASONAL, TRENDING, INTERMITTENT, SHORT]
+
+# Default share of every kind of series
+DEFAULT_MIX = {SEASONAL: 0.4, TRENDING: 0.3, INTERMITTENT: 0.2, SHORT: 0.1}
+# Months with a demand in an intermittent series
+INTERMITTENT_PROBABILITY = 0.2
+
+
+def monthly_amounts(kinds, months, rng):
+    """Return the (series, months) amounts of series of the given ``kinds`` (indexes in ``KINDS``).
+
+    Seasonal series have a yearly sine season over a mild trend, trending series a
+    strong trend only, intermittent series few months with demand and short series
+    only their last 2 to 11 months of history (zeros before).
+    """
+    count = len(kinds)
+    t = np.arange(months)[None, :]
+    base = rng.uniform(50.0, 500.0, (count, 1))
+    slope = np.where(kinds[:, None] == KINDS.index(TRENDING),
+                     rng.uniform(0.01, 0.05, (count, 1)), rng.uniform(-0.005, 0.01, (count, 1)))
+    season = np.where(kinds[:, None] == KINDS.index(SEASONAL),
+                      rng.uniform(0.2, 0.5, (count, 1)) * np.sin(2 * np.pi * t / 12 + rng.uniform(0, 2 * np.pi, (count, 1))),
+                      0.0)
+    noise = rng.normal(0.0, 0.1, (count, months))
+    amounts = np.clip(base * (1 + slope * t + season + noise), 0.0, None)
+
+    intermittent = kinds == KINDS.index(INTERMITTENT)
+    amounts[intermittent] *= rng.random((intermittent.sum(), months)) < INTERMITTENT_PROBABILITY
+    short = kinds == KINDS.index(SHORT)
+    first_month = months - rng.integers(2, 12, short.sum())
+    amounts[short] *= t >= first_month[:, None]
+    return amounts
+
+
+def generate_history(series=1000, months=36, orders_per_month=2, mix=None, end='2024-12', seed=0):
+    """Return a DataFrame of the daily order history of ``series`` synthetic series.
+
+    ``series`` ids start at 1; every month with a demand is split into
+    ``orders_per_month`` orders on random days. The last month of the history is
+    ``end``. ``mix`` ({kind: share}, see ``DEFAULT_MIX``) sets the kinds of the series.
+    Returns the history and the kind of every series id.
+    """
+    rng = np.random.default_rng(seed)
+    mix = mix or DEFAULT_MIX
+    shares = np.array([mix.get(kind, 0.0) for kind in KINDS], dtype=float)
+    kinds = rng.choice(len(KINDS), size=series, p=shares / shares.sum())
+    amounts = monthly_amounts(kinds, months, rng)
+
+    series_index, month_index = np.nonzero(amounts)
+    series_index = np.repeat(series_index, orders_per_month)
+    month_index = np.repeat(month_index, orders_per_month)
+    # Random split of the month amount between its orders
+    weights = rng.random((len(series_index) // orders_per_month, orders_per_month)) + 0.1
+    weights = (weights / weights.sum(axis=1, keepdims=True)).ravel()
+    amount = amounts[series_index, month_index] * weights
+
+    first_month = np.datetime64(end, 'M') - (months - 1)
+    dates = (first_month + month_index).astype('datetime64[D]') + rng.integers(0, 28, len(month_index))
+    price = rng.uniform(5.0, 50.0, series)[series_index]
+    qty_ordered = amount / price
+    qty_delivered = qty_ordered * rng.uniform(0.8, 1.0, len(amount))
+    qty_invoiced = qty_delivered * rng.uniform(0.7, 1.0, len(amount))
+
+    history = pd.DataFrame({
+        "month_date": dates,
+        "responsible": series_index + 1,
+        "sum": amount,
+        "qty_ordered": qty_ordered,
+        "qty_delivered": qty_delivered,
+        "qty_invoiced": qty_invoiced,
+    }, columns=COLUMNS).sort_values(["responsible", "month_date"], ignore_index=True)
+    return history, dict(zip(range(1, series + 1), (KINDS[kind] for kind in kinds)))
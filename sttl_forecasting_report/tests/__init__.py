@@ -0,0 +1,4 @@
+# -*- coding: utf-8 -*-
+
+from . import test_forecasting
+from . import test_holt_winters
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+import threading
+
+import numpy as np
+import pandas as pd
+
+from odoo.tests import tagged
+from odoo.tests.common import BaseCase
+
+from ..models import forecasting
+from ..models import model_selection
+
+
+def _seasonal_history(months, seed=0):
+    """Return a resampled monthly history with a trend and a yearly season"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(months)
+    amounts = 100 + 0.5 * t + 20 * np.sin(2 * np.pi * t / 12) + rng.normal(0, 2, months)
+    total = pd.DataFrame({
+        'month_date': pd.date_range('1970-01-01', periods=months, freq='MS'),
+        'responsible': 1,
+    })
+    for column in forecasting.VALUE_COLUMNS:
+        total[column] = amounts
+    return total
+
+
+@tagged('post_install', '-at_install')
+class TestForecasting(BaseCase):
+
+    def test_series_over_time_limit_is_skipped(self):
+        if threading.current_thread() is not threading.main_thread():
+            self.skipTest("The time limit relies on SIGALRM, only available in the main thread")
+        total = _seasonal_history(600)
+        forecast_dates = pd.date_range('2020-01-01', periods=12, freq='MS')
+        results, _spent = forecasting._fit_chunk([(1, total, None, None)], forecast_dates, timeout=0.05)
+        # Neither refitted without season nor from a cold start once the limit is hit
+        self.assertEqual(results, [])
+
+    def test_select_model(self):
+        seasonal = _seasonal_history(36)['sum'].to_numpy()
+        self.assertEqual(model_selection.select_model(seasonal), model_selection.HOLT_WINTERS)
+        # Shorter than two seasons: still Holt's trend model, fitted without season
+        self.assertEqual(model_selection.select_model(seasonal[:10]), model_selection.HOLT_WINTERS)
+        self.assertEqual(model_selection.select_model(seasonal[:4]), model_selection.MOVING_AVERAGE)
+        intermittent = np.where(np.arange(36) % 3, 0.0, 10.0)
+        self.assertEqual(model_selection.select_model(intermittent), model_selection.CROSTON)
+
+    def test_no_fork_with_other_threads(self):
+        stop = threading.Event()
+        thread = threading.Thread(target=stop.wait)
+        thread.start()
+        try:
+            with self.assertLogs(forecasting._logger.name, 'WARNING'):
+                self.assertFalse(forecasting._can_fork_workers())
+        finally:
+            stop.set()
+            thread.join()
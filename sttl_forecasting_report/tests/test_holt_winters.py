@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+from statsmodels.tsa.api import ExponentialSmoothing
+
+from odoo.tests import tagged
+from odoo.tests.common import BaseCase
+
+from ..models import holt_winters
+
+# Largest relative gap allowed between the forecasts of the two engines. Their
+# initial states differ (heuristic here, estimated by statsmodels), which weighs
+# more on the trend extrapolation of the models without season.
+SEASONAL_TOLERANCE = 0.05
+TREND_TOLERANCE = 0.1
+
+
+def _series(count, length, seasonal, seed=0):
+    """Return (count, length) series with a trend, noise and optionally a yearly season"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(length)
+    season = 20 * np.sin(2 * np.pi * t / 12) if seasonal else 0.0
+    return 100 + 0.8 * t + season + rng.normal(0, 2, (count, length))
+
+
+@tagged('post_install', '-at_install')
+class TestHoltWinters(BaseCase):
+
+    def _statsmodels_fits(self, values, seasonal):
+        return [
+            ExponentialSmoothing(row, trend='add', seasonal='add' if seasonal else None, seasonal_periods=12).fit()
+            for row in values
+        ]
+
+    def _assert_parity(self, forecasts, fits, tolerance):
+        expected = np.array([fit.forecast(12) for fit in fits])
+        np.testing.assert_allclose(forecasts, expected, rtol=tolerance)
+
+    def test_seasonal_parity(self):
+        values = _series(4, 48, True)
+        forecasts, params = holt_winters.fit_forecast(values, 12, 12)
+        self.assertTrue(all(row['seasonal'] for row in params))
+        self._assert_parity(forecasts, self._statsmodels_fits(values, True), SEASONAL_TOLERANCE)
+
+    def test_trend_parity(self):
+        values = _series(4, 24, False, seed=1)
+        forecasts, params = holt_winters.fit_forecast(values, 12, 12, seasonal=False)
+        self.assertFalse(any(row['seasonal'] for row in params))
+        self._assert_parity(forecasts, self._statsmodels_fits(values, False), TREND_TOLERANCE)
+
+    def test_short_history_drops_season(self):
+        values = _series(2, 18, True)
+        _forecasts, params = holt_winters.fit_forecast(values, 12, 12)
+        self.assertFalse(any(row['seasonal'] for row in params))
+
+    def test_warm_start(self):
+        values = _series(4, 48, True, seed=2)
+        forecasts, params = holt_winters.fit_forecast(values, 12, 12)
+        start_params = np.array([
+            [row['smoothing_level'], row['smoothing_trend'], row['smoothing_seasonal']] for row in params
+        ])
+        # Starting from the previous fit lands on the same model, up to the refinement step
+        warm_forecasts, _params = holt_winters.fit_forecast(values, 12, 12, start_params=start_params)
+        np.testing.assert_allclose(warm_forecasts, forecasts, rtol=0.01)
+
+        # Starting from the statsmodels parameters stays close to statsmodels
+        fits = self._statsmodels_fits(values, True)
+        start_params = np.array([
+            [fit.params['smoothing_level'], fit.params['smoothing_trend'], fit.params['smoothing_seasonal']]
+            for fit in fits
+        ])
+        warm_forecasts, _params = holt_winters.fit_forecast(values, 12, 12, start_params=start_params)
+        self._assert_parity(warm_forecasts, fits, SEASONAL_TOLERANCE)
+
+        # Series without previous parameters are fitted as without warm start
+        start_params[1] = np.nan
+        warm_forecasts, _params = holt_winters.fit_forecast(values[1:2], 12, 12, start_params=start_params[1:2])
+        np.testing.assert_allclose(warm_forecasts, forecasts[1:2])